@@ -0,0 +1,149 @@
+# -------------------- Matchmaking Benchmark --------------------
+#
+# Runs the weekly pairing solvers (matchmaking.py) on synthetic leagues, no
+# Discord or Google Sheets needed, and prints speed and quality side by side:
+#
+#   python bench_matchmaking.py
+#   python bench_matchmaking.py --teams 10 100 1000 5000 --distribution bimodal --weeks 6
+#   python bench_matchmaking.py --solver cycles --repeat 5 --seed 7
+#
+# Each league gets `--weeks` earlier weeks of history (a full season by
+# default, from season_start/season_end in config.json). History is played
+# by a plain noisy-neighbour schedule rather than any solver under test, with
+# rating drift, so close-rated pairs run into MAX_MEETINGS the way they do
+# late in a real season and every solver faces the same constraints.
+#
+# `short` (games missing from a full week) and `zero` (teams with no game at
+# all) come first: a fast solver that leaves teams out is not an improvement.
+# `over_max` counts pairings past MAX_MEETINGS, which "greedy" can make.
+
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import date
+
+import matchmaking
+
+
+def make_ratings(count, distribution, rng):
+    teams = [f"Team {i:05d}" for i in range(count)]
+    if distribution == "uniform":
+        values = [rng.randint(600, 1600) for _ in teams]
+    elif distribution == "bimodal":
+        values = [int(rng.gauss(850 if rng.random() < 0.6 else 1300, 90)) for _ in teams]
+    elif distribution == "flat":
+        values = [1000 for _ in teams]
+    else:
+        values = [int(rng.gauss(1000, 180)) for _ in teams]
+    return teams, {team: max(0, value) for team, value in zip(teams, values)}
+
+
+def season_weeks(default=12):
+    try:
+        with open("config.json") as f:
+            config = json.load(f)
+        start = date.fromisoformat(config["season_start"])
+        end = date.fromisoformat(config["season_end"])
+        return (end - start).days // 7 + 1
+    except Exception:
+        return default
+
+
+def make_history(teams, ratings, weeks, rng):
+    """Season pair counts from a schedule no solver took part in.
+
+    Each week every team plays its neighbours in two noisy rating orders;
+    pairs at MAX_MEETINGS are skipped.
+    """
+    pair_counts = defaultdict(int)
+    drifted = dict(ratings)
+    for _ in range(weeks):
+        drifted = {team: rating + int(rng.gauss(0, 60)) for team, rating in drifted.items()}
+        for _ in range(matchmaking.MATCHES_PER_TEAM):
+            order = sorted(teams, key=lambda team: drifted[team] + rng.gauss(0, 80))
+            for team_a, team_b in zip(order[::2], order[1::2]):
+                key = matchmaking.pair_key(team_a, team_b)
+                if pair_counts[key] < matchmaking.MAX_MEETINGS:
+                    pair_counts[key] += 1
+    return pair_counts
+
+
+def measure(solver, teams, ratings, pair_counts, repeat):
+    times = []
+    plan = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        plan = matchmaking.pair_teams(teams, ratings, pair_counts, solver=solver)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    matchmaking.pair_teams(teams, ratings, pair_counts, solver=solver)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gaps = [abs(ratings[a] - ratings[b]) for a, b in plan.matchups] or [0]
+    per_team = defaultdict(int)
+    for team in teams:
+        per_team[plan.match_count[team]] += 1
+    return {
+        "solver": solver,
+        "teams": len(teams),
+        "ms": min(times) * 1000,
+        "peak_kb": peak / 1024,
+        "matches": len(plan.matchups),
+        "per_team": " ".join(f"{games}:{per_team[games]}" for games in sorted(per_team)),
+        "gap_mean": statistics.mean(gaps),
+        "gap_p95": sorted(gaps)[int(len(gaps) * 0.95) - 1 if len(gaps) > 1 else 0],
+        "gap_max": max(gaps),
+        "rematches": len(plan.rematches),
+        "short": sum(matchmaking.MATCHES_PER_TEAM - plan.match_count[team] for team in plan.unmatched),
+        "zero": per_team[0],
+        "over_max": sum(1 for _, _, meeting in plan.rematches if meeting > matchmaking.MAX_MEETINGS),
+    }
+
+
+# (field, width, format)
+COLUMNS = [
+    ("solver", -8, ""), ("teams", 6, ""), ("short", 6, ""), ("zero", 5, ""),
+    ("ms", 9, ".1f"), ("peak_kb", 9, ".0f"), ("matches", 8, ""), ("gap_mean", 9, ".1f"),
+    ("gap_p95", 8, ""), ("gap_max", 8, ""), ("rematches", 10, ""), ("over_max", 9, ""),
+    ("per_team", -0, ""),
+]
+
+
+def format_row(values):
+    cells = []
+    for (name, width, fmt), value in zip(COLUMNS, values):
+        text = format(value, fmt) if fmt and not isinstance(value, str) else str(value)
+        cells.append(text.ljust(-width) if width <= 0 else text.rjust(width))
+    return " ".join(cells)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark weekly matchmaking solvers on synthetic leagues.")
+    parser.add_argument("--teams", type=int, nargs="+", default=[10, 50, 200, 1000, 5000])
+    parser.add_argument("--solver", nargs="+", default=sorted(matchmaking.SOLVERS), choices=sorted(matchmaking.SOLVERS))
+    parser.add_argument("--distribution", default="normal", choices=["normal", "uniform", "bimodal", "flat"])
+    parser.add_argument("--weeks", type=int, default=season_weeks(), help="weeks of pair history to simulate first (default: one season)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per solver (best is reported)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"📊 distribution={args.distribution} weeks={args.weeks} seed={args.seed} repeat={args.repeat}")
+    print(format_row([name for name, _, _ in COLUMNS]))
+
+    for count in args.teams:
+        rng = random.Random(args.seed * 100003 + count)
+        teams, ratings = make_ratings(count, args.distribution, rng)
+        pair_counts = make_history(teams, ratings, args.weeks, rng)
+        for solver in args.solver:
+            result = measure(solver, teams, ratings, pair_counts, args.repeat)
+            print(format_row([result[name] for name, _, _ in COLUMNS]))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,28 +9,16 @@ from pathlib import Path
 import traceback
 import asyncio
 import os
+import sheets
+import pair_history
+import ratings
+import standings
+from rows import TeamRow, PlayerRow, PlayerLeaderboardRow, RosterIndex, PlayerIndex, BanList, member_id
 
 # Helper function to extract user ID from "Name (ID)"
 def extract_user_id(profile_string):
     """Extract user ID from profile string like Username#1234 | ID OR Username (ID) OR Username"""
-    if "|" in profile_string:
-        return profile_string.split("|")[-1].strip()
-    elif "(" in profile_string and ")" in profile_string:
-        return profile_string.split("(")[-1].split(")")[0].strip()
-    else:
-        return ""
-
-def safe_get_values(sheet, retries=3, delay=1.5):
-    import time
-    import gspread
-    for attempt in range(retries):
-        try:
-            return sheet.get_all_values()
-        except gspread.exceptions.APIError as e:
-            print(f"[⚠️] Sheet fetch error (attempt {attempt+1}): {e}")
-            if attempt < retries - 1:
-                time.sleep(delay)
-    return []
+    return member_id(profile_string)
 
 
 # Helper to check roster lock timestamp
@@ -62,61 +50,123 @@ def is_dev_override(user, config):
     return user.id in dev_ids or any(role.id in dev_ids for role in user.roles)
 
 def get_captains_and_cocaps(guild, team_row):
+    # team_row is a TeamRow or the raw Teams row
+    team = team_row if isinstance(team_row, TeamRow) else TeamRow(0, [str(cell) for cell in team_row])
     members = []
 
-    # Column B = Captain
-    try:
-        raw = str(team_row[1]).strip()
-        if "(" in raw and ")" in raw:
-            user_id = int(raw.split("(")[-1].replace(")", "").strip())
-        else:
-            user_id = int(raw)
-        member = guild.get_member(user_id)
-        if isinstance(member, discord.Member):
+    # Column B = Captain, Column I = Co-captain (ID or Name (ID))
+    for user_id in (team.captain_id, team.cocaptain_id):
+        member = guild.get_member(int(user_id)) if user_id else None
+        if isinstance(member, discord.Member) and member not in members:
             members.append(member)
-    except Exception as e:
-        print(f"[⚠️] Failed parsing captain from team_row[1]: {e}")
-
-    # Column I = Co-captain (ID or Name (ID))
-    try:
-        if len(team_row) > 8:
-            raw = str(team_row[8]).strip()
-            if "(" in raw and ")" in raw:
-                user_id = int(raw.split("(")[-1].replace(")", "").strip())
-            elif raw.isdigit():
-                user_id = int(raw)
-            else:
-                user_id = None
-
-            if user_id:
-                member = guild.get_member(user_id)
-                if isinstance(member, discord.Member) and member not in members:
-                    members.append(member)
-    except Exception as e:
-        print(f"[⚠️] Failed parsing co-captain from team_row[8]: {e}")
 
     return members
 
 def is_captain_or_cocap(user_id: str, member: discord.Member, team_row: list, co_captain_role_id: int):
 
+    team = team_row if isinstance(team_row, TeamRow) else TeamRow(0, [str(cell) for cell in team_row])
+
     # Captain check from Column B
-    if len(team_row) > 1 and f"({user_id})" in str(team_row[1]):
+    if team.captain_id and team.captain_id == str(user_id):
         return True
 
     # Co-captain check from Column I
-    cocap_id_raw = team_row[8] if len(team_row) > 8 else ""
-    try:
-        if "(" in cocap_id_raw and ")" in cocap_id_raw:
-            cocap_id = cocap_id_raw.split("(")[-1].replace(")", "").strip()
-        else:
-            cocap_id = cocap_id_raw.strip()
-    except Exception:
-        cocap_id = ""
     has_role = any(role.id == co_captain_role_id for role in member.roles)
-    if cocap_id == user_id and has_role:
+    if team.cocaptain_id and team.cocaptain_id == user_id and has_role:
         return True
     return False
 
+# -------------------- Per-user authorization context --------------------
+#
+# Panel buttons all start by working out who is clicking: signed up (as what),
+# banned, league sub, on which team, captain or co-captain. UserContext answers
+# all of it from the roster/player/ban indexes in one go and is cached per user.
+# The cache is dropped whenever the Teams, Players or Banned snapshot changes
+# (roster and ban writes replace it) and per user when their roles change.
+
+class UserContext:
+    __slots__ = ("user_id", "player", "membership", "is_banned", "is_sub", "is_dev", "has_cocap_role")
+
+    def __init__(self, user_id, player, membership, is_banned, is_sub, is_dev, has_cocap_role):
+        self.user_id = user_id
+        self.player = player              # PlayerRow or None
+        self.membership = membership      # rows.Membership or None
+        self.is_banned = is_banned
+        self.is_sub = is_sub
+        self.is_dev = is_dev
+        self.has_cocap_role = has_cocap_role
+
+    @property
+    def signed_up(self):
+        return self.player is not None
+
+    @property
+    def role(self):
+        return self.player.role if self.player else ""
+
+    @property
+    def team(self):
+        return self.membership.team if self.membership else None
+
+    @property
+    def team_name(self):
+        return self.membership.team.name if self.membership else None
+
+    @property
+    def on_roster(self):
+        # Listed in one of the player slots B–G (not only as co-captain in column I)
+        return bool(self.membership and self.membership.slot)
+
+    @property
+    def is_captain(self):
+        return bool(self.membership and self.membership.is_captain)
+
+    @property
+    def can_manage(self):
+        # Same rule as is_captain_or_cocap: captain, or listed co-captain holding the role
+        return self.is_captain or bool(self.membership and self.membership.is_cocaptain and self.has_cocap_role)
+
+
+_user_contexts = {"stamp": None, "users": {}}
+
+
+def invalidate_user_context(user_id=None):
+    if user_id is None:
+        _user_contexts["users"].clear()
+    else:
+        _user_contexts["users"].pop(str(user_id), None)
+
+
+async def get_user_context(member, config, teams_sheet, players_sheet, banned_sheet):
+    roster, players, bans = await asyncio.gather(
+        sheets.models(teams_sheet, RosterIndex),
+        sheets.models(players_sheet, PlayerIndex),
+        sheets.models(banned_sheet, BanList),
+    )
+    stamp = _user_contexts["stamp"]
+    if stamp is None or any(old is not new for old, new in zip(stamp, (roster, players, bans))):
+        _user_contexts["stamp"] = (roster, players, bans)
+        _user_contexts["users"].clear()
+
+    user_id = str(member.id)
+    role_ids = frozenset(role.id for role in getattr(member, "roles", []))
+    cached = _user_contexts["users"].get(user_id)
+    if cached and cached[0] == role_ids:
+        return cached[1]
+
+    context = UserContext(
+        user_id,
+        players.get(user_id),
+        roster.team_of(user_id),
+        user_id in bans,
+        config.get("league_sub_role_id") in role_ids,
+        hasattr(member, "roles") and is_dev_override(member, config),
+        config.get("co_captain_role_id") in role_ids,
+    )
+    _user_contexts["users"][user_id] = (role_ids, context)
+    return context
+
+
 PENDING_JOIN_FOLDER = "json"
 PENDING_JOIN_FILE = os.path.join(PENDING_JOIN_FOLDER, "pending_join_requests.json")
 
@@ -245,19 +295,19 @@ class SignupView(discord.ui.View):
         username = interaction.user.display_name
 
         try:
-            players_sheet = self.bot.spreadsheet.worksheet("Players")
-            existing_players = players_sheet.get_all_values()[1:]  # Skip header
+            players_sheet = await sheets.call(self.bot.spreadsheet.worksheet, "Players")
+            existing_players = (await sheets.get_values(players_sheet))[1:]  # Skip header
 
             if any(row[0] == user_id for row in existing_players):
                 await interaction.response.send_message("❗ You're already signed up.", ephemeral=True)
                 return
 
-            players_sheet.append_row([user_id, username, role, tz])
+            await sheets.call(players_sheet.append_row, [user_id, username, role, tz])
 
             leaderboard = self.bot.player_leaderboard_sheet
-            if not any(row[1] == user_id for row in leaderboard.get_all_values()[1:]):
+            if not any(row[1] == user_id for row in (await sheets.get_values(leaderboard))[1:]):
                 default_elo = self.bot.config.get("default_player_rating", 1025)
-                leaderboard.append_row([username, user_id, str(default_elo), "0", "0", "0"])
+                await sheets.call(leaderboard.append_row, [username, user_id, str(default_elo), "0", "0", "0"])
         except Exception as e:
             print(f"[❌] Failed to store signup: {e}")
             await interaction.response.send_message("❗ Signup failed. Try again later.", ephemeral=True)
@@ -323,7 +373,7 @@ class AcceptDenyJoinRequestView(discord.ui.View):
         sub_role = discord.utils.get(guild.roles, id=self.parent_view.bot.config.get("league_sub_role_id"))
 
         # 1. Check if still signed up
-        if not any(row[0].strip() == str(self.invitee.id) for row in players_sheet.get_all_values()[1:]):
+        if not any(row[0].strip() == str(self.invitee.id) for row in (await sheets.get_values(players_sheet))[1:]):
             await interaction.message.edit(
                 content="❌ This join request is no longer valid. The player is no longer signed up.",
                 view=None
@@ -339,14 +389,13 @@ class AcceptDenyJoinRequestView(discord.ui.View):
             return
 
         # 3. Check if already joined another team
-        for row in teams_sheet.get_all_values()[1:]:
-            for cell in row[1:7]:
-                if f"({self.invitee.id})" in cell:
-                    await interaction.message.edit(
-                        content="❌ This join request is no longer valid. The player has already joined another team.",
-                        view=None
-                    )
-                    return
+        membership = (await sheets.models(teams_sheet, RosterIndex)).team_of(self.invitee.id)
+        if membership and membership.slot:
+            await interaction.message.edit(
+                content="❌ This join request is no longer valid. The player has already joined another team.",
+                view=None
+            )
+            return
 
         team_role = discord.utils.get(guild.roles, name=f"Team {self.team_name}")
 
@@ -358,7 +407,7 @@ class AcceptDenyJoinRequestView(discord.ui.View):
             return
 
         already_on_team = False
-        for row in self.parent_view.teams_sheet.get_all_values():
+        for row in await sheets.get_values(self.parent_view.teams_sheet):
             for cell in row[1:7]:
                 if cell.strip() == f"{self.invitee.display_name} ({self.invitee.id})":
                     already_on_team = True
@@ -375,7 +424,7 @@ class AcceptDenyJoinRequestView(discord.ui.View):
 
         await self.invitee.add_roles(team_role)
 
-        for idx, row in enumerate(self.parent_view.teams_sheet.get_all_values(), 1):
+        for idx, row in enumerate(await sheets.get_values(self.parent_view.teams_sheet), 1):
             if row[0].lower() == self.team_name.lower():
                 max_players = self.parent_view.config.get("team_max_players", 6)
                 current_players = [p for p in row[1:7] if p.strip()]
@@ -387,11 +436,11 @@ class AcceptDenyJoinRequestView(discord.ui.View):
                     return
                 for i in range(1, 7):
                     if row[i] == "":
-                        self.parent_view.teams_sheet.update_cell(idx, i + 1, f"{self.invitee.display_name} ({self.invitee.id})")
+                        await sheets.call(self.parent_view.teams_sheet.update_cell, idx, i + 1, f"{self.invitee.display_name} ({self.invitee.id})")
                         break
 
                 # ✅ Re-fetch the updated row
-                updated_row = self.parent_view.teams_sheet.row_values(idx)
+                updated_row = await sheets.call(self.parent_view.teams_sheet.row_values, idx)
                 player_count = sum(1 for cell in updated_row[1:7] if cell.strip())
                 min_required = self.parent_view.config.get("team_min_players", 3)
 
@@ -481,22 +530,15 @@ class AcceptDenyMatchView(discord.ui.View):
                     return
 
                 # Identify which team the user is on
-                user_team = None
-                for row in self.parent.teams_sheet.get_all_values()[1:]:
-                    if any(user_id in cell for cell in row[1:] if cell):
-                        user_team = row[0]
-                        break
+                roster = await sheets.models(self.parent.teams_sheet, RosterIndex)
+                user_team = roster.team_name(user_id)
 
                 if not user_team:
                     await safe_send(interaction, "❗ You are not on either team for this match.", ephemeral=True)
                     return
 
                 # Determine which team the proposer is on
-                proposer_team = None
-                for row in self.parent.teams_sheet.get_all_values()[1:]:
-                    if any(str(self.proposer_id) in cell for cell in row[1:] if cell):
-                        proposer_team = row[0]
-                        break
+                proposer_team = roster.team_name(self.proposer_id)
 
                 # 🚫 Prevent *anyone* from the proposing team (not just proposer) from accepting
                 if user_team == proposer_team:
@@ -512,7 +554,7 @@ class AcceptDenyMatchView(discord.ui.View):
                     return
 
                 # Confirm they are captain or co-captain of the receiving team
-                team_row = next((r for r in self.parent.teams_sheet.get_all_values()[1:] if r[0] == receiving_team), [])
+                team_row = roster.get(receiving_team) or []
                 if not is_captain_or_cocap(user_id, interaction.user, team_row, co_captain_role_id):
                     await safe_send(interaction, "❗ Only the captain or co-captain of the receiving team may accept this proposal.", ephemeral=True)
                     return
@@ -534,23 +576,23 @@ class AcceptDenyMatchView(discord.ui.View):
                 discord_relative = f"<t:{discord_ts}:R>"
 
                 # ✅ Update or append to Match Scheduled
-                scheduled_sheet = get_or_create_sheet(
+                scheduled_sheet = await sheets.call(get_or_create_sheet,
                     self.parent.spreadsheet,
                     "Match Scheduled",
                     ["Match ID", "Team A", "Team B", "Scheduled Date"]
                 )
 
                 updated = False
-                for idx, row in enumerate(scheduled_sheet.get_all_values()[1:], start=2):  # skip header
+                for idx, row in enumerate((await sheets.get_values(scheduled_sheet))[1:], start=2):  # skip header
                     row_id = row[0].strip().lower()
                     if row_id == self.match_id.strip().lower():
-                        scheduled_sheet.update_cell(idx, 4, self.proposed_date)
+                        await sheets.call(scheduled_sheet.update_cell, idx, 4, self.proposed_date)
                         updated = True
                         break
 
                 if not updated:
                     try:
-                        scheduled_sheet.append_row([
+                        await sheets.call(scheduled_sheet.append_row, [
                             self.match_id,
                             self.team_a,
                             self.team_b,
@@ -561,21 +603,21 @@ class AcceptDenyMatchView(discord.ui.View):
 
 
                 # ✅ Remove from Proposed Matches
-                for idx, row in enumerate(self.parent.proposed_sheet.get_all_values()[1:], start=2):
+                for idx, row in enumerate((await sheets.get_values(self.parent.proposed_sheet))[1:], start=2):
                     if row and row[0].strip().lower() == self.match_id.strip().lower():
-                        self.parent.proposed_sheet.delete_rows(idx)
+                        await sheets.call(self.parent.proposed_sheet.delete_rows, idx)
                         break
 
                 # Add to Matches if it's a challenge
                 if self.match_type == "challenge":
-                    self.parent.matches_sheet.append_row([
+                    await sheets.call(self.parent.matches_sheet.append_row, [
                         self.match_id, self.team_a, self.team_b,
                         self.proposed_date, self.proposed_date,
                         "Scheduled", "", "", ""
                     ])
 
                 # Update existing Matches row
-                match_sheet = get_or_create_sheet(
+                match_sheet = await sheets.call(get_or_create_sheet,
                     self.parent.spreadsheet, "Matches",
                     ["Match ID", "Team A", "Team B", "Proposed Date", "Scheduled Date", "Status", "Winner", "Loser", "Proposed By"]
                 )
@@ -584,19 +626,17 @@ class AcceptDenyMatchView(discord.ui.View):
                 found = False
 
                 updated = False
-                for idx, row in enumerate(match_sheet.get_all_values()[1:], start=2):
-                    row_id = row[0].strip().lower()
-                    row_team_a = row[1].strip().lower()
-                    row_team_b = row[2].strip().lower()
+                for idx in await sheets.find_rows(match_sheet, self.match_id, fold=True):
+                    row = await sheets.row_values(match_sheet, idx)
+                    row_team_a = row[1].strip().lower() if len(row) > 1 else ""
+                    row_team_b = row[2].strip().lower() if len(row) > 2 else ""
 
                     # Strict match on Match ID and both team names
-                    if (
-                        row_id == self.match_id.strip().lower() and
-                        {row_team_a, row_team_b} == {self.team_a.strip().lower(), self.team_b.strip().lower()}
-                    ):
-                        match_sheet.update_cell(idx, 4, self.proposed_date)
-                        match_sheet.update_cell(idx, 5, self.proposed_date)
-                        match_sheet.update_cell(idx, 6, "Scheduled")
+                    if {row_team_a, row_team_b} == {self.team_a.strip().lower(), self.team_b.strip().lower()}:
+                        async with sheets.batch(match_sheet) as writes:
+                            writes.update_cell(idx, 4, self.proposed_date)
+                            writes.update_cell(idx, 5, self.proposed_date)
+                            writes.update_cell(idx, 6, "Scheduled")
                         updated = True
                         break
 
@@ -630,8 +670,10 @@ class AcceptDenyMatchView(discord.ui.View):
                         color=discord.Color.green()
                     )
 
+                    team_rows = await sheets.get_values(self.parent.teams_sheet)
+
                     def get_mentions(team_name):
-                        row = next((r for r in self.parent.teams_sheet.get_all_values() if r[0] == team_name), [])
+                        row = next((r for r in team_rows if r[0] == team_name), [])
                         mentions = []
                         guild = discord.utils.get(self.parent.bot.guilds)  # works in DMs
 
@@ -693,22 +735,15 @@ class AcceptDenyMatchView(discord.ui.View):
                     return
 
                 # Identify which team the user is on
-                user_team = None
-                for row in self.parent.teams_sheet.get_all_values()[1:]:
-                    if any(user_id in cell for cell in row[1:] if cell):
-                        user_team = row[0]
-                        break
+                roster = await sheets.models(self.parent.teams_sheet, RosterIndex)
+                user_team = roster.team_name(user_id)
 
                 if not user_team:
                     await safe_send(interaction, "❗ You are not on either team for this match.", ephemeral=True)
                     return
 
                 # Block the proposer’s own team from accepting
-                proposer_team = None
-                for row in self.parent.teams_sheet.get_all_values()[1:]:
-                    if any(str(self.proposer_id) in cell for cell in row[1:] if cell):
-                        proposer_team = row[0]
-                        break
+                proposer_team = roster.team_name(self.proposer_id)
 
                 if user_team == proposer_team:
                     await safe_send(interaction, "❗ Only the opposing captain or co-captain may accept this proposal.", ephemeral=True)
@@ -723,7 +758,7 @@ class AcceptDenyMatchView(discord.ui.View):
                     return
 
                 # Confirm they are captain or co-captain of the receiving team
-                team_row = next((r for r in self.parent.teams_sheet.get_all_values()[1:] if r[0] == receiving_team), [])
+                team_row = roster.get(receiving_team) or []
                 if not is_captain_or_cocap(user_id, interaction.user, team_row, co_captain_role_id):
                     await safe_send(interaction, "❗ Only the captain or co-captain of the receiving team may accept this proposal.", ephemeral=True)
                     return
@@ -741,22 +776,22 @@ class AcceptDenyMatchView(discord.ui.View):
                 await interaction.message.edit(view=self)
 
                 # ✅ Remove from Proposed Matches
-                proposed_rows = self.parent.proposed_sheet.get_all_values()
+                proposed_rows = await sheets.get_values(self.parent.proposed_sheet)
                 for idx, row in enumerate(proposed_rows, start=1):
                     if row and row[0].strip().lower() == self.match_id.strip().lower():
-                        self.parent.proposed_sheet.delete_rows(idx)
+                        await sheets.call(self.parent.proposed_sheet.delete_rows, idx)
                         break
 
                 # ✅ Remove from Challenge Matches if it was a challenge
                 if self.match_type == "challenge":
-                    challenge_rows = self.parent.challenge_sheet.get_all_values()
+                    challenge_rows = await sheets.get_values(self.parent.challenge_sheet)
                     for idx, row in enumerate(challenge_rows[1:], start=2):  # skip header
                         if (
                             row[2] == self.team_a and
                             row[3] == self.team_b and
                             row[5] == self.proposed_date
                         ):
-                            self.parent.challenge_sheet.delete_rows(idx)
+                            await sheets.call(self.parent.challenge_sheet.delete_rows, idx)
                             break
 
                 # Delete original message if in channel (safe check)
@@ -773,18 +808,18 @@ class AcceptDenyMatchView(discord.ui.View):
             
             async def on_timeout(self):
                 # ✅ Remove from Proposed Match sheet by match ID
-                proposed_rows = self.parent.proposed_sheet.get_all_values()[1:]
+                proposed_rows = (await sheets.get_values(self.parent.proposed_sheet))[1:]
                 for idx, row in enumerate(proposed_rows, start=2):
                     if row and row[0].strip().lower() == self.match_id.strip().lower():
-                        self.parent.proposed_sheet.delete_rows(idx)
+                        await sheets.call(self.parent.proposed_sheet.delete_rows, idx)
                         break
 
                 # ✅ Remove from Challenge Match sheet if it was a challenge match
                 if self.match_type == "challenge":
-                    challenge_rows = self.parent.challenge_sheet.get_all_values()[1:]
+                    challenge_rows = (await sheets.get_values(self.parent.challenge_sheet))[1:]
                     for idx, row in enumerate(challenge_rows, start=2):
                         if row and row[1].strip().lower() == self.match_id.strip().lower():
-                            self.parent.challenge_sheet.delete_rows(idx)
+                            await sheets.call(self.parent.challenge_sheet.delete_rows, idx)
                             break
 
                 # ✅ Delete original proposal message if still present
@@ -843,22 +878,15 @@ class ConfirmScoreView(discord.ui.View):
             return
 
         # Identify which team the user is on
-        user_team = None
-        for row in self.parent.teams_sheet.get_all_values()[1:]:
-            if any(user_id in cell for cell in row[1:] if cell):
-                user_team = row[0]
-                break
+        roster = await sheets.models(self.parent.teams_sheet, RosterIndex)
+        user_team = roster.team_name(user_id)
 
         if not user_team:
             await self.safe_send(interaction, "❗ You are not on either team for this match.")
             return
 
         # Block the proposer’s own team from confirming their own score
-        proposer_team = None
-        for row in self.parent.teams_sheet.get_all_values()[1:]:
-            if any(str(self.proposer_id) in cell for cell in row[1:] if cell):
-                proposer_team = row[0]
-                break
+        proposer_team = roster.team_name(self.proposer_id)
         if user_team == proposer_team:
             await self.safe_send(interaction, "❗ Only the opposing captain or co-captain may confirm or deny this score.")
             return
@@ -872,7 +900,7 @@ class ConfirmScoreView(discord.ui.View):
             return
 
         # Confirm they are captain or co-captain of the receiving team
-        team_row = next((r for r in self.parent.teams_sheet.get_all_values()[1:] if r[0] == receiving_team), [])
+        team_row = roster.get(receiving_team) or []
         if not is_captain_or_cocap(user_id, interaction.user, team_row, co_captain_role_id):
             await safe_send(interaction, "❗ Only the captain or co-captain of the receiving team may accept this proposal.", ephemeral=True)
             return
@@ -892,11 +920,11 @@ class ConfirmScoreView(discord.ui.View):
         await interaction.message.edit(view=self)
 
 
-        from match import update_team_rating, get_or_create_sheet
+        from match import get_or_create_sheet
 
         match_id = self.match["match_id"].strip()
-        existing = self.parent.proposed_scores_sheet.get_all_values()[1:]
-        if not any(row[0].strip() == match_id for row in existing):
+        existing = (await sheets.column(self.parent.proposed_scores_sheet, 1))[1:]
+        if not any(row_id.strip() == match_id for row_id in existing):
             await self.safe_send(interaction, "⚠️ This match has no active score proposal to accept. It may have expired or already been finalized.")
             return
 
@@ -949,46 +977,24 @@ class ConfirmScoreView(discord.ui.View):
             elo_loss = self.parent.bot.config.get("elo_loss_points", -25)
             default_rating = self.parent.bot.config.get("default_player_rating", 800)
 
-            update_team_rating(self.parent.leaderboard_sheet, winner, True, elo_win, elo_loss)
-            update_team_rating(self.parent.leaderboard_sheet, loser, False, elo_win, elo_loss)
-
-            # ✅ PLAYER STATS UPDATE
-            def update_player_stats(sheet, user_id, username, won, elo_win, elo_loss, default_rating):
-                values = sheet.get_all_values()
-                existing = {row[1]: row for row in values[1:]}  # key = user_id
-                elo_change = elo_win if won else elo_loss
-
-                if user_id in existing:
-                    row = existing[user_id]
-                    rating = int(row[2]) if row[2].isdigit() else default_rating
-                    wins = int(row[3]) + (1 if won else 0)
-                    losses = int(row[4]) + (0 if won else 1)
-                    matches = int(row[5]) + 1
-                    rating += elo_change
-                    new_row = [row[0], user_id, str(rating), str(wins), str(losses), str(matches)]
-                    sheet.update(f"A{values.index(row)+1}:F{values.index(row)+1}", [new_row])
-                else:
-                    rating = default_rating + elo_change
-                    sheet.append_row([username, user_id, str(rating), "1" if won else "0", "0" if won else "1", "1"])
+            await standings.record_result(self.parent.leaderboard_sheet, winner, loser, elo_win, elo_loss, self.parent.bot.config)
 
-            def credit_team_players(team_name, won):
-                row = next((r for r in self.parent.teams_sheet.get_all_values() if r[0] == team_name), [])
-                for cell in row[1:]:
-                    if "(" in cell and ")" in cell:
-                        username = cell.split("(")[0].strip()
-                        user_id = cell.split("(")[-1].split(")")[0].strip()
-                        update_player_stats(self.parent.bot.player_leaderboard_sheet, user_id, username, won, elo_win, elo_loss, default_rating)
-
-            credit_team_players(winner, True)
-            credit_team_players(loser, False)
+            # ✅ PLAYER STATS UPDATE: rostered players and subs, credited from one snapshot
+            roster = await sheets.models(self.parent.teams_sheet, RosterIndex)
+            credits = []
+            for team_name, won in [(winner, True), (loser, False)]:
+                team = roster.get(team_name)
+                credits += [(user_id, username, won) for username, user_id in (team.players if team else []) if user_id]
 
             for sub_key, is_winner in [("sub_a", self.match["team1"] == winner), ("sub_b", self.match["team2"] == winner)]:
                 val = self.match.get(sub_key)
                 if val and "|" in val:
                     name, uid = val.split("|")
-                    update_player_stats(self.parent.bot.player_leaderboard_sheet, uid.strip(), name.strip(), won=is_winner)
+                    credits.append((uid.strip(), name.strip(), is_winner))
+
+            await standings.credit_players(self.parent.bot.player_leaderboard_sheet, credits, elo_win, elo_loss, default_rating)
 
-        self.parent.scoring_sheet.append_row([
+        await sheets.call(self.parent.scoring_sheet.append_row, [
             self.match["match_id"],
             self.match["team1"],
             self.match["team2"],
@@ -999,46 +1005,39 @@ class ConfirmScoreView(discord.ui.View):
             map_scores[2][2] if len(map_scores) > 2 else "",
             total_a, total_b, maps_won_a, maps_won_b, winner
         ])
+        pair_history.record(self.match["team1"], self.match["team2"])
+
+        # 🧹 Drop the match from every pending tab in one batchUpdate
+        await sheets.delete_keyed_rows(self.parent.spreadsheet, [
+            (self.parent.proposed_sheet, 1, {match_id}),
+            (self.parent.scheduled_sheet, 1, {match_id}),
+            (self.parent.proposed_scores_sheet, 1, {match_id}),
+            (self.parent.weekly_matches_sheet, 4, {match_id}),
+        ])
 
-        for sheet in [self.parent.proposed_sheet, self.parent.scheduled_sheet, self.parent.proposed_scores_sheet]:
-            rows = safe_get_values(sheet)[1:]
-            for idx, row in enumerate(rows, start=2):
-                if row and row[0].strip() == match_id:
-                    sheet.delete_rows(idx)
-                    break
-
-        weekly_rows = self.parent.weekly_matches_sheet.get_all_values()[1:]
-        for idx, row in enumerate(weekly_rows, start=2):
-            if len(row) >= 4 and row[3].strip() == match_id:
-                self.parent.weekly_matches_sheet.delete_rows(idx)
-                break
-
-        match_sheet = get_or_create_sheet(self.parent.spreadsheet, "Matches", [])
-        for idx, row in enumerate(match_sheet.get_all_values()[1:], start=2):
-            if row[0].strip() == match_id:
-                match_sheet.update_cell(idx, 6, "Finished")
-                match_sheet.update_cell(idx, 7, winner if winner != "Tie" else "")
-                match_sheet.update_cell(idx, 8, loser if winner != "Tie" else "")
-                break
+        match_sheet = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Matches", [])
+        idx = await sheets.find_row(match_sheet, match_id)
+        if idx:
+            async with sheets.batch(match_sheet) as writes:
+                writes.update_cell(idx, 6, "Finished")
+                writes.update_cell(idx, 7, winner if winner != "Tie" else "")
+                writes.update_cell(idx, 8, loser if winner != "Tie" else "")
 
         # 📢 Results Embed
         score_channel = self.parent.bot.get_channel(self.parent.bot.config.get("score_channel_id"))
         if score_channel:
+            teams = await sheets.models(self.parent.teams_sheet, TeamRow)
+
             def get_mentions(team_name):
-                row = next((r for r in self.parent.teams_sheet.get_all_values() if r[0] == team_name), [])
-                mentions = []
-                for cell in row[1:]:
-                    if "(" in cell and ")" in cell:
-                        user_id = cell.split("(")[-1].split(")")[0]
-                        mentions.append(f"<@{user_id}>")
-                return mentions
+                team = next((t for t in teams if t.name == team_name), None)
+                return [f"<@{user_id}>" for user_id in team.player_ids] if team else []
 
             mentions_a = get_mentions(self.match["team1"])
             mentions_b = get_mentions(self.match["team2"])
 
             try:
-                week_sheet = get_or_create_sheet(self.parent.spreadsheet, "LeagueWeek", ["League Week"])
-                week_number = week_sheet.get_all_values()[1][0]
+                week_sheet = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "LeagueWeek", ["League Week"])
+                week_number = (await sheets.get_values(week_sheet))[1][0]
             except Exception:
                 week_number = "?"
 
@@ -1103,22 +1102,15 @@ class ConfirmScoreView(discord.ui.View):
             return
 
         # Identify which team the user is on
-        user_team = None
-        for row in self.parent.teams_sheet.get_all_values()[1:]:
-            if any(user_id in cell for cell in row[1:] if cell):
-                user_team = row[0]
-                break
+        roster = await sheets.models(self.parent.teams_sheet, RosterIndex)
+        user_team = roster.team_name(user_id)
 
         if not user_team:
             await self.safe_send(interaction, "❗ You are not on either team for this match.")
             return
 
         # Block the proposer’s own team from confirming their own score
-        proposer_team = None
-        for row in self.parent.teams_sheet.get_all_values()[1:]:
-            if any(str(self.proposer_id) in cell for cell in row[1:] if cell):
-                proposer_team = row[0]
-                break
+        proposer_team = roster.team_name(self.proposer_id)
         if user_team == proposer_team:
             await self.safe_send(interaction, "❗ Only the opposing captain or co-captain may confirm or deny this score.")
             return
@@ -1132,7 +1124,7 @@ class ConfirmScoreView(discord.ui.View):
             return
 
         # Confirm they are captain or co-captain of the receiving team
-        team_row = next((r for r in self.parent.teams_sheet.get_all_values()[1:] if r[0] == receiving_team), [])
+        team_row = roster.get(receiving_team) or []
         if not is_captain_or_cocap(user_id, interaction.user, team_row, co_captain_role_id):
             await safe_send(interaction, "❗ Only the captain or co-captain of the receiving team may accept this proposal.", ephemeral=True)
             return
@@ -1150,9 +1142,9 @@ class ConfirmScoreView(discord.ui.View):
             item.disabled = True
         await interaction.message.edit(view=self)
 
-        for idx, row in enumerate(self.parent.proposed_scores_sheet.get_all_values()[1:], start=2):
+        for idx, row in enumerate((await sheets.get_values(self.parent.proposed_scores_sheet))[1:], start=2):
             if row and row[0].strip() == self.match["match_id"].strip():
-                self.parent.proposed_scores_sheet.delete_rows(idx)
+                await sheets.call(self.parent.proposed_scores_sheet.delete_rows, idx)
                 break
 
         try:
@@ -1190,16 +1182,20 @@ class LeaguePanel(View):
 
         with open("config.json") as f:
             self.config = json.load(f)
+        self._banned_sheet = None
+
+    async def user_context(self, member):
+        """Everything the panel buttons check about the clicking member, cached until it can change."""
+        if self._banned_sheet is None:
+            self._banned_sheet = await sheets.call(get_or_create_sheet, self.spreadsheet, "Banned", ["User ID", "Username", "Reason", "Banned By", "Date"])
+        return await get_user_context(member, self.bot.config, self.teams_sheet, self.players_sheet, self._banned_sheet)
 
-    def player_signed_up(self, user_id):
+    async def player_signed_up(self, user_id):
         user_id = str(user_id).strip()
-        for row in self.players_sheet.get_all_values()[1:]:  # Skip header
-            if len(row) > 0 and row[0].strip() == user_id:
-                return True
-        return False
+        return any(uid.strip() == user_id for uid in (await sheets.column(self.players_sheet, 1))[1:])  # Skip header
 
-    def team_exists(self, team_name):
-        return any(team[0].lower() == team_name.lower() for team in self.teams_sheet.get_all_values())
+    async def team_exists(self, team_name):
+        return any(name.lower() == team_name.lower() for name in await sheets.column(self.teams_sheet, 1))
 
     __all__ = ["SignupView", "AcceptDenyJoinRequestView"]
 
@@ -1207,23 +1203,17 @@ class LeaguePanel(View):
 
     @discord.ui.button(label="✅ Player Signup", style=discord.ButtonStyle.blurple, custom_id="league:player_signup", row=0)
     async def player_signup(self, interaction: discord.Interaction, button: discord.ui.Button):
-        user_id = str(interaction.user.id)
-        username = interaction.user.display_name
-
-        banned_sheet = get_or_create_sheet(self.spreadsheet, "Banned", ["User ID", "Username", "Reason", "Banned By", "Date"])
-        players_sheet = get_or_create_sheet(self.spreadsheet, "Players", ["User ID", "Username", "Role", "Timezone"])
+        ctx = await self.user_context(interaction.user)
 
         # ❌ Check if banned
-        if any(row[0] == user_id for row in banned_sheet.get_all_values()[1:]):
+        if ctx.is_banned:
             await interaction.response.send_message("❗ You are banned from signing up for the league.", ephemeral=True)
             return
 
         # ❌ Check if already signed up
-        existing_rows = [row for row in players_sheet.get_all_values()[1:] if row[0].strip() == user_id]
-
-        if existing_rows:
+        if ctx.signed_up:
             await interaction.response.send_message(
-                f"❗ You are already signed up as a **{existing_rows[0][2]}**. Unsign and resign to switch role.",
+                f"❗ You are already signed up as a **{ctx.role}**. Unsign and resign to switch role.",
                 ephemeral=True
             )
             return
@@ -1238,10 +1228,10 @@ class LeaguePanel(View):
 
     @discord.ui.button(label="🏷️ Create Team", style=discord.ButtonStyle.gray, custom_id="league:create_team", row=1)
     async def create_team(self, interaction: discord.Interaction, button: discord.ui.Button):
-        user_id = str(interaction.user.id)
+        ctx = await self.user_context(interaction.user)
 
         # ✅ Check if user is signed up
-        if not self.player_signed_up(user_id):
+        if not ctx.signed_up:
             if not interaction.response.is_done():
                 await interaction.response.send_message("❗ You must sign up for the league before creating a team.", ephemeral=True)
             else:
@@ -1249,8 +1239,7 @@ class LeaguePanel(View):
             return
 
         # ❌ Check if user has league sub role
-        sub_role = interaction.guild.get_role(self.bot.config.get("league_sub_role_id"))
-        if sub_role and sub_role in interaction.user.roles:
+        if ctx.is_sub:
             await interaction.response.send_message("❗ You cannot create a team as a league sub.", ephemeral=True)
             return
 
@@ -1265,15 +1254,12 @@ class LeaguePanel(View):
             return
 
         # Check if user is already a captain or team member
-        for row in self.teams_sheet.get_all_values()[1:]:
-            members = row[1:7]
-            for cell in members:
-                if extract_user_id(cell) == user_id:
-                    if cell == row[1]:
-                        await interaction.response.send_message("❗ You are already a captain. Disband or transfer captain role first.", ephemeral=True)
-                    else:
-                        await interaction.response.send_message("❗ You are already on a team. Leave your current team first.", ephemeral=True)
-                    return
+        if ctx.on_roster:
+            if ctx.is_captain:
+                await interaction.response.send_message("❗ You are already a captain. Disband or transfer captain role first.", ephemeral=True)
+            else:
+                await interaction.response.send_message("❗ You are already on a team. Leave your current team first.", ephemeral=True)
+            return
 
         class TeamNameModal(discord.ui.Modal, title="Create Team"):
             team_name = discord.ui.TextInput(label="Team Name", required=True)
@@ -1285,7 +1271,7 @@ class LeaguePanel(View):
 
             async def on_submit(self, modal_interaction: discord.Interaction):
                 team_name = self.team_name.value.strip()
-                existing_teams = [row[0].lower() for row in self.parent.teams_sheet.get_all_values()]
+                existing_teams = [row[0].lower() for row in await sheets.get_values(self.parent.teams_sheet)]
                 if team_name.lower() in existing_teams:
                     await modal_interaction.response.send_message("❗ Team already exists.", ephemeral=True)
                     return
@@ -1300,7 +1286,7 @@ class LeaguePanel(View):
 
                 min_players = self.parent.config.get("team_min_players", 3)
                 current_players = 1
-                self.parent.teams_sheet.append_row([
+                await sheets.call(self.parent.teams_sheet.append_row, [
                     team_name,
                     f"{modal_interaction.user.display_name} ({modal_interaction.user.id})",
                     "", "", "", "", "",
@@ -1325,13 +1311,8 @@ class LeaguePanel(View):
     @discord.ui.button(label="📅 Propose Match", style=discord.ButtonStyle.green, custom_id="league:propose_match", row=3)
     async def propose_match(self, interaction: discord.Interaction, button: discord.ui.Button):
         user_id = str(interaction.user.id)
-        user_team = None
-        co_captain_role_id = self.bot.config.get("co_captain_role_id")
-
-        for row in self.teams_sheet.get_all_values()[1:]:
-            if is_captain_or_cocap(user_id, interaction.user, row, co_captain_role_id):
-                user_team = row[0]
-                break
+        ctx = await self.user_context(interaction.user)
+        user_team = ctx.team_name if ctx.can_manage else None
 
         if not user_team:
             await interaction.response.send_message("❗ Only captains or authorized co-captains can propose matches.", ephemeral=True)
@@ -1600,7 +1581,7 @@ class LeaguePanel(View):
 
                         # 🌍 Resolve user's timezone
                         user_tz_name = None
-                        for row in self.parent_view.parent.players_sheet.get_all_values()[1:]:
+                        for row in (await sheets.get_values(self.parent_view.parent.players_sheet))[1:]:
                             if row[0].strip() == str(interaction.user.id) and len(row) > 3:
                                 user_tz_name = row[3]
                                 break
@@ -1646,7 +1627,7 @@ class LeaguePanel(View):
 
                     # Check duplicates
                     try:
-                        existing = self.parent_view.parent.proposed_sheet.get_all_values()[1:]
+                        existing = (await sheets.get_values(self.parent_view.parent.proposed_sheet))[1:]
                         for row in existing:
                             if (row[0] == self.parent_view.team_a and row[1] == self.parent_view.team_b) or \
                             (row[0] == self.parent_view.team_b and row[1] == self.parent_view.team_a):
@@ -1657,15 +1638,15 @@ class LeaguePanel(View):
 
                     # Match ID
                     try:
-                        league_week_sheet = get_or_create_sheet(self.parent_view.parent.spreadsheet, "LeagueWeek", ["League Week"])
-                        week_number = int(league_week_sheet.get_all_values()[1][0])
-                        weekly_sheet = get_or_create_sheet(self.parent_view.parent.spreadsheet, "Weekly Matches", [])
-                        matches_sheet = get_or_create_sheet(self.parent_view.parent.spreadsheet, "Matches", [])
+                        league_week_sheet = await sheets.call(get_or_create_sheet, self.parent_view.parent.spreadsheet, "LeagueWeek", ["League Week"])
+                        week_number = int((await sheets.get_values(league_week_sheet))[1][0])
+                        weekly_sheet = await sheets.call(get_or_create_sheet, self.parent_view.parent.spreadsheet, "Weekly Matches", [])
+                        matches_sheet = await sheets.call(get_or_create_sheet, self.parent_view.parent.spreadsheet, "Matches", [])
 
                         if not self.parent_view.is_challenge:
                             # ✅ ASSIGNED MATCH: Look up the correct match ID from Weekly Matches sheet
                             found_row = next(
-                                (row for row in weekly_sheet.get_all_values()[1:]
+                                (row for row in (await sheets.get_values(weekly_sheet))[1:]
                                 if {row[1].strip().lower(), row[2].strip().lower()} ==
                                     {self.parent_view.team_a.strip().lower(), self.parent_view.team_b.strip().lower()}
                                 and str(row[0]) == str(week_number)),
@@ -1681,7 +1662,7 @@ class LeaguePanel(View):
                             # ✅ CHALLENGE MATCH: Generate new ChallengeX-M### ID
                             prefix = f"Challenge{week_number}"
                             matches_this_week = [
-                                row for row in matches_sheet.get_all_values()[1:]
+                                row for row in (await sheets.get_values(matches_sheet))[1:]
                                 if row and row[0].startswith(f"{prefix}-M")
                             ]
                             match_number = len(matches_this_week) + 1
@@ -1694,7 +1675,7 @@ class LeaguePanel(View):
                     # Find captain
                     guild = interaction.guild
                     captain = None
-                    for row in self.parent_view.parent.teams_sheet.get_all_values()[1:]:
+                    for row in (await sheets.get_values(self.parent_view.parent.teams_sheet))[1:]:
                         if row[0].lower() == self.parent_view.team_b.lower():
                             try:
                                 id_str = row[1].split("(")[-1].replace(")", "").strip()
@@ -1714,7 +1695,7 @@ class LeaguePanel(View):
 
                         for team_name in [self.parent_view.team_a, self.parent_view.team_b]:
                             team_row = next(
-                                (r for r in self.parent_view.parent.teams_sheet.get_all_values()[1:] if r[0] == team_name), None
+                                (r for r in (await sheets.get_values(self.parent_view.parent.teams_sheet))[1:] if r[0] == team_name), None
                             )
                             if team_row:
                                 members = get_captains_and_cocaps(guild, team_row)
@@ -1755,7 +1736,7 @@ class LeaguePanel(View):
                         self.parent_view.parent.bot.add_view(view, message_id=msg.id)
 
                         # Log
-                        self.parent_view.parent.proposed_sheet.append_row([
+                        await sheets.call(self.parent_view.parent.proposed_sheet.append_row, [
                             match_id,
                             self.parent_view.team_a,
                             self.parent_view.team_b,
@@ -1765,7 +1746,7 @@ class LeaguePanel(View):
                             str(msg.id)
                         ])
                         if self.parent_view.is_challenge:
-                            self.parent_view.parent.challenge_sheet.append_row([
+                            await sheets.call(self.parent_view.parent.challenge_sheet.append_row, [
                                 week_number,
                                 match_id,
                                 self.parent_view.team_a,
@@ -1809,18 +1790,18 @@ class LeaguePanel(View):
 
                 # ✅ Challenge match weekly limit check
                 from datetime import datetime
-                challenge_sheet = get_or_create_sheet(
+                challenge_sheet = await sheets.call(get_or_create_sheet,
                     self.parent.spreadsheet,
                     "Challenge Matches",
                     ["Week", "Team A", "Team B", "Proposer ID", "Proposed Date", "Completion Date"]
                 )
 
-                league_week_sheet = get_or_create_sheet(self.parent.spreadsheet, "LeagueWeek", ["League Week"])
-                current_week = int(league_week_sheet.get_all_values()[1][0])
+                league_week_sheet = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "LeagueWeek", ["League Week"])
+                current_week = int((await sheets.get_values(league_week_sheet))[1][0])
                 weekly_limit = self.parent.config.get("weekly_challenge_limit", 2)
 
                 team_challenges = [
-                    row for row in challenge_sheet.get_all_values()[1:]
+                    row for row in (await sheets.get_values(challenge_sheet))[1:]
                     if str(row[0]) == str(current_week) and self.user_team in (row[1], row[2])
                 ]
 
@@ -1831,7 +1812,7 @@ class LeaguePanel(View):
                     )
                     return
 
-                for row in self.parent.teams_sheet.get_all_values()[1:]:
+                for row in (await sheets.get_values(self.parent.teams_sheet))[1:]:
                     team_name = row[0]
                     players = [p for p in row[1:] if p.strip()]
                     if team_name.lower() != self.user_team.lower() and len(players) >= self.parent.config.get("team_min_players", 3):
@@ -1878,7 +1859,7 @@ class LeaguePanel(View):
         user_id = str(interaction.user.id)
         user_team = None
 
-        for row in self.teams_sheet.get_all_values()[1:]:
+        for row in (await sheets.get_values(self.teams_sheet))[1:]:
             player_ids = [str(extract_user_id(p)).strip() for p in row[1:] if p]
             if user_id in player_ids:
                 user_team = row[0]
@@ -1889,9 +1870,9 @@ class LeaguePanel(View):
             return
 
 
-        weekly_matches = get_or_create_sheet(self.bot.spreadsheet, "Weekly Matches", ["Week", "Team A", "Team B", "Match ID", "Scheduled Date"])
+        weekly_matches = await sheets.call(get_or_create_sheet, self.bot.spreadsheet, "Weekly Matches", ["Week", "Team A", "Team B", "Match ID", "Scheduled Date"])
         assigned_opponents = []
-        for row in weekly_matches.get_all_values()[1:]:
+        for row in (await sheets.get_values(weekly_matches))[1:]:
             if row[1] == user_team:
                 assigned_opponents.append(row[2])
             elif row[2] == user_team:
@@ -1905,13 +1886,9 @@ class LeaguePanel(View):
     @discord.ui.button(label="🏆 Propose Score", style=discord.ButtonStyle.success, custom_id="league:propose_score", row=3)
     async def propose_score(self, interaction: discord.Interaction, button: discord.ui.Button):
         user_id = str(interaction.user.id)
-        user_team = None
         co_captain_role_id = self.bot.config.get("co_captain_role_id")
-
-        for row in self.teams_sheet.get_all_values()[1:]:
-            if is_captain_or_cocap(user_id, interaction.user, row, co_captain_role_id):
-                user_team = row[0]
-                break
+        ctx = await self.user_context(interaction.user)
+        user_team = ctx.team_name if ctx.can_manage else None
 
         if not user_team:
             await interaction.response.send_message("❗ Only captains or authorized co-captains can propose scores.", ephemeral=True)
@@ -2173,7 +2150,7 @@ class LeaguePanel(View):
                                 view = self.view_obj
                             else:
                                 text = self.view_obj.status_text() + "\n\n__**Note:**__ Use the dropdowns below to add league subs if any were used. Leave as None if no subs played.\n\nPlease confirm and submit your score proposal:"
-                                view = ConfirmProposalView(self.view_obj)
+                                view = await ConfirmProposalView.build(self.view_obj)
 
                             await self.view_obj.message.edit(content=text, view=view)
                         except discord.NotFound:
@@ -2184,7 +2161,7 @@ class LeaguePanel(View):
                     if current == 3:
                         try:
                             text = self.view_obj.status_text() + "\n\n__**Note:**__ Use the dropdowns below to add league subs if any were used. Leave as None if no subs played.\n\nPlease confirm and submit your score proposal:"
-                            view = ConfirmProposalView(self.view_obj)
+                            view = await ConfirmProposalView.build(self.view_obj)
                             await self.view_obj.message.edit(content=text, view=view)
                         except discord.NotFound:
                             print("❗ Cannot edit message: Message expired or deleted.")
@@ -2220,12 +2197,9 @@ class LeaguePanel(View):
                 team2 = self.match["team2"]
                 guild = interaction.guild
 
-                team_user_is_on = None
                 opponent_team = None
-                for row in self.parent.teams_sheet.get_all_values()[1:]:
-                    if f"({interaction.user.id})" in row[1]:
-                        team_user_is_on = row[0]
-                        break
+                membership = (await sheets.models(self.parent.teams_sheet, RosterIndex)).team_of(interaction.user.id)
+                team_user_is_on = membership.team.name if membership and membership.is_captain else None
 
                 if not team_user_is_on:
                     await interaction.followup.send("❗ You must be a team captain to submit scores.", ephemeral=True)
@@ -2233,7 +2207,7 @@ class LeaguePanel(View):
 
                 opponent_team = team2 if team_user_is_on == team1 else team1
                 opponent_captain = None
-                for row in self.parent.teams_sheet.get_all_values()[1:]:
+                for row in (await sheets.get_values(self.parent.teams_sheet))[1:]:
                     if row[0] == opponent_team:
                         try:
                             user_id = int(row[1].split("(")[-1].replace(")", "").strip())
@@ -2274,7 +2248,7 @@ class LeaguePanel(View):
                 category_id = self.parent.config.get("fallback_category_id")
                 members_to_add = []
                 for team_name in [team1, team2]:
-                    team_row = next((r for r in self.parent.teams_sheet.get_all_values()[1:] if r[0] == team_name), None)
+                    team_row = next((r for r in (await sheets.get_values(self.parent.teams_sheet))[1:] if r[0] == team_name), None)
                     if team_row:
                         members = get_captains_and_cocaps(guild, team_row)
                         members_to_add.extend(m for m in members if isinstance(m, discord.Member))
@@ -2317,12 +2291,11 @@ class LeaguePanel(View):
                         str(msg.id),
                         json.dumps(self.map_scores)
                     ]
-                    rows = safe_get_values(sheet)
-                    row_index = next((i + 2 for i, row in enumerate(rows[1:]) if row[0] == match_id), None)
+                    row_index = await sheets.find_row(sheet, match_id)
                     if row_index:
-                        sheet.update(f"A{row_index}:G{row_index}", [new_row])
+                        await sheets.call(sheet.update, f"A{row_index}:G{row_index}", [new_row])
                     else:
-                        sheet.append_row(new_row)
+                        await sheets.call(sheet.append_row, new_row)
                 except Exception as e:
                     print(f"❌ Failed to write to Proposed Scores: {e}")
 
@@ -2335,17 +2308,30 @@ class LeaguePanel(View):
                     pass  
         
         class ConfirmProposalView(discord.ui.View):
-            def __init__(self, map_view):
+            def __init__(self, map_view, leaderboard_rows, player_rows, player_leaderboard_rows):
                 super().__init__(timeout=300)
                 self.map_view = map_view
 
                 team1 = self.map_view.match["team1"]
                 team2 = self.map_view.match["team2"]
-                self.add_item(self.SubSelectDropdown(self, team1, "sub_a"))
-                self.add_item(self.SubSelectDropdown(self, team2, "sub_b"))
+                tabs = (leaderboard_rows, player_rows, player_leaderboard_rows)
+                self.add_item(self.SubSelectDropdown(self, team1, "sub_a", *tabs))
+                self.add_item(self.SubSelectDropdown(self, team2, "sub_b", *tabs))
                 self.add_item(self.SubmitButton(self))
                 self.add_item(self.BackButton(self))
 
+            @classmethod
+            async def build(cls, map_view):
+                # SubSelectDropdown is built from these tabs, read here so __init__ never touches the network;
+                # team ratings come from standings so results still waiting to be published count
+                parent = map_view.parent
+                board, *tabs = await asyncio.gather(
+                    standings.board(parent.leaderboard_sheet),
+                    sheets.get_values(parent.players_sheet),
+                    sheets.get_values(parent.bot.player_leaderboard_sheet),
+                )
+                return cls(map_view, board.values(), *tabs)
+
             class BackButton(discord.ui.Button):
                 def __init__(self, parent):
                     super().__init__(label="↩️ Go Back & Edit", style=discord.ButtonStyle.secondary)
@@ -2358,7 +2344,7 @@ class LeaguePanel(View):
                     )
 
             class SubSelectDropdown(discord.ui.Select):
-                def __init__(self, parent_view, team_name, match_key):
+                def __init__(self, parent_view, team_name, match_key, leaderboard_rows, player_rows, player_leaderboard_rows):
                     self.parent_view = parent_view
                     self.team_name = team_name
                     self.match_key = match_key
@@ -2367,17 +2353,17 @@ class LeaguePanel(View):
                     subs = []
                     try:
                         team_rating = 0
-                        for row in parent_view.map_view.parent.leaderboard_sheet.get_all_values()[1:]:
+                        for row in leaderboard_rows[1:]:
                             if row[0].strip().lower() == team_name.strip().lower():
                                 team_rating = float(row[1])
                                 break
 
-                        players = parent_view.map_view.parent.players_sheet.get_all_values()[1:]
+                        players = player_rows[1:]
                         for row in players:
                             if len(row) >= 3 and row[2].strip().lower() == "league sub":
                                 try:
                                     uid = row[0]
-                                    for prow in parent_view.map_view.parent.bot.player_leaderboard_sheet.get_all_values()[1:]:
+                                    for prow in player_leaderboard_rows[1:]:
                                         if len(prow) >= 3 and prow[1] == uid:
                                             try:
                                                 rating = float(prow[2])
@@ -2458,8 +2444,8 @@ class LeaguePanel(View):
 
 
         # Main logic
-        scheduled_sheet = self.spreadsheet.worksheet("Match Scheduled")
-        scheduled_matches = scheduled_sheet.get_all_values()[1:]
+        scheduled_sheet = await sheets.call(self.spreadsheet.worksheet, "Match Scheduled")
+        scheduled_matches = (await sheets.get_values(scheduled_sheet))[1:]
         user_id = str(interaction.user.id)
         matches = []
 
@@ -2487,7 +2473,7 @@ class LeaguePanel(View):
                 # Fallback: match by ID in captain cell of Teams sheet
                 co_captain_role_id = self.bot.config.get("co_captain_role_id")
 
-                for row in self.teams_sheet.get_all_values()[1:]:
+                for row in (await sheets.get_values(self.teams_sheet))[1:]:
                     team_name = row[0].strip()
 
                     if team_name == team1 or team_name == team2:
@@ -2521,30 +2507,25 @@ class LeaguePanel(View):
     
     @discord.ui.button(label="🔍 Ping Eligible Subs", style=discord.ButtonStyle.green, custom_id="league:find_subs", row=3)
     async def find_subs(self, interaction: discord.Interaction, button: discord.ui.Button):
-        user_id = str(interaction.user.id)
-        co_captain_role_id = self.bot.config.get("co_captain_role_id")
-        team_row = None
-
-        for row in self.teams_sheet.get_all_values()[1:]:
-            if any(f"({user_id})" in cell for cell in row[1:]):
-                team_row = row
-                break
+        ctx = await self.user_context(interaction.user)
+        team_row = ctx.team
 
         if not team_row:
             await interaction.response.send_message("❗ You are not currently on a team.", ephemeral=True)
             return
 
-        if not is_captain_or_cocap(user_id, interaction.user, team_row, co_captain_role_id):
+        if not ctx.can_manage:
             await interaction.response.send_message("❗ Only captains or co-captains can ping eligible subs.", ephemeral=True)
             return
 
-        team_name = team_row[0]
-        team_elo = next((int(r[1]) for r in self.leaderboard_sheet.get_all_values()[1:] if r[0].strip() == team_name), None)
+        team_name = team_row.name
+        team_elo = (await standings.board(self.leaderboard_sheet)).rating(team_name)
         if not team_elo:
             await interaction.response.send_message("❗ Could not find your team's ELO.", ephemeral=True)
             return
 
-        scheduled_matches = self.spreadsheet.worksheet("Match Scheduled").get_all_values()[1:]
+        scheduled_sheet = await sheets.call(self.spreadsheet.worksheet, "Match Scheduled")
+        scheduled_matches = (await sheets.get_values(scheduled_sheet))[1:]
         team_matches = []
         for row in scheduled_matches:
             if len(row) >= 4 and (row[1] == team_name or row[2] == team_name):
@@ -2586,28 +2567,18 @@ class LeaguePanel(View):
                 else:
                     time_str = time_raw  # fallback
 
-                players_sheet = self.parent.players_sheet.get_all_values()[1:]
-                elo_sheet = self.parent.bot.player_leaderboard_sheet.get_all_values()[1:]
+                players = await sheets.models(self.parent.players_sheet, PlayerRow)
+                elo_rows = await sheets.models(self.parent.bot.player_leaderboard_sheet, PlayerLeaderboardRow)
                 lower, upper = self.team_elo - 100, self.team_elo + 100
 
-                team_players = {
-                    cell.split("(")[-1].split(")")[0]
-                    for row in self.parent.teams_sheet.get_all_values()[1:]
-                    for cell in row[1:] if "(" in cell and ")" in cell
-                }
+                team_players = {uid for team in await sheets.models(self.parent.teams_sheet, TeamRow) for uid in team.player_ids}
+                league_subs = {p.user_id for p in players if p.role.strip().lower() == "league sub"}
 
                 eligible = []
-                for row in elo_sheet:
-                    try:
-                        name, uid, rating = row[0], row[1].strip(), int(row[2])
-                        if uid in team_players:
-                            continue
-                        player_row = next((r for r in players_sheet if r[0].strip() == uid and r[2].strip().lower() == "league sub"), None)
-                        if not player_row:
-                            continue
-                        eligible.append((name, uid, rating, row[3], row[4]))
-                    except:
+                for entry in elo_rows:
+                    if entry.user_id in team_players or entry.user_id not in league_subs:
                         continue
+                    eligible.append((entry.name, entry.user_id, entry.rating, str(entry.wins), str(entry.losses)))
 
                 eligible = sorted(eligible, key=lambda r: r[2], reverse=True)[:24]
                 if not eligible:
@@ -2637,24 +2608,22 @@ class LeaguePanel(View):
     @discord.ui.button(label="👥 Join Team", style=discord.ButtonStyle.blurple, custom_id="league:join_team", row=0)
     async def join_team(self, interaction: discord.Interaction, button: discord.ui.Button):
         user_id = str(interaction.user.id)
+        ctx = await self.user_context(interaction.user)
 
         # Check if user is signed up
-        if not self.player_signed_up(user_id):
+        if not ctx.signed_up:
             await interaction.response.send_message("❗ You must sign up for the league before joining a team.", ephemeral=True)
             return
         
         # ❌ Block league subs from joining teams
-        sub_role = interaction.guild.get_role(self.bot.config.get("league_sub_role_id"))
-        if sub_role and sub_role in interaction.user.roles:
+        if ctx.is_sub:
             await interaction.response.send_message("❗ League subs are not eligible to join teams.", ephemeral=True)
             return
         
         # ✅ Already on team check (NEW position)
-        for row in self.teams_sheet.get_all_values()[1:]:
-            for cell in row[1:7]:
-                if extract_user_id(cell) == user_id:
-                    await interaction.response.send_message("❗ You are already on a team.", ephemeral=True)
-                    return
+        if ctx.on_roster:
+            await interaction.response.send_message("❗ You are already on a team.", ephemeral=True)
+            return
         
         # Roster Lock Check
         if is_roster_locked(self.bot.config):
@@ -2673,7 +2642,7 @@ class LeaguePanel(View):
 
             async def on_submit(self, interaction: discord.Interaction):
                 search = self.query.value.lower()
-                all_teams = [row[0] for row in self.parent_view.teams_sheet.get_all_values() if row[0]]
+                all_teams = [row[0] for row in await sheets.get_values(self.parent_view.teams_sheet) if row[0]]
 
                 matches = [team for team in all_teams if search in team.lower()]
                 if not matches:
@@ -2698,14 +2667,14 @@ class LeaguePanel(View):
             async def select_team(self, interaction: discord.Interaction):
                 selected_team = self.children[0].values[0]
 
-                for row in self.parent_view.teams_sheet.get_all_values()[1:]:
+                for row in (await sheets.get_values(self.parent_view.teams_sheet))[1:]:
                     members = row[1:7]
                     for cell in members:
                         if extract_user_id(cell) == str(self.user.id):
                             await interaction.response.send_message("❗ You are already on a team.", ephemeral=True)
                             return
                 # ✅ Get current player count for the selected team
-                for row in self.parent_view.teams_sheet.get_all_values()[1:]:
+                for row in (await sheets.get_values(self.parent_view.teams_sheet))[1:]:
                     if row[0].lower() == selected_team.lower():
                         player_cells = row[2:7]
                         current_players = [p for p in player_cells if p.strip()]
@@ -2725,7 +2694,7 @@ class LeaguePanel(View):
                     return
 
                 captain = None
-                for row in self.parent_view.teams_sheet.get_all_values()[1:]:
+                for row in (await sheets.get_values(self.parent_view.teams_sheet))[1:]:
                     if row[0].lower() == selected_team.lower():
                         try:
                             user_id_str = row[1].split("(")[-1].replace(")", "").strip()
@@ -2823,7 +2792,7 @@ class LeaguePanel(View):
     async def leave_team(self, interaction: discord.Interaction, button: discord.ui.Button):
         user_id = str(interaction.user.id)
 
-        for idx, row in enumerate(self.teams_sheet.get_all_values(), 1):
+        for idx, row in enumerate(await sheets.get_values(self.teams_sheet), 1):
             if idx == 1 or not row or not row[0].strip():
                 continue
 
@@ -2849,13 +2818,13 @@ class LeaguePanel(View):
 
                     # Write updated row back to sheet
                     col_end = chr(ord('A') + len(updated_row) - 1)
-                    self.teams_sheet.update(f"A{idx}:{col_end}{idx}", [updated_row])
+                    await sheets.call(self.teams_sheet.update, f"A{idx}:{col_end}{idx}", [updated_row])
 
                     # 🧼 Clear Co-Captain column (I) if user was listed there
                     try:
-                        cocap_cell = self.teams_sheet.cell(idx, 9).value  # Column I
+                        cocap_cell = (await sheets.call(self.teams_sheet.cell, idx, 9)).value  # Column I
                         if cocap_cell and f"({user_id})" in cocap_cell:
-                            self.teams_sheet.update_cell(idx, 9, "")
+                            await sheets.call(self.teams_sheet.update_cell, idx, 9, "")
                     except Exception as e:
                         print(f"⚠️ Failed to clear Co-Captain column during leave: {e}")
 
@@ -2898,16 +2867,14 @@ class LeaguePanel(View):
         user_id = str(interaction.user.id)
 
         # Check if on a team first
-        for team in self.teams_sheet.get_all_values():
-            for cell in team[1:]:
-                if extract_user_id(cell) == user_id:
-                    await interaction.response.send_message("❗ You are currently on a team. Leave your team before unsigning.", ephemeral=True)
-                    return
+        if (await self.user_context(interaction.user)).membership:
+            await interaction.response.send_message("❗ You are currently on a team. Leave your team before unsigning.", ephemeral=True)
+            return
 
         # Remove from player sheet
-        for idx, row in enumerate(self.players_sheet.get_all_values()[1:], start=2):
+        for idx, row in enumerate((await sheets.get_values(self.players_sheet))[1:], start=2):
             if len(row) > 0 and row[0].strip() == user_id:
-                self.players_sheet.delete_rows(idx)
+                await sheets.call(self.players_sheet.delete_rows, idx)
 
                 # 🧼 Remove roles
                 guild = interaction.guild
@@ -2940,7 +2907,7 @@ class LeaguePanel(View):
     async def promote_player(self, interaction: discord.Interaction, button: discord.ui.Button):
         username_id = f"{interaction.user.display_name} ({interaction.user.id})"
 
-        for idx, team in enumerate(self.teams_sheet.get_all_values(), 1):
+        for idx, team in enumerate(await sheets.get_values(self.teams_sheet), 1):
             if team[1] == username_id:
                 team_name = team[0]
                 members = [player for player in team[1:] if player]
@@ -2976,10 +2943,11 @@ class LeaguePanel(View):
 
                     async def select_role_type(self, i):
                         role_type = i.data['values'][0]
-                        await i.response.edit_message(content=f"Select player to promote to **{role_type.replace('_', ' ').title()}**:", view=PromoteSelect(self.parent, self.team_name, self.old_captain, self.team_idx, role_type, self.invoker_id))
+                        row = await sheets.row_values(self.parent.teams_sheet, self.team_idx)
+                        await i.response.edit_message(content=f"Select player to promote to **{role_type.replace('_', ' ').title()}**:", view=PromoteSelect(self.parent, self.team_name, self.old_captain, self.team_idx, role_type, self.invoker_id, row))
 
                 class PromoteSelect(discord.ui.View):
-                    def __init__(self, parent, team_name, old_captain, team_idx, role_type, invoker_id):
+                    def __init__(self, parent, team_name, old_captain, team_idx, role_type, invoker_id, row):
                         super().__init__(timeout=None)
                         self.parent = parent
                         self.team_name = team_name
@@ -2988,9 +2956,8 @@ class LeaguePanel(View):
                         self.role_type = role_type  # "captain" or "co_captain"
                         self.invoker_id = str(invoker_id)
 
-                        # Fetch team row
-                        row = parent.teams_sheet.row_values(team_idx)
-                        row += [""] * (7 - len(row))  # Ensure row has at least 7 cells
+                        # Team row, read by the caller
+                        row = list(row) + [""] * (7 - len(row))  # Ensure row has at least 7 cells
 
                         # Get current guild
                         guild = parent.bot.get_guild(parent.bot.config["guild_id"])
@@ -3033,7 +3000,7 @@ class LeaguePanel(View):
                             await select_interaction.response.send_message("❌ User not found in the server.", ephemeral=True)
                             return
 
-                        row = self.parent.teams_sheet.row_values(self.team_idx)
+                        row = await sheets.call(self.parent.teams_sheet.row_values, self.team_idx)
                         row += [""] * (7 - len(row))  # pad to ensure at least 7 cells
 
                         # Prevent duplicate promotion
@@ -3089,12 +3056,12 @@ class LeaguePanel(View):
                                 # Fallback: overwrite if not found
                                 row[1] = f"{new_member.display_name} ({new_member.id})"
 
-                            self.parent.teams_sheet.update(f"A{self.team_idx}:G{self.team_idx}", [row[:7]])
+                            await sheets.call(self.parent.teams_sheet.update, f"A{self.team_idx}:G{self.team_idx}", [row[:7]])
                             # 🧼 Clear Co-Captain column (I) if the promoted user was listed there
                             try:
-                                cocap_cell = self.parent.teams_sheet.cell(self.team_idx, 9).value  # Column I = 9
+                                cocap_cell = (await sheets.call(self.parent.teams_sheet.cell, self.team_idx, 9)).value  # Column I = 9
                                 if cocap_cell and f"({new_user_id})" in cocap_cell:
-                                    self.parent.teams_sheet.update_cell(self.team_idx, 9, "")
+                                    await sheets.call(self.parent.teams_sheet.update_cell, self.team_idx, 9, "")
                             except Exception as e:
                                 print(f"⚠️ Failed to clear Co-Captain column after Captain promotion: {e}")
 
@@ -3126,18 +3093,18 @@ class LeaguePanel(View):
                                 # Fallback: just overwrite Player 2
                                 row[2] = f"{new_member.display_name} ({new_member.id})"
 
-                            self.parent.teams_sheet.update(f"A{self.team_idx}:G{self.team_idx}", [row[:7]])
+                            await sheets.call(self.parent.teams_sheet.update, f"A{self.team_idx}:G{self.team_idx}", [row[:7]])
                             # 🆕 Update Co-Captain column (column I → column 9) with name and ID format
                             try:
                                 new_value = f"{new_member.display_name} ({new_member.id})"
 
                                 # Clear old co-captain if it's the same
-                                current_value = self.parent.teams_sheet.cell(self.team_idx, 9).value
+                                current_value = (await sheets.call(self.parent.teams_sheet.cell, self.team_idx, 9)).value
                                 if current_value and old_cocap_id and f"({old_cocap_id})" in current_value:
-                                    self.parent.teams_sheet.update_cell(self.team_idx, 9, "")
+                                    await sheets.call(self.parent.teams_sheet.update_cell, self.team_idx, 9, "")
 
                                 # Set new co-captain
-                                self.parent.teams_sheet.update_cell(self.team_idx, 9, new_value)
+                                await sheets.call(self.parent.teams_sheet.update_cell, self.team_idx, 9, new_value)
                             except Exception as e:
                                 print(f"⚠️ Failed to update Co-Captain column: {e}")
 
@@ -3187,7 +3154,7 @@ class LeaguePanel(View):
         user_id = str(interaction.user.id)
         display_name = interaction.user.display_name
 
-        for team_row in self.teams_sheet.get_all_values()[1:]:
+        for team_row in (await sheets.get_values(self.teams_sheet))[1:]:
             team_name = team_row[0]
             team_captain_raw = team_row[1]
             captain_id = extract_user_id(team_captain_raw)
@@ -3246,7 +3213,7 @@ class LeaguePanel(View):
 
                         # 👑 Remove captain role
                         try:
-                            captain_id = extract_user_id(self.parent_view.teams_sheet.get_all_values()[self.row_index - 1][1])
+                            captain_id = extract_user_id((await sheets.get_values(self.parent_view.teams_sheet))[self.row_index - 1][1])
                             if captain_role and captain_id:
                                 member = guild.get_member(int(captain_id))
                                 if member and captain_role in member.roles:
@@ -3270,18 +3237,14 @@ class LeaguePanel(View):
 
                         # 🧼 Remove from Teams sheet
                         try:
-                            self.parent_view.teams_sheet.delete_rows(self.row_index)
+                            await sheets.call(self.parent_view.teams_sheet.delete_rows, self.row_index)
                         except Exception as e:
                             print(f"⚠️ Could not delete team row: {e}")
 
                         # 🗑️ Remove from Leaderboard
                         try:
-                            rows = self.bot.leaderboard_sheet.get_all_values()
-                            for idx, row in enumerate(rows, start=1):
-                                if row and row[0].strip().lower() == self.team_name.strip().lower():
-                                    self.bot.leaderboard_sheet.delete_rows(idx)
-                                    print(f"[🗑️] Removed {self.team_name} from Leaderboard.")
-                                    break
+                            if await standings.remove(self.bot.leaderboard_sheet, self.team_name.strip(), self.bot.config):
+                                print(f"[🗑️] Removed {self.team_name} from Leaderboard.")
                         except Exception as e:
                             print(f"❗ Failed to remove {self.team_name} from Leaderboard: {e}")
 
@@ -3310,7 +3273,7 @@ class LeaguePanel(View):
                             print(f"❗ Failed to send disband notification: {e}")
 
                 cached_row = team_row.copy()
-                row_index = self.teams_sheet.get_all_values().index(team_row) + 1
+                row_index = (await sheets.get_values(self.teams_sheet)).index(team_row) + 1
                 await interaction.response.send_modal(
                     DisbandModal(self, self.bot, team_name, row_index, cached_row)
                 )
@@ -3327,7 +3290,7 @@ class LeaguePanel(View):
         row_index = None
 
         # 🔍 Find the team this user is captain of (or dev)
-        for idx, row in enumerate(self.teams_sheet.get_all_values(), 1):
+        for idx, row in enumerate(await sheets.get_values(self.teams_sheet), 1):
             if idx == 1:
                 continue  # skip header
             team_name = row[0]
@@ -3393,12 +3356,12 @@ class LeaguePanel(View):
                         updated_row.append("")
 
                     col_end = chr(ord('A') + len(self.original_row) - 1)
-                    self.parent.teams_sheet.update(f"A{self.row_index}:{col_end}{self.row_index}", [updated_row])
+                    await sheets.call(self.parent.teams_sheet.update, f"A{self.row_index}:{col_end}{self.row_index}", [updated_row])
                     # 🧼 Clear Co-Captain column (I) if this was the co-captain
                     try:
-                        cocap_cell = self.parent.teams_sheet.cell(self.row_index, 9).value  # column I
+                        cocap_cell = (await sheets.call(self.parent.teams_sheet.cell, self.row_index, 9)).value  # column I
                         if cocap_cell and f"({kicked_user_id})" in cocap_cell:
-                            self.parent.teams_sheet.update_cell(self.row_index, 9, "")
+                            await sheets.call(self.parent.teams_sheet.update_cell, self.row_index, 9, "")
                     except Exception as e:
                         print(f"⚠️ Failed to clear co-captain column during kick: {e}")
 
@@ -3452,14 +3415,11 @@ class LeaguePanel(View):
             return
 
         user_id = str(user.id)
-        scheduled_matches = self.scheduled_sheet.get_all_values()[1:]
+        scheduled_matches = (await sheets.get_values(self.scheduled_sheet))[1:]
 
         # 🔍 Find user's team
-        user_team_name = None
-        for row in self.teams_sheet.get_all_values()[1:]:
-            if any(f"({user_id})" in cell for cell in row[1:7]):
-                user_team_name = row[0]
-                break
+        ctx = await self.user_context(user)
+        user_team_name = ctx.team_name if ctx.on_roster else None
 
         if not user_team_name:
             await safe_send(interaction, "❗ Could not find your team. Are you listed on the Teams sheet?", ephemeral=True)
@@ -3527,8 +3487,10 @@ class LeaguePanel(View):
                 notify_id = self.config.get("notifications_channel_id")
                 notify_channel = self.bot.get_channel(notify_id)
 
+                team_rows = await sheets.get_values(self.teams_sheet)
+
                 def mention_team(team):
-                    row = next((r for r in self.teams_sheet.get_all_values() if r[0] == team), [])
+                    row = next((r for r in team_rows if r[0] == team), [])
                     mentions = [f"<@{p.split('(')[-1].split(')')[0]}>" for p in row[1:] if "(" in p and ")" in p]
                     return " ".join(mentions) if mentions else team
 
@@ -3555,11 +3517,8 @@ class LeaguePanel(View):
         user_id = str(user.id)
 
         # ✅ Find user's team
-        team_name = None
-        for row in self.teams_sheet.get_all_values()[1:]:
-            if any(f"({user_id})" in cell for cell in row[1:7]):
-                team_name = row[0]
-                break
+        ctx = await self.user_context(user)
+        team_name = ctx.team_name if ctx.on_roster else None
 
         if not team_name:
             await interaction.response.send_message("❗ You must be on a team to open a ticket.", ephemeral=True)
@@ -3818,22 +3777,20 @@ class LeaguePanel(View):
     
     @discord.ui.button(label="✏️ Change Team Name", style=discord.ButtonStyle.gray, custom_id="league:rename_team", row=1)
     async def rename_team(self, interaction: discord.Interaction, button: discord.ui.Button):
-        user_id = str(interaction.user.id)
         team_row = None
         row_idx = None
 
         # 🔍 Find the team where the user is the captain
-        for idx, row in enumerate(self.teams_sheet.get_all_values(), 1):
-            if row and f"({user_id})" in row[1]:  # column 1 = captain
-                team_row = row
-                row_idx = idx
-                break
+        ctx = await self.user_context(interaction.user)
+        if ctx.is_captain:
+            team_row = ctx.team
+            row_idx = team_row.row
 
         if not team_row:
             await interaction.response.send_message("❗ Only team captains can rename their team.", ephemeral=True)
             return
 
-        old_team_name = team_row[0]
+        old_team_name = team_row.name
 
         class RenameTeamModal(discord.ui.Modal, title="Change Team Name"):
             new_name = discord.ui.TextInput(label="New Team Name", required=True, max_length=32)
@@ -3866,12 +3823,12 @@ class LeaguePanel(View):
 
                 # 📋 Get or create the rename log sheet
                 try:
-                    log_sheet = self.parent.spreadsheet.worksheet("Team Rename Log")
+                    log_sheet = await sheets.call(self.parent.spreadsheet.worksheet, "Team Rename Log")
                 except:
-                    log_sheet = self.parent.spreadsheet.add_worksheet(title="Team Rename Log", rows="100", cols="3")
-                    log_sheet.append_row(["Role ID", "Team Name", "Last Rename UTC"])
+                    log_sheet = await sheets.call(self.parent.spreadsheet.add_worksheet, title="Team Rename Log", rows="100", cols="3")
+                    await sheets.call(log_sheet.append_row, ["Role ID", "Team Name", "Last Rename UTC"])
 
-                log_data = log_sheet.get_all_records()
+                log_data = await sheets.call(log_sheet.get_all_records)
 
                 # 🔒 Check if this role is on cooldown
                 for entry in log_data:
@@ -3889,7 +3846,7 @@ class LeaguePanel(View):
 
                 try:
                     # ❌ Duplicate name check
-                    all_teams = [r[0].lower() for r in self.parent.teams_sheet.get_all_values()[1:] if r]
+                    all_teams = [r[0].lower() for r in (await sheets.get_values(self.parent.teams_sheet))[1:] if r]
                     if new_team_name.lower() in all_teams:
                         msg = "❗ That team name is already taken."
                         if interaction.response.is_done():
@@ -3899,20 +3856,25 @@ class LeaguePanel(View):
                         return
 
                     # 📝 Rename in Teams sheet
-                    self.parent.teams_sheet.update_cell(self.row_idx, 1, new_team_name)
-                    self.rename_team_everywhere(self.parent.spreadsheet, self.old_name, new_team_name)
+                    await sheets.call(self.parent.teams_sheet.update_cell, self.row_idx, 1, new_team_name)
+                    await standings.rename(self.parent.leaderboard_sheet, self.old_name, new_team_name, self.parent.bot.config)
+                    await sheets.call(self.rename_team_everywhere, self.parent.spreadsheet, self.old_name, new_team_name)
+                    pair_history.rename(self.old_name, new_team_name)
+                    ratings.periods.rename(self.old_name, new_team_name)
+                    standings.rename_adjustments(self.old_name, new_team_name)
 
                     # 🧠 Update or append cooldown log
                     updated = False
                     for i, entry in enumerate(log_data, start=2):  # skip header
                         if str(entry["Role ID"]).strip() == role_id:
-                            log_sheet.update_cell(i, 2, new_team_name)  # Update name
-                            log_sheet.update_cell(i, 3, now.strftime("%Y-%m-%d %H:%M:%S"))
+                            async with sheets.batch(log_sheet) as writes:
+                                writes.update_cell(i, 2, new_team_name)  # Update name
+                                writes.update_cell(i, 3, now.strftime("%Y-%m-%d %H:%M:%S"))
                             updated = True
                             break
 
                     if not updated:
-                        log_sheet.append_row([role_id, new_team_name, now.strftime("%Y-%m-%d %H:%M:%S")])
+                        await sheets.call(log_sheet.append_row, [role_id, new_team_name, now.strftime("%Y-%m-%d %H:%M:%S")])
 
                     # 🏷️ Rename the Discord role
                     try:
@@ -3948,8 +3910,9 @@ class LeaguePanel(View):
 
             @staticmethod
             def rename_team_everywhere(spreadsheet, old_name, new_name):
+                # The Leaderboard is renamed through standings.rename
                 target_sheets = [
-                    "Leaderboard", "Matches", "Match Scheduled", "Weekly Matches",
+                    "Matches", "Match Scheduled", "Weekly Matches",
                     "Scoring", "Proposed Scores", "Match History", "Challenge Matches"
                 ]
                 for sheet_name in target_sheets:
@@ -3974,21 +3937,15 @@ class LeaguePanel(View):
     
     #@discord.ui.button(label="📡 Set Team Status", style=discord.ButtonStyle.gray, custom_id="league:set_team_status", row=2)
     async def set_team_status(self, interaction: discord.Interaction, button: discord.ui.Button):
-        user_id = str(interaction.user.id)
-        co_captain_role_id = self.bot.config.get("co_captain_role_id")
-        team_row = None
-
         # 🔍 Find team where user is captain or co-captain
-        for row in self.teams_sheet.get_all_values()[1:]:
-            if is_captain_or_cocap(user_id, interaction.user, row, co_captain_role_id):
-                team_row = row
-                break
+        ctx = await self.user_context(interaction.user)
+        team_row = ctx.team if ctx.can_manage else None
 
         if not team_row:
             await interaction.response.send_message("❗ Only captains or co-captains can change team status.", ephemeral=True)
             return
 
-        team_name = team_row[0]
+        team_name = team_row.name
 
         class StatusSelect(discord.ui.View):
             def __init__(self, parent, team_name):
@@ -4010,19 +3967,19 @@ class LeaguePanel(View):
                 status_value = i.data['values'][0]
 
                 # Find row and update status column (assume it's column H = index 8)
-                for idx, row in enumerate(self.parent.teams_sheet.get_all_values()[1:], start=2):
+                for idx, row in enumerate((await sheets.get_values(self.parent.teams_sheet))[1:], start=2):
                     if row[0] == self.team_name:
                         while len(row) < 8:
                             row.append("")  # pad missing columns
-                        self.parent.teams_sheet.update_cell(idx, 8, status_value)
+                        await sheets.call(self.parent.teams_sheet.update_cell, idx, 8, status_value)
                         break
 
                 await i.response.send_message(f"✅ Set **{self.team_name}** status to `{status_value}`.", ephemeral=True)
 
                 # ⬇️ Attempt to mention the captain
                 try:
-                    teams_sheet = get_or_create_sheet(self.parent.spreadsheet, "Teams", [])
-                    team_row = next((r for r in teams_sheet.get_all_values()[1:] if r[0] == self.team_name), None)
+                    teams_sheet = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Teams", [])
+                    team_row = next((r for r in (await sheets.get_values(teams_sheet))[1:] if r[0] == self.team_name), None)
 
                     captain_mention = self.team_name
                     if team_row and len(team_row) > 1 and "(" in team_row[1] and ")" in team_row[1]:
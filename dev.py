@@ -1,8 +1,10 @@
 import discord
-from discord.ui import View, Modal, TextInput
+from discord.ui import View, TextInput
 from discord import app_commands, Interaction, PermissionOverwrite
 from discord.utils import get
 import json
+import sheets
+from rows import TeamRow
 
 with open("config.json") as f:
     config = json.load(f)
@@ -17,10 +19,17 @@ def get_or_create_sheet(spreadsheet, name, headers):
 
 async def check_dev(interaction, dev_ids):
     if interaction.user.id in dev_ids or any(role.id in dev_ids for role in interaction.user.roles):
+        sheets.set_lane("dev")
         return True
     await interaction.response.send_message("❗ No permission.", ephemeral=True)
     return False
 
+# Dev tool modals queue their Sheets calls behind captains' clicks
+class Modal(discord.ui.Modal):
+    async def interaction_check(self, interaction):
+        sheets.set_lane("dev")
+        return True
+
 # ✅✅✅ UNIVERSAL SAFE VIEW BASE (TRUE SAFE SEND)
 class SafeView(View):
     async def safe_send(self, interaction, content):
@@ -58,24 +67,21 @@ async def cast(interaction: Interaction, match_id: str):
         await interaction.followup.send("❗ You do not have permission to use this command.", ephemeral=True)
         return
 
-    try:
-        import gspread
-        from oauth2client.service_account import ServiceAccountCredentials
-
-        scope = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-        client = gspread.authorize(creds)
-        spreadsheet = client.open(config["sheet_name"])
+    @sheets.idempotent
+    def open_sheets():
+        # Shared client and cached handles, so this is usually answered from the snapshot cache
+        spreadsheet = sheets.open_spreadsheet(config["sheet_name"])
         matches_sheet = spreadsheet.worksheet("Matches")
         teams_sheet = spreadsheet.worksheet("Teams")
+        return matches_sheet.get_all_values(), teams_sheet.models(TeamRow)
+
+    try:
+        match_rows, teams = await sheets.call(open_sheets)
     except Exception as e:
         await interaction.followup.send(f"❌ Failed to access spreadsheet: {e}", ephemeral=True)
         return
 
-    match_row = next((row for row in matches_sheet.get_all_values() if row[0].strip() == match_id.strip()), None)
+    match_row = next((row for row in match_rows if row[0].strip() == match_id.strip()), None)
     if not match_row:
         await interaction.followup.send(f"❌ Match ID `{match_id}` not found.", ephemeral=True)
         return
@@ -83,11 +89,8 @@ async def cast(interaction: Interaction, match_id: str):
     team_a, team_b = match_row[1], match_row[2]
 
     def get_team_members(team_name):
-        row = next((r for r in teams_sheet.get_all_values() if r[0].strip() == team_name.strip()), None)
-        return [
-            int(cell.split("(")[-1].split(")")[0])
-            for cell in row[1:] if "(" in cell and ")" in cell
-        ] if row else []
+        team = next((t for t in teams if t.name == team_name.strip()), None)
+        return [int(user_id) for user_id in team.player_ids] if team else []
 
     guild = interaction.guild
     overwrites = {
@@ -116,30 +119,13 @@ async def cast(interaction: Interaction, match_id: str):
         )
         # 🔔 Notify captains/co-captains with info message
         def get_mention_list(team_name):
-            row = next((r for r in teams_sheet.get_all_values() if r[0].strip() == team_name.strip()), None)
-            if not row:
+            team = next((t for t in teams if t.name == team_name.strip()), None)
+            if not team:
                 return ""
 
-            mentions = set()
-
-            # Player slots (columns B to G → indices 1–6)
-            for cell in row[1:7]:
-                if "(" in cell and ")" in cell:
-                    try:
-                        user_id = cell.split("(")[-1].split(")")[0]
-                        mentions.add(f"<@{user_id}>")
-                    except Exception:
-                        continue
-
-            # Co-captain column (I → index 8)
-            if len(row) > 8 and "(" in row[8] and ")" in row[8]:
-                try:
-                    user_id = row[8].split("(")[-1].split(")")[0]
-                    mentions.add(f"<@{user_id}>")
-                except Exception:
-                    pass
-
-            return " ".join(mentions)
+            # Player slots (columns B to G) plus the co-captain column (I)
+            user_ids = team.player_ids + ([team.cocaptain_id] if team.cocaptain_id else [])
+            return " ".join({f"<@{user_id}>" for user_id in user_ids})
 
         team_a_mentions = get_mention_list(team_a)
         team_b_mentions = get_mention_list(team_b)
@@ -183,29 +169,75 @@ class DevPanel_Match(SafeView):
 
             async def on_submit(self, i):
                 import match
-                from datetime import datetime
 
                 try:
                     league_week = int(self.week.value)
                 except ValueError:
-                    await self.parent.safe_send(i, "❗ Please enter a valid League Week number (e.g. 1, 2, 3).", ephemeral=True)
+                    await self.parent.safe_send(i, "❗ Please enter a valid League Week number (e.g. 1, 2, 3).")
                     return
 
-                # ✅ Save to LeagueWeek sheet
-                league_week_sheet = get_or_create_sheet(
-                    self.parent.spreadsheet,
-                    "LeagueWeek",
-                    ["League Week"]
-                )
+                # 🧪 Dry run first: forfeits and pairings from the cached snapshot, no writes
+                await i.response.defer(ephemeral=True, thinking=True)
+                plan = await match.plan_weekly_matches(self.parent.spreadsheet, league_week, force=True)
+                parent = self.parent
+
+                class ConfirmWeekly(View):
+                    def __init__(self, plan):
+                        super().__init__(timeout=600)
+                        self.plan = plan
+
+                    async def interaction_check(self, interaction):
+                        sheets.set_lane("dev")
+                        return True
+
+                    async def close(self, interaction, content):
+                        for item in self.children:
+                            item.disabled = True
+                        await interaction.response.edit_message(content=content, view=self)
+                        self.stop()
+
+                    @discord.ui.button(label="✅ Confirm & Publish", style=discord.ButtonStyle.red)
+                    async def confirm(self, ci, button):
+                        await self.close(ci, self.plan.preview() + "\n⏳ Checking nothing changed, then publishing...")
+
+                        # 🔁 Scores, forfeits or roster changes since the preview would make it stale
+                        fresh = await match.plan_weekly_matches(parent.spreadsheet, league_week, force=True)
+                        if not fresh.same_as(self.plan):
+                            await ci.followup.send(
+                                "⚠️ The league changed since that preview, nothing was written. Updated preview:\n" + fresh.preview(),
+                                view=ConfirmWeekly(fresh), ephemeral=True,
+                            )
+                            return
 
-                try:
-                    league_week_sheet.update_cell(2, 1, league_week)
-                except Exception as e:
-                    await self.parent.safe_send(i, f"❗ Failed to update LeagueWeek sheet: {e}", ephemeral=True)
-                    return
+                        try:
+                            published = await match.apply_weekly_plan(ci, parent.spreadsheet, fresh)
+                        except Exception as e:
+                            await parent.safe_send(ci, f"❗ Publishing Week {league_week} failed, League Week not changed: {e}")
+                            return
+                        if not published:
+                            return
+
+                        # ✅ Save to LeagueWeek sheet once the week is out
+                        league_week_sheet = await sheets.call(
+                            get_or_create_sheet,
+                            parent.spreadsheet,
+                            "LeagueWeek",
+                            ["League Week"]
+                        )
 
-                await self.parent.safe_send(i, f"✅ League Week set to {league_week}. Generating matchups...")
-                await match.generate_weekly_matches(i, self.parent.spreadsheet, league_week, force=True)
+                        try:
+                            await sheets.call(league_week_sheet.update_cell, 2, 1, league_week)
+                        except Exception as e:
+                            await parent.safe_send(ci, f"❗ Matchups published, but failed to update LeagueWeek sheet: {e}")
+                            return
+
+                        await parent.safe_send(ci, f"✅ League Week set to {league_week}.")
+
+                    @discord.ui.button(label="✖️ Cancel", style=discord.ButtonStyle.gray)
+                    async def cancel(self, ci, button):
+                        await self.close(ci, "✖️ Weekly generation cancelled. Nothing was written.")
+
+                await i.followup.send(plan.preview(), view=ConfirmWeekly(plan), ephemeral=True)
 
         await interaction.response.send_modal(ForceWeeklyMatchups(self))
 
@@ -217,12 +249,13 @@ class DevPanel_Match(SafeView):
             config = json.load(f)
 
         match_channel = interaction.guild.get_channel(int(config.get("match_channel_id")))
-        match_sheet = get_or_create_sheet(self.spreadsheet, "Matches", ["Match ID", "Team A", "Team B", "Proposed Date", "Scheduled Date", "Status", "Winner", "Loser", "Proposed By"])
-        team_sheet = get_or_create_sheet(self.spreadsheet, "Teams", ["Team Name", "Captain", "Player 2", "Player 3", "Player 4", "Player 5", "Player 6"])
+        match_sheet = await sheets.call(get_or_create_sheet, self.spreadsheet, "Matches", ["Match ID", "Team A", "Team B", "Proposed Date", "Scheduled Date", "Status", "Winner", "Loser", "Proposed By"])
+        team_sheet = await sheets.call(get_or_create_sheet, self.spreadsheet, "Teams", ["Team Name", "Captain", "Player 2", "Player 3", "Player 4", "Player 5", "Player 6"])
+        team_rows = await sheets.get_values(team_sheet)
 
         # Helper to get mentions for a team
         def get_mentions(team_name):
-            row = next((r for r in team_sheet.get_all_values() if r[0] == team_name), None)
+            row = next((r for r in team_rows if r[0] == team_name), None)
             if not row:
                 return ""
             mentions = []
@@ -236,7 +269,7 @@ class DevPanel_Match(SafeView):
 
         seen_matches = set()
 
-        for row in match_sheet.get_all_values()[1:]:
+        for row in (await sheets.get_values(match_sheet))[1:]:
             team_a, team_b = row[1], row[2]
             match_key = tuple(sorted([team_a, team_b]))  # ensures A vs B == B vs A
 
@@ -270,57 +303,57 @@ class DevPanel_Match(SafeView):
                 match_id = self.match_id.value.strip()
                 scheduled_date = self.date.value.strip()
 
-                matches_sheet = get_or_create_sheet(
+                matches_sheet = await sheets.call(
+                    get_or_create_sheet,
                     self.parent.spreadsheet,
                     "Matches",
                     ["Match ID", "Team A", "Team B", "Proposed Date", "Scheduled Date", "Status", "Winner", "Loser", "Proposed By"]
                 )
-                weekly_sheet = get_or_create_sheet(
+                weekly_sheet = await sheets.call(
+                    get_or_create_sheet,
                     self.parent.spreadsheet,
                     "Weekly Matches",
                     ["Week", "Team A", "Team B", "Match ID", "Scheduled Date"]
                 )
 
-                rows = matches_sheet.get_all_values()
-                header = rows[0]
                 match_found = False
 
-                for idx, row in enumerate(rows[1:], start=2):
-                    if row[0].strip() == match_id:
-                        # Update existing match
-                        matches_sheet.update_cell(idx, 5, scheduled_date)  # Scheduled Date
-                        matches_sheet.update_cell(idx, 6, "Scheduled")     # Status
-                        match_found = True
-
-                        # Update weekly sheet if present
-                        for w_row in weekly_sheet.get_all_values()[1:]:
-                            if w_row[3] == match_id:
-                                w_idx = weekly_sheet.get_all_values().index(w_row) + 1
-                                weekly_sheet.update_cell(w_idx, 5, scheduled_date)
-                                break
-                        break
+                idx = await sheets.find_row(matches_sheet, match_id)
+                if idx:
+                    # Update existing match
+                    async with sheets.batch(matches_sheet) as writes:
+                        writes.update_cell(idx, 5, scheduled_date)  # Scheduled Date
+                        writes.update_cell(idx, 6, "Scheduled")     # Status
+                    match_found = True
+
+                    # Update weekly sheet if present
+                    w_idx = await sheets.find_row(weekly_sheet, match_id, key_col=4)
+                    if w_idx:
+                        await sheets.call(weekly_sheet.update_cell, w_idx, 5, scheduled_date)
 
                 if not match_found:
                     # Create a new match entry manually
                     await self.parent.safe_send(i, "❗ Match ID not found. Creating as new manual match.")
 
                     # Ask for team names in follow-up (or create with placeholders)
-                    matches_sheet.append_row([match_id, "TBD", "TBD", "TBD", scheduled_date, "Manual", "", "", "System"])
-                    weekly_sheet.append_row(["Manual", "TBD", "TBD", match_id, scheduled_date])
+                    await sheets.call(matches_sheet.append_row, [match_id, "TBD", "TBD", "TBD", scheduled_date, "Manual", "", "", "System"])
+                    await sheets.call(weekly_sheet.append_row, ["Manual", "TBD", "TBD", match_id, scheduled_date])
                 
                 # 👥 Ping both teams if available
                 teams_sheet = self.parent.teams_sheet
                 team_a, team_b = None, None
 
                 # Try to get team names from updated row
-                for row in matches_sheet.get_all_values():
+                for row in await sheets.get_values(matches_sheet):
                     if row[0].strip() == match_id:
                         team_a = row[1]
                         team_b = row[2]
                         break
 
+                team_rows = await sheets.get_values(teams_sheet)
+
                 def get_mentions(team_name):
-                    row = next((r for r in teams_sheet.get_all_values() if r[0] == team_name), [])
+                    row = next((r for r in team_rows if r[0] == team_name), [])
                     mentions = [f"<@{p.split('(')[-1].split(')')[0]}>" for p in row[1:] if "(" in p and ")" in p]
                     return " ".join(mentions) if mentions else team_name
 
@@ -344,10 +377,22 @@ class DevPanel_Match(SafeView):
         await interaction.response.send_modal(ForceScheduleModal(self))
 
 
+    @discord.ui.button(label="🔁 Rebuild Pair History", style=discord.ButtonStyle.gray, custom_id="dev:rebuild_pair_history")
+    async def rebuild_pair_history(self, interaction, button):
+        import pair_history
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            total = await pair_history.rebuild(self.spreadsheet)
+        except Exception as e:
+            await interaction.followup.send(f"❗ Failed to rebuild pair history: {e}", ephemeral=True)
+            return
+        await interaction.followup.send(f"✅ Pair history rebuilt from {total} recorded meetings.", ephemeral=True)
+
 #    @discord.ui.button(label="♻️ Reset Weekly Matches", style=discord.ButtonStyle.red, custom_id="dev:reset_weekly_matches", disabled=True)
     async def reset_weekly(self, interaction, button):
-        sheet = get_or_create_sheet(self.spreadsheet, "Weekly Matches", ["Week","Team A","Team B","Match ID","Scheduled Date"])
-        sheet.clear(); sheet.append_row(["Week","Team A","Team B","Match ID","Scheduled Date"])
+        sheet = await sheets.call(get_or_create_sheet, self.spreadsheet, "Weekly Matches", ["Week","Team A","Team B","Match ID","Scheduled Date"])
+        await sheets.call(sheet.clear); await sheets.call(sheet.append_row, ["Week","Team A","Team B","Match ID","Scheduled Date"])
         await self.safe_send(interaction, "✅ Reset weekly matches.")
 
 # -------------------- SCORE TOOLS --------------------
@@ -364,8 +409,8 @@ class DevPanel_Score(SafeView):
         return await check_dev(interaction, self.dev_ids)
 
     async def generic_clear(self, interaction, sheet_name):
-        sheet = get_or_create_sheet(self.spreadsheet, sheet_name, [])
-        rows = sheet.get_all_values()[1:]
+        sheet = await sheets.call(get_or_create_sheet, self.spreadsheet, sheet_name, [])
+        rows = (await sheets.get_values(sheet))[1:]
         options = []
         for idx, row in enumerate(rows, 2):
             label = " | ".join(row)
@@ -379,7 +424,7 @@ class DevPanel_Score(SafeView):
         class Confirm(View):
             @discord.ui.select(placeholder="Select to delete", options=options)
             async def select(self, i, select):
-                sheet.delete_rows(int(select.values[0]))
+                await sheets.call(sheet.delete_rows, int(select.values[0]))
                 await self.parent.safe_send(i, "✅ Deleted.")
 
         view = Confirm()
@@ -399,13 +444,12 @@ class DevPanel_Score(SafeView):
                 match_id_value = self.match_id.value.strip()
 
                 try:
-                    sheet = self.parent_view.spreadsheet.worksheet("Match Proposed")
-                    rows = sheet.get_all_values()
-
+                    sheet = await sheets.call(self.parent_view.spreadsheet.worksheet, "Match Proposed")
                     matched_rows = []
-                    for i, row in enumerate(rows):
-                        if len(row) >= 6 and row[0].strip() == match_id_value:  # Column A = Match ID
-                            matched_rows.append((i + 1, row[5].strip()))  # row index, Channel ID
+                    for row_index in await sheets.find_rows(sheet, match_id_value):  # Column A = Match ID
+                        row = await sheets.row_values(sheet, row_index)
+                        if len(row) >= 6:
+                            matched_rows.append((row_index, row[5].strip()))  # row index, Channel ID
 
                     if not matched_rows:
                         await interaction.response.send_message(f"❗ No proposed match with ID `{match_id_value}` found.", ephemeral=True)
@@ -421,11 +465,14 @@ class DevPanel_Score(SafeView):
                         except Exception as e:
                             print(f"⚠️ Failed to delete fallback channel: {e}")
 
-                    for row_index, _ in reversed(matched_rows):
-                        try:
-                            sheet.delete_rows(row_index)
-                        except Exception as e:
-                            print(f"⚠️ Failed to delete row {row_index}: {e}")
+                    try:
+                        await sheets.delete_rows(
+                            self.parent_view.spreadsheet,
+                            {sheet: [row_index for row_index, _ in matched_rows]},
+                            expect={sheet: (1, {row_index: match_id_value for row_index, _ in matched_rows})},
+                        )
+                    except Exception as e:
+                        print(f"⚠️ Failed to delete rows {[row_index for row_index, _ in matched_rows]}: {e}")
 
                     await interaction.response.send_message(f"✅ Cleared match `{match_id_value}` and deleted fallback channel.", ephemeral=True)
 
@@ -448,13 +495,12 @@ class DevPanel_Score(SafeView):
                 match_id_value = self.match_id.value.strip()
 
                 try:
-                    sheet = self.parent_view.spreadsheet.worksheet("Proposed Scores")
-                    rows = sheet.get_all_values()
-
+                    sheet = await sheets.call(self.parent_view.spreadsheet.worksheet, "Proposed Scores")
                     matched_rows = []
-                    for i, row in enumerate(rows):
-                        if len(row) >= 6 and row[0].strip() == match_id_value:  # Column A = Match ID
-                            matched_rows.append((i + 1, row[5].strip()))  # row index, Channel ID from column F
+                    for row_index in await sheets.find_rows(sheet, match_id_value):  # Column A = Match ID
+                        row = await sheets.row_values(sheet, row_index)
+                        if len(row) >= 6:
+                            matched_rows.append((row_index, row[5].strip()))  # row index, Channel ID from column F
 
                     if not matched_rows:
                         await interaction.response.send_message(f"❗ No score with Match ID `{match_id_value}` found.", ephemeral=True)
@@ -470,11 +516,14 @@ class DevPanel_Score(SafeView):
                         except Exception as e:
                             print(f"⚠️ Failed to delete fallback channel: {e}")
 
-                    for row_index, _ in reversed(matched_rows):
-                        try:
-                            sheet.delete_rows(row_index)
-                        except Exception as e:
-                            print(f"⚠️ Failed to delete row {row_index}: {e}")
+                    try:
+                        await sheets.delete_rows(
+                            self.parent_view.spreadsheet,
+                            {sheet: [row_index for row_index, _ in matched_rows]},
+                            expect={sheet: (1, {row_index: match_id_value for row_index, _ in matched_rows})},
+                        )
+                    except Exception as e:
+                        print(f"⚠️ Failed to delete rows {[row_index for row_index, _ in matched_rows]}: {e}")
 
                     await interaction.response.send_message(f"✅ Cleared `{match_id_value}` score entry and deleted fallback channel.", ephemeral=True)
 
@@ -484,6 +533,51 @@ class DevPanel_Score(SafeView):
 
         await interaction.response.send_modal(ScoreIDModal(self))
 
+    @discord.ui.button(label="🧮 Recompute Ratings", style=discord.ButtonStyle.gray, custom_id="dev:recompute_ratings")
+    async def recompute_ratings(self, interaction, button):
+        import recompute
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            result = await recompute.recompute(self.spreadsheet)
+        except Exception as e:
+            await interaction.followup.send(f"❗ Failed to replay the season: {e}", ephemeral=True)
+            return
+
+        if result.clean:
+            await interaction.followup.send(result.summary(), ephemeral=True)
+            return
+
+        spreadsheet = self.spreadsheet
+
+        class ConfirmRecompute(View):
+            def __init__(self):
+                super().__init__(timeout=600)
+
+            async def interaction_check(self, interaction):
+                sheets.set_lane("dev")
+                return True
+
+            async def close(self, interaction, content):
+                for item in self.children:
+                    item.disabled = True
+                await interaction.response.edit_message(content=content, view=self)
+                self.stop()
+
+            @discord.ui.button(label="✅ Write Replayed Ratings", style=discord.ButtonStyle.red)
+            async def confirm(self, ci, button):
+                await self.close(ci, result.summary() + "\n⏳ Writing...")
+                if not await recompute.write(spreadsheet, result):
+                    await ci.followup.send("❗ Results or the Leaderboard changed since the replay; nothing was written. Run Recompute Ratings again.", ephemeral=True)
+                    return
+                await ci.followup.send("✅ Leaderboards rewritten from the season replay.", ephemeral=True)
+
+            @discord.ui.button(label="✖️ Keep Current", style=discord.ButtonStyle.gray)
+            async def cancel(self, ci, button):
+                await self.close(ci, result.summary() + "\n✖️ Nothing was written.")
+
+        await interaction.followup.send(result.summary()[:1900], view=ConfirmRecompute(), ephemeral=True)
+
     @discord.ui.button(label="🏆 Undo Score For Match", style=discord.ButtonStyle.blurple, custom_id="dev:undo_score", disabled=True)
     async def undo_score(self, interaction, button):
         await self.generic_clear(interaction, "Scoring")
@@ -497,15 +591,16 @@ class DevPanel_Score(SafeView):
             score = TextInput(label="Final Score", required=True)
             def __init__(self, parent): super().__init__(); self.parent = parent
             async def on_submit(self, i):
-                m = get_or_create_sheet(self.parent.spreadsheet, "Matches", ["Match ID","Team A","Team B","Proposed Date","Scheduled Date","Status","Winner","Loser","Proposed By"])
-                for idx, row in enumerate(m.get_all_values()[1:], 2):
-                    if row[0] == self.match.value:
-                        m.update_cell(idx, 8, self.score.value)
-                        m.update_cell(idx, 9, self.winner.value)
-                        m.update_cell(idx, 10, self.loser.value)
-                        m.update_cell(idx, 6, "Finished")
-                        await self.parent.safe_send(i, "✅ Final score set.")
-                        return
+                m = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Matches", ["Match ID","Team A","Team B","Proposed Date","Scheduled Date","Status","Winner","Loser","Proposed By"])
+                idx = await sheets.find_row(m, self.match.value)
+                if idx:
+                    async with sheets.batch(m) as writes:
+                        writes.update_cell(idx, 8, self.score.value)
+                        writes.update_cell(idx, 9, self.winner.value)
+                        writes.update_cell(idx, 10, self.loser.value)
+                        writes.update_cell(idx, 6, "Finished")
+                    await self.parent.safe_send(i, "✅ Final score set.")
+                    return
                 await self.parent.safe_send(i, "❗ Match ID not found.")
         await interaction.response.send_modal(ForceSubmitFinalScore(self))
 
@@ -542,18 +637,19 @@ class DevPanel_Team(SafeView):
 
             async def apply_bulk_status(self, i: discord.Interaction):
                 new_status = i.data["values"][0]
-                sheet = get_or_create_sheet(self.parent.spreadsheet, "Teams", [])
-                rows = sheet.get_all_values()
+                sheet = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Teams", [])
+                rows = await sheets.get_values(sheet)
                 updated = 0
 
-                for idx, row in enumerate(rows[1:], start=2):
-                    if not row or not row[0].strip():
-                        continue
-                    while len(row) < 8:
-                        row.append("")
-                    if row[7].strip() != new_status:
-                        sheet.update_cell(idx, 8, new_status)
-                        updated += 1
+                async with sheets.batch(sheet) as writes:
+                    for idx, row in enumerate(rows[1:], start=2):
+                        if not row or not row[0].strip():
+                            continue
+                        while len(row) < 8:
+                            row.append("")
+                        if row[7].strip() != new_status:
+                            writes.update_cell(idx, 8, new_status)
+                            updated += 1
 
   #              await self.parent.safe_send(i, f"✅ Set `{new_status}` for {updated} team(s).")
   #              await self.parent.send_notification(f"📋 Bulk status update: **{new_status}** applied to {updated} teams.")
@@ -565,7 +661,7 @@ class DevPanel_Team(SafeView):
         if not await check_dev(interaction, self.dev_ids):
             return
 
-        class TeamSearchModal(discord.ui.Modal, title="Search Team Name"):
+        class TeamSearchModal(Modal, title="Search Team Name"):
             query = discord.ui.TextInput(label="Enter part of team name", required=True)
 
             def __init__(self, parent):
@@ -573,8 +669,8 @@ class DevPanel_Team(SafeView):
                 self.parent = parent
 
             async def on_submit(self, i: discord.Interaction):
-                sheet = get_or_create_sheet(self.parent.spreadsheet, "Teams", [])
-                all_rows = sheet.get_all_values()[1:]
+                sheet = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Teams", [])
+                all_rows = (await sheets.get_values(sheet))[1:]
                 matched = [r[0] for r in all_rows if r and self.query.value.lower() in r[0].lower()]
 
                 if not matched:
@@ -612,14 +708,14 @@ class DevPanel_Team(SafeView):
                         async def callback(self, i: discord.Interaction):
                             team = self.parent_view.selected_team
                             new_status = self.values[0]
-                            sheet = get_or_create_sheet(self.parent_view.parent.spreadsheet, "Teams", [])
+                            sheet = await sheets.call(get_or_create_sheet, self.parent_view.parent.spreadsheet, "Teams", [])
                             updated = False
 
-                            for idx, row in enumerate(sheet.get_all_values()[1:], start=2):
+                            for idx, row in enumerate((await sheets.get_values(sheet))[1:], start=2):
                                 if row[0] == team:
                                     while len(row) < 8:
                                         row.append("")
-                                    sheet.update_cell(idx, 8, new_status)
+                                    await sheets.call(sheet.update_cell, idx, 8, new_status)
                                     updated = True
                                     break
 
@@ -627,8 +723,8 @@ class DevPanel_Team(SafeView):
                                 await self.parent_view.parent.safe_send(i, f"✅ `{team}` status set to `{new_status}`.")
                                 # Attempt to ping the captain
                                 try:
-                                    teams_sheet = get_or_create_sheet(self.parent_view.parent.spreadsheet, "Teams", [])
-                                    team_row = next((r for r in teams_sheet.get_all_values()[1:] if r[0] == team), None)
+                                    teams_sheet = await sheets.call(get_or_create_sheet, self.parent_view.parent.spreadsheet, "Teams", [])
+                                    team_row = next((r for r in (await sheets.get_values(teams_sheet))[1:] if r[0] == team), None)
 
                                     captain_mention = team
                                     if team_row and len(team_row) > 1 and "(" in team_row[1] and ")" in team_row[1]:
@@ -656,8 +752,8 @@ class DevPanel_Team(SafeView):
             team = TextInput(label="Team Name", required=True)
             def __init__(self, parent): super().__init__(); self.parent = parent
             async def on_submit(self, i):
-                sheet = get_or_create_sheet(self.parent.spreadsheet, "Teams", ["Team Name","Captain","Player 2","Player 3","Player 4","Player 5","Player 6"])
-                for idx, row in enumerate(sheet.get_all_values(), 1):
+                sheet = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Teams", ["Team Name","Captain","Player 2","Player 3","Player 4","Player 5","Player 6"])
+                for idx, row in enumerate(await sheets.get_values(sheet), 1):
                     if row[0].lower() == self.team.value.lower():
                         team_name = row[0]
                         for suffix in ["", " Captain"]:
@@ -670,7 +766,7 @@ class DevPanel_Team(SafeView):
                                 except Exception as e:
                                     print(f"[⚠️] Could not delete role {role_name}: {e}")
 
-                        sheet.delete_rows(idx)
+                        await sheets.call(sheet.delete_rows, idx)
                         await self.parent.send_notification(f"💥 **{row[0]}** was force disbanded by a Admin.")
                         await self.parent.safe_send(i, f"✅ Team **{team_name}** disbanded and roles deleted.")
                         return
@@ -683,11 +779,11 @@ class DevPanel_Team(SafeView):
             player = TextInput(label="Player (partial OK)", required=True)
             def __init__(self, parent): super().__init__(); self.parent = parent
             async def on_submit(self, i):
-                sheet = get_or_create_sheet(self.parent.spreadsheet, "Teams", ["Team Name","Captain","Player 2","Player 3","Player 4","Player 5","Player 6"])
-                for idx, row in enumerate(sheet.get_all_values(), 1):
+                sheet = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Teams", ["Team Name","Captain","Player 2","Player 3","Player 4","Player 5","Player 6"])
+                for idx, row in enumerate(await sheets.get_values(sheet), 1):
                     for col in range(1, 7):
                         if self.player.value.lower() in row[col].lower():
-                            sheet.update_cell(idx, col + 1, "")
+                            await sheets.call(sheet.update_cell, idx, col + 1, "")
                             await self.parent.safe_send(i, "✅ Player removed.")
                             await self.parent.send_notification(f"👤 `{row[col]}` was force removed from **{row[0]}** by a Admin.")
                             return
@@ -701,13 +797,12 @@ class DevPanel_Team(SafeView):
             change = TextInput(label="ELO Change (+ or -)", required=True)
             def __init__(self, parent): super().__init__(); self.parent = parent
             async def on_submit(self, i):
-                sheet = get_or_create_sheet(self.parent.spreadsheet, "Leaderboard", ["Team Name","Rating","Wins","Losses","Matches Played"])
-                for idx, row in enumerate(sheet.get_all_values(), 1):
-                    if row[0].lower() == self.team.value.lower():
-                        new_elo = int(row[1]) + int(self.change.value)
-                        sheet.update_cell(idx, 2, new_elo)
-                        await self.parent.safe_send(i, f"✅ ELO now {new_elo}.")
-                        return
+                import standings
+                sheet = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Leaderboard", ["Team Name","Rating","Wins","Losses","Matches Played"])
+                result = await standings.adjust(sheet, self.team.value, int(self.change.value), self.parent.bot.config)
+                if result:
+                    await self.parent.safe_send(i, f"✅ ELO now {result[1]}.")
+                    return
                 await self.parent.safe_send(i, "❗ Team not found.")
         await interaction.response.send_modal(AdjustTeamELO(self))
 
@@ -729,9 +824,9 @@ class DevPanel_Player(SafeView):
             search = TextInput(label="Player Name / ID", required=True)
             def __init__(self, parent): super().__init__(); self.parent = parent
             async def on_submit(self, i):
-                players = get_or_create_sheet(self.parent.spreadsheet, "Players", ["User ID","Username"])
-                banned = get_or_create_sheet(self.parent.spreadsheet, "Banned", ["User ID","Username"])
-                rows = players.get_all_values()[1:]
+                players = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Players", ["User ID","Username"])
+                banned = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Banned", ["User ID","Username"])
+                rows = (await sheets.get_values(players))[1:]
                 options = [discord.SelectOption(label=f"{row[1]} ({row[0]})", value=str(idx)) for idx, row in enumerate(rows, 2) if self.search.value.lower() in row[1].lower() or self.search.value in row[0]]
                 if not options:
                     await self.parent.safe_send(i, "❗ Player not found.")
@@ -740,14 +835,15 @@ class DevPanel_Player(SafeView):
                     @discord.ui.select(placeholder="Select player", options=options)
                     async def select(self, si, select):
                         idx = int(select.values[0])
-                        row = players.row_values(idx)
-                        if action == "Ban": banned.append_row(row)
-                        players.delete_rows(idx)
-                        teams = get_or_create_sheet(self.parent.spreadsheet, "Teams", ["Team Name","Captain","Player 2","Player 3","Player 4","Player 5","Player 6"])
-                        for tidx, trow in enumerate(teams.get_all_values(), 1):
-                            for col in range(1, 7):
-                                if row[0] in trow[col] or row[1] in trow[col]:
-                                    teams.update_cell(tidx, col + 1, "")
+                        row = await sheets.call(players.row_values, idx)
+                        if action == "Ban": await sheets.call(banned.append_row, row)
+                        await sheets.call(players.delete_rows, idx)
+                        teams = await sheets.call(get_or_create_sheet, self.parent.spreadsheet, "Teams", ["Team Name","Captain","Player 2","Player 3","Player 4","Player 5","Player 6"])
+                        async with sheets.batch(teams) as writes:
+                            for tidx, trow in enumerate(await sheets.get_values(teams), 1):
+                                for col in range(1, 7):
+                                    if row[0] in trow[col] or row[1] in trow[col]:
+                                        writes.update_cell(tidx, col + 1, "")
                         await self.parent.safe_send(si, f"✅ {action}ed player.")
                         await self.parent.send_notification(f"🚫 `{row[1]}` was {action.lower()}ed from the league by a Admin.")
 
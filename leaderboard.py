@@ -1,10 +1,9 @@
 import discord
-import gspread
 import json
 import os
 import asyncio
+import sheets
 from discord.ext import commands, tasks
-from oauth2client.service_account import ServiceAccountCredentials
 
 has_run_on_ready = False
 
@@ -19,14 +18,7 @@ TEAM_MESSAGE_FILE = "leaderboard_msg_id.txt"
 PLAYER_MESSAGE_FILE = "PLAYER_leaderboard_msg_id.txt"
 
 # === Google Sheets setup ===
-scope = [
-    "https://spreadsheets.google.com/feeds",
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive"
-]
-creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-client = gspread.authorize(creds)
-spreadsheet = client.open(SHEET_NAME)
+spreadsheet = sheets.open_spreadsheet(SHEET_NAME)
 team_sheet = spreadsheet.worksheet("Leaderboard")
 player_sheet = spreadsheet.worksheet("Player Leaderboard")
 
@@ -207,12 +199,13 @@ async def on_ready():
 
 @tasks.loop(minutes=3600)
 async def leaderboard_updater():
+    sheets.set_lane("background")
     await update_leaderboards()
 
 async def update_leaderboards():
     try:
-        team_data = team_sheet.get_all_values()[1:]
-        player_data = player_sheet.get_all_values()[1:]
+        team_data = (await sheets.get_values(team_sheet))[1:]
+        player_data = (await sheets.get_values(player_sheet))[1:]
 
         team_embeds = build_team_embeds(team_data)
         player_embeds = build_player_embeds(player_data)
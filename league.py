@@ -1,18 +1,17 @@
 import discord
 from discord.ext import commands, tasks
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import json
 import match
 import dev
 import command_buttons  # <-- League Command Panel buttons
 import asyncio, json
-import re
-import concurrent.futures
 from command_buttons import SignupView
 from discord import Embed, NotFound, HTTPException
 from discord.ui import View, Button
 import os
+import sheets
+from rows import member_id
 from command_buttons import AcceptDenyJoinRequestView
 from dev import cast
 
@@ -34,22 +33,34 @@ TEAM_MAX_PLAYERS = int(config.get("team_max_players", 6))
 ELO_WIN_POINTS = config.get("elo_win_points", 25)
 ELO_LOSS_POINTS = config.get("elo_loss_points", -25)
 TEAM_LIST_CHANNEL_ID = config.get("team_list_channel_id")
+SHEET_CACHE_TTL = float(config.get("sheet_cache_ttl_seconds", 30))
+SHEET_INDEX_TTL = float(config.get("sheet_index_ttl_seconds", 300))
+SHEET_IO_WORKERS = int(config.get("sheet_io_workers", 4))
+SHEET_QUOTA_PER_MINUTE = int(config.get("sheet_quota_per_minute", 60))
+SHEET_RETRY_ATTEMPTS = int(config.get("sheet_retry_attempts", 5))
+STORAGE_BACKEND = config.get("storage_backend", "sheets")
+LOCAL_STORE_PATH = config.get("local_store_path", "league.db")
+LOCAL_STORE_SYNC_SECONDS = float(config.get("local_store_sync_seconds", 15))
+SHEET_CHANGE_POLL_SECONDS = float(config.get("sheet_change_poll_seconds", 30))
 
 # -------------------- Google Sheets Setup --------------------
 
-scope = [
-    "https://spreadsheets.google.com/feeds",
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive",
-]
-
-creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-client = gspread.authorize(creds)
-
-try:
-    spreadsheet = client.open(SHEET_NAME)
-except gspread.SpreadsheetNotFound:
-    spreadsheet = client.create(SHEET_NAME)
+# ✅ One authorized client for the whole process (dev.py /cast reuses it) and one
+# shared snapshot cache behind every worksheet handle (panels, views, dev.py, match.py)
+sheets.setup_client("credentials.json", cache_ttl=SHEET_CACHE_TTL, index_ttl=SHEET_INDEX_TTL, pool_size=SHEET_IO_WORKERS)
+spreadsheet = sheets.open_spreadsheet(SHEET_NAME, create=True)
+if STORAGE_BACKEND == "sqlite":
+    import local_store
+
+    # ✅ Hot tabs are read/written in SQLite and mirrored to the sheet in the background
+    spreadsheet = local_store.open_local(
+        spreadsheet,
+        path=LOCAL_STORE_PATH,
+        tabs=config.get("local_store_tabs", local_store.DEFAULT_TABS),
+        sync_seconds=LOCAL_STORE_SYNC_SECONDS,
+    )
+sheet_cache = spreadsheet.cache
+sheets.setup_gateway(max_workers=SHEET_IO_WORKERS, per_minute=SHEET_QUOTA_PER_MINUTE, retry_attempts=SHEET_RETRY_ATTEMPTS)
 
 def get_or_create_sheet(spreadsheet, name, headers):
     try:
@@ -106,6 +117,7 @@ bot.teams_sheet = teams_sheet
 bot.proposed_scores_sheet = proposed_scores_sheet
 bot.config = config  # ✅ Very important → allows match.py and others to access config
 bot.spreadsheet = spreadsheet
+bot.sheet_cache = sheet_cache
 bot.player_leaderboard_sheet = player_leaderboard_sheet
 bot.leaderboard_sheet = leaderboard_sheet
 
@@ -168,6 +180,7 @@ def update_team_rating(team_name, won):
         leaderboard_sheet.append_row([team_name, starting, 1 if won else 0, 0 if won else 1, 1])
 
 async def auto_update_team_embeds(bot, teams_sheet):
+    sheets.set_lane("background")
     await bot.wait_until_ready()
 
     cache_file = "team_message_cache.json"
@@ -201,16 +214,12 @@ async def auto_update_team_embeds(bot, teams_sheet):
         current_teams = {}
         updated_cache = {}
 
-        def fetch_rows(sheet):
-            return sheet.get_all_values()[1:]
-
-        with concurrent.futures.ThreadPoolExecutor() as pool:
-            try:
-                team_rows = await asyncio.get_event_loop().run_in_executor(pool, fetch_rows, teams_sheet)
-            except Exception as e:
-                print(f"❗ Sheet fetch error: {e}")
-                await asyncio.sleep(300)
-                continue
+        try:
+            team_rows = (await sheets.get_values(teams_sheet))[1:]
+        except Exception as e:
+            print(f"❗ Sheet fetch error: {e}")
+            await asyncio.sleep(300)
+            continue
 
         for row in team_rows:
             if not row or not row[0].strip():
@@ -400,8 +409,7 @@ async def auto_update_team_embeds(bot, teams_sheet):
 bot.was_disconnected = False  # Define this once near the top after bot = commands.Bot(...)
 
 def extract_id(text):
-    match = re.search(r"\((\d{17,20})\)", text)
-    return match.group(1) if match else None
+    return member_id(text) or None
 
 async def cleanup_departed_members(bot, players_sheet, teams_sheet):
     print("[🧹] Running startup cleanup...")
@@ -416,19 +424,26 @@ async def cleanup_departed_members(bot, players_sheet, teams_sheet):
     disbanded = 0
     promoted = 0
 
+    # Rows are collected against this snapshot and deleted together at the end
+    player_deletes = []
+    team_deletes = []
+    deleted_keys = {players_sheet: {}, teams_sheet: {}}
+    team_writes = sheets.batch(teams_sheet)
+
     # Remove from Players sheet
-    players_rows = players_sheet.get_all_values()
+    players_rows = await sheets.get_values(players_sheet)
     for i in range(len(players_rows) - 1, 0, -1):
         row = players_rows[i]
         if not row: continue
         uid = row[0]
         if uid not in member_ids:
-            players_sheet.delete_rows(i + 1)
+            player_deletes.append(i + 1)
+            deleted_keys[players_sheet][i + 1] = uid
             removed += 1
             await send_notification(f"🗑️ Removed `{row[1]}` from the league (no longer in server).")
 
     # Clean up Teams sheet
-    team_rows = teams_sheet.get_all_values()
+    team_rows = await sheets.get_values(teams_sheet)
     for i in range(len(team_rows) - 1, 0, -1):
         row = team_rows[i]
         if not any(row): continue
@@ -441,18 +456,19 @@ async def cleanup_departed_members(bot, players_sheet, teams_sheet):
         if captain_id and captain_id not in member_ids:
             replacement = extract_id(row[2]) if len(row) > 2 else None
             if replacement and replacement in member_ids:
-                teams_sheet.update_cell(i + 1, 2, row[2])  # Promote Player 2
+                team_writes.update_cell(i + 1, 2, row[2])  # Promote Player 2
                 captain_role_id = bot.config.get("universal_captain_role_id")
                 if replacement and captain_role_id:
                     role = discord.utils.get(guild.roles, id=captain_role_id)
                     member = guild.get_member(int(replacement))
                     if role and member:
                         await member.add_roles(role, reason="Promoted to Captain")
-                teams_sheet.update_cell(i + 1, 3, "")      # Clear old P2
+                team_writes.update_cell(i + 1, 3, "")      # Clear old P2
                 promoted += 1
                 await send_notification(f"👑 Captain left — promoted Player 2 to captain of **{team_name}**.")
             else:
-                teams_sheet.delete_rows(i + 1)
+                team_deletes.append(i + 1)
+                deleted_keys[teams_sheet][i + 1] = team_name
                 disbanded += 1
                 await send_notification(f"❌ Team **{team_name}** was disbanded (no captain or players left).")
 
@@ -471,30 +487,39 @@ async def cleanup_departed_members(bot, players_sheet, teams_sheet):
                 cell = row[j]
                 uid = extract_id(cell)
                 if uid in missing:
-                    teams_sheet.update_cell(i + 1, j + 1, "")
+                    team_writes.update_cell(i + 1, j + 1, "")
                     await send_notification(f"🚪 Removed `{cell}` from **{team_name}** (left the server)")
 
+    # Cell writes use the snapshot's row numbers, so they must land before any row is deleted
+    await team_writes.flush()
+    await sheets.delete_rows(
+        spreadsheet,
+        {players_sheet: player_deletes, teams_sheet: team_deletes},
+        expect={sheet: (1, keys) for sheet, keys in deleted_keys.items()},
+    )
+
     print(f"[✅] Cleanup done — Removed: {removed}, Disbanded: {disbanded}, Promoted: {promoted}")
 
 @bot.event
 async def on_member_remove(member):
     user_id = str(member.id)
     username = member.name
+    command_buttons.invalidate_user_context(user_id)
 
     players = bot.players_sheet
     teams = bot.teams_sheet
 
     # Remove from Players sheet
     removed_from_players = False
-    player_rows = players.get_all_values()
+    player_rows = await sheets.get_values(players)
     for i, row in enumerate(player_rows[1:], start=2):
         if user_id == row[0] or username in row[1].lower():
-            players.delete_rows(i)
+            await sheets.call(players.delete_rows, i)
             removed_from_players = True
             break
 
     # Search Teams sheet
-    team_rows = teams.get_all_values()
+    team_rows = await sheets.get_values(teams)
     for i, row in enumerate(team_rows[1:], start=2):
         if not any(row):
             continue
@@ -503,13 +528,15 @@ async def on_member_remove(member):
         for j in range(1, 7):
             cell_id = extract_id(row[j])
             if cell_id == user_id:
-                teams.update_cell(i, j + 1, "")  # Clear the player cell
+                writes = sheets.batch(teams)
+                writes.update_cell(i, j + 1, "")  # Clear the player cell
 
                 if j == 1:  # Captain left
                     replacement = row[2] if len(row) > 2 and row[2].strip() else ""
                     if replacement:
-                        teams.update_cell(i, 2, replacement)  # Promote Player 2
-                        teams.update_cell(i, 3, "")           # Optional: clear Player 2
+                        writes.update_cell(i, 2, replacement)  # Promote Player 2
+                        writes.update_cell(i, 3, "")           # Optional: clear Player 2
+                        await writes.flush()
                         await send_notification(f"👑 `{username}` left — promoted Player 2 to captain for **{team_name}**.")
                     else:
                         # 🧼 Delete associated team roles
@@ -523,10 +550,12 @@ async def on_member_remove(member):
                                 except Exception as e:
                                     print(f"[⚠️] Could not delete role {role_name}: {e}")
 
-                        teams.delete_rows(i)
+                        writes.drain()  # The whole row goes, no need to clear the cell first
+                        await sheets.call(teams.delete_rows, i)
                         await send_notification(f"❌ `{username}` left — disbanded team **{team_name}** (no other players).")
 
                 else:
+                    await writes.flush()
                     await send_notification(f"🚪 `{username}` left and was removed from **{team_name}**.")
                 return
 
@@ -616,6 +645,12 @@ async def rehydrate_join_requests(bot):
 
 @bot.event
 async def on_ready():
+    # Startup cleanup and rehydration yield quota to anyone clicking buttons meanwhile
+    sheets.set_lane("background")
+    if STORAGE_BACKEND == "sqlite":
+        spreadsheet.start_sync()
+    if SHEET_CHANGE_POLL_SECONDS > 0:
+        sheets.start_change_detector(spreadsheet, interval=SHEET_CHANGE_POLL_SECONDS)
     bot.tree.add_command(cast)
     await bot.tree.sync()
     await validate_roles(bot)
@@ -751,8 +786,12 @@ async def on_ready():
                 print(f"❌ Failed to post LeaguePanel: {e}")
     
 
+    # 📸 Everything rehydration needs, in one read
+    snapshot = await sheets.load_snapshot(spreadsheet, [proposed_sheet, scheduled_sheet, proposed_scores_sheet])
+    stale_proposals = []
+
         # ✅ Rehydrate match proposals
-    proposed_rows = proposed_sheet.get_all_values()[1:]
+    proposed_rows = snapshot["Match Proposed"].rows
     for idx, row in enumerate(proposed_rows, start=2):  # start=2 to skip header
         if len(row) < 7:
             continue
@@ -789,15 +828,23 @@ async def on_ready():
 
         except Exception as e:
             print(f"❌ Failed to rehydrate {match_id}: {e}")
-            try:
-                proposed_sheet.delete_rows(idx)
-            except Exception as cleanup_error:
-                print(f"⚠️ Failed to delete row {idx} for {match_id}: {cleanup_error}")
+            stale_proposals.append((idx, match_id))
+
+    # Row numbers come from the snapshot, so drop the dead proposals together
+    try:
+        await sheets.delete_rows(
+            spreadsheet,
+            {proposed_sheet: [idx for idx, _ in stale_proposals]},
+            expect={proposed_sheet: (1, dict(stale_proposals))},
+        )
+    except Exception as cleanup_error:
+        print(f"⚠️ Failed to delete stale proposal rows {stale_proposals}: {cleanup_error}")
     
         # ✅ Rehydrate score confirmations
-    scheduled_rows = spreadsheet.values_get("Match Scheduled!A:D").get("values", [])[1:]
+    scheduled_rows = snapshot["Match Scheduled"].rows
     scheduled_ids = [row[0] for row in scheduled_rows if row]
-    score_rows = proposed_scores_sheet.get_all_values()[1:]
+    score_rows = snapshot["Proposed Scores"].rows
+    proposed_ids = [row[0].strip() for row in score_rows]
 
     for idx, row in enumerate(score_rows, start=2):
         if len(row) < 8:
@@ -843,9 +890,6 @@ async def on_ready():
         match_id, team1, team2, proposer_id, proposed_date, channel_id, message_id, map_scores_json = row
 
         # Only rehydrate if it's still in the Proposed Scores sheet
-        proposed_rows = spreadsheet.worksheet("Proposed Scores").get_all_values()[1:]
-        proposed_ids = [row[0].strip() for row in proposed_rows]
-
         if match_id not in proposed_ids:
             print(f"⛔ Skipping rehydration: match {match_id} not in Proposed Scores sheet")
             continue
@@ -892,7 +936,7 @@ async def on_ready():
         except Exception as e:
             print(f"❌ Failed to rehydrate score for {match_id}: {e}")
             try:
-                proposed_scores_sheet.delete_rows(idx)  # ✅ now using correct row index
+                await sheets.call(proposed_scores_sheet.delete_rows, idx)  # ✅ now using correct row index
             except Exception as cleanup_error:
                 print(f"⚠️ Failed to clean up score row for {match_id}: {cleanup_error}")
 
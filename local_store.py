@@ -0,0 +1,574 @@
+import asyncio
+import datetime
+import json
+import sqlite3
+import threading
+
+import sheets
+
+# -------------------- Local Store --------------------
+#
+# With "storage_backend": "sqlite" the hot tabs (players, teams, matches,
+# leaderboards, proposals) live in an embedded SQLite database instead of
+# being read from Google Sheets on every click. Handlers keep using the same
+# worksheet calls; LocalWorksheet answers them from memory and writes through
+# to SQLite. A background worker mirrors every changed tab back to its Sheets
+# tab in one values_batch_update, so the spreadsheet stays a readable copy.
+#
+# Rows are stored by position because the bot addresses them by sheet row
+# number (update_cell(idx, ...), delete_rows(idx)).
+
+DEFAULT_TABS = [
+    "Players", "Teams", "Matches", "Leaderboard", "Player Leaderboard",
+    "Match Proposed", "Proposed Scores", "Match Scheduled",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tabs (
+    title TEXT PRIMARY KEY,
+    imported_at TEXT,
+    dirty INTEGER NOT NULL DEFAULT 0,
+    pushed_rows INTEGER NOT NULL DEFAULT 0,
+    pushed_cols INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rows (
+    title TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    cells TEXT NOT NULL,
+    PRIMARY KEY (title, position)
+);
+"""
+
+
+def local(fn):
+    """Mark a method that never leaves the process, so the gateway runs it inline."""
+    fn.sheets_local = True
+    return fn
+
+
+def cell_text(value):
+    # What Sheets would hand back from get_all_values() for a USER_ENTERED value
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def numericise(value):
+    if value == "":
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+class LocalStore:
+    def __init__(self, path="league.db"):
+        self.path = path
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def has_tab(self, title):
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM tabs WHERE title = ?", (title,)).fetchone() is not None
+
+    def load_tab(self, title):
+        with self.lock:
+            found = self.db.execute("SELECT position, cells FROM rows WHERE title = ? ORDER BY position", (title,))
+            rows = []
+            for position, cells in found:
+                rows.extend([] for _ in range(position - 1 - len(rows)))
+                rows.append(json.loads(cells))
+            return rows
+
+    def import_tab(self, title, values):
+        imported_at = datetime.datetime.utcnow().isoformat(timespec="seconds")
+        width = max((len(row) for row in values), default=0)
+        with self.lock, self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("DELETE FROM rows WHERE title = ?", (title,))
+            self.db.executemany(
+                "INSERT INTO rows (title, position, cells) VALUES (?, ?, ?)",
+                [(title, i, json.dumps(row)) for i, row in enumerate(values, start=1)],
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO tabs (title, imported_at, dirty, pushed_rows, pushed_cols) VALUES (?, ?, 0, ?, ?)",
+                (title, imported_at, len(values), width),
+            )
+
+    def write_rows(self, title, rows):
+        """Persist {position: cells} for one tab and flag it for the next sync."""
+        with self.lock, self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany(
+                "INSERT OR REPLACE INTO rows (title, position, cells) VALUES (?, ?, ?)",
+                [(title, position, json.dumps(cells)) for position, cells in rows.items()],
+            )
+            self.db.execute("UPDATE tabs SET dirty = 1 WHERE title = ?", (title,))
+
+    def delete_range(self, title, start, end):
+        count = end - start + 1
+        with self.lock, self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("DELETE FROM rows WHERE title = ? AND position BETWEEN ? AND ?", (title, start, end))
+            # Shift through negative positions so the primary key never collides mid-update
+            self.db.execute("UPDATE rows SET position = -(position - ?) WHERE title = ? AND position > ?", (count, title, end))
+            self.db.execute("UPDATE rows SET position = -position WHERE title = ? AND position < 0", (title,))
+            self.db.execute("UPDATE tabs SET dirty = 1 WHERE title = ?", (title,))
+
+    def clear_tab(self, title):
+        with self.lock, self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("DELETE FROM rows WHERE title = ?", (title,))
+            self.db.execute("UPDATE tabs SET dirty = 1 WHERE title = ?", (title,))
+
+    def is_dirty(self, title):
+        with self.lock:
+            found = self.db.execute("SELECT dirty FROM tabs WHERE title = ?", (title,)).fetchone()
+            return bool(found and found[0])
+
+    def dirty_tabs(self):
+        with self.lock:
+            return [title for (title,) in self.db.execute("SELECT title FROM tabs WHERE dirty = 1 ORDER BY title")]
+
+    def pushed_shape(self, title):
+        with self.lock:
+            found = self.db.execute("SELECT pushed_rows, pushed_cols FROM tabs WHERE title = ?", (title,)).fetchone()
+            return tuple(found) if found else (0, 0)
+
+    def mark_pushed(self, title, rows, cols, still_clean=True):
+        with self.lock:
+            self.db.execute(
+                "UPDATE tabs SET pushed_rows = ?, pushed_cols = ?, dirty = CASE WHEN ? THEN 0 ELSE dirty END WHERE title = ?",
+                (rows, cols, 1 if still_clean else 0, title),
+            )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class LocalWorksheet:
+    is_local = True
+
+    def __init__(self, spreadsheet, title, rows):
+        self._spreadsheet = spreadsheet
+        self._store = spreadsheet.store
+        self._title = title
+        self._rows = rows
+        self._indexes = {}   # (key_col, fold) -> KeyIndex
+        self._models = (None, {})   # (version parsed at, {model class: parsed rows})
+        self._remote = None
+        self.version = 0     # bumped on every local write, compared by the sync worker
+
+    @property
+    def title(self):
+        return self._title
+
+    @property
+    def remote(self):
+        # Sheets handle, only needed when mirroring or for structural calls
+        if self._remote is None:
+            self._remote = self._spreadsheet.remote.worksheet(self._title)
+        return self._remote
+
+    @property
+    def worksheet(self):
+        return self.remote.worksheet
+
+    @property
+    def id(self):
+        return self.remote.worksheet.id
+
+    def is_cached(self):
+        return True
+
+    def invalidate(self):
+        pass
+
+    # ---------- Reads ----------
+
+    def _trimmed(self):
+        rows = self._rows
+        end = len(rows)
+        while end and not any(rows[end - 1]):
+            end -= 1
+        return rows[:end]
+
+    @local
+    def get_all_values(self):
+        with self._store.lock:
+            rows = self._trimmed()
+            width = max((len(row) for row in rows), default=0)
+            return [row + [""] * (width - len(row)) for row in rows]
+
+    @local
+    def get_all_records(self):
+        values = self.get_all_values()
+        if not values:
+            return []
+        header = values[0]
+        return [{key: numericise(value) for key, value in zip(header, row)} for row in values[1:]]
+
+    @local
+    def row_values(self, row):
+        with self._store.lock:
+            values = list(self._rows[row - 1]) if 0 < row <= len(self._rows) else []
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def _column_number(self, col):
+        if isinstance(col, int):
+            return col
+        header = self.header()
+        return header.index(col) + 1 if col in header else None
+
+    @local
+    def header(self):
+        return self.row_values(1)
+
+    def has_columns(self, *cols):
+        return True
+
+    @local
+    def columns(self, *cols):
+        with self._store.lock:
+            rows = self._trimmed()
+            found = {}
+            for col in cols:
+                number = self._column_number(col)
+                values = [row[number - 1] if number and number <= len(row) else "" for row in rows]
+                while values and values[-1] == "":
+                    values.pop()
+                found[col] = values
+            return found
+
+    @local
+    def column(self, col):
+        return self.columns(col)[col]
+
+    @local
+    def col_values(self, col):
+        return self.column(col)
+
+    @local
+    def models(self, model):
+        with self._store.lock:
+            version, parsed = self._models
+            if version != self.version:
+                parsed = {}
+                self._models = (self.version, parsed)
+            if model not in parsed:
+                parsed[model] = model.parse(self.get_all_values())
+            return parsed[model]
+
+    @local
+    def cell(self, row, col):
+        from gspread.cell import Cell
+
+        values = self.row_values(row)
+        return Cell(row, col, values[col - 1] if col <= len(values) else "")
+
+    # ---------- Key index ----------
+
+    def has_index(self, key_col=1, fold=False):
+        return True
+
+    @local
+    def index(self, key_col=1, fold=False):
+        with self._store.lock:
+            found = self._indexes.get((key_col, fold))
+            if found is None:
+                found = sheets.KeyIndex.build(key_col, self.column(key_col), fold)
+                self._indexes[(key_col, fold)] = found
+            return found
+
+    @local
+    def find_row(self, key, key_col=1, fold=False):
+        return self.index(key_col, fold).find(key)
+
+    @local
+    def find_rows(self, key, key_col=1, fold=False):
+        return self.index(key_col, fold).find_all(key)
+
+    def _patch_indexes(self, name, args, kwargs, result):
+        patch = sheets.index_patch(name, args, kwargs, result)
+        if patch is None:
+            self._indexes.clear()
+            return
+        for key_index in self._indexes.values():
+            patch(key_index)
+
+    # ---------- Writes ----------
+
+    def _write_blocks(self, blocks):
+        touched = {}
+        for start_row, start_col, values in blocks:
+            for i, values_row in enumerate(values):
+                position = start_row + i
+                while len(self._rows) < position:
+                    self._rows.append([])
+                    touched[len(self._rows)] = self._rows[-1]
+                row = self._rows[position - 1]
+                end = start_col - 1 + len(values_row)
+                if len(row) < end:
+                    row.extend([""] * (end - len(row)))
+                row[start_col - 1:end] = [cell_text(v) for v in values_row]
+                touched[position] = row
+        self._store.write_rows(self._title, touched)
+        self.version += 1
+
+    def _written(self, name, args, kwargs, result=None):
+        blocks = sheets._written_blocks(name, args, kwargs, result)
+        if blocks is None:
+            raise ValueError(f"Unsupported range for local {name} on {self._title!r}")
+        self._write_blocks(blocks)
+        self._patch_indexes(name, args, kwargs, result)
+        return result
+
+    @local
+    def update_cell(self, row, col, value):
+        with self._store.lock:
+            return self._written("update_cell", (row, col, value), {})
+
+    @local
+    def update_cells(self, cell_list, value_input_option=None):
+        with self._store.lock:
+            return self._written("update_cells", (cell_list,), {})
+
+    @local
+    def update(self, *args, **kwargs):
+        with self._store.lock:
+            kwargs = {k: v for k, v in kwargs.items() if k in ("range_name", "values")}
+            return self._written("update", args, kwargs)
+
+    @local
+    def batch_update(self, data, **kwargs):
+        with self._store.lock:
+            return self._written("batch_update", (data,), {})
+
+    def _append(self, name, values):
+        with self._store.lock:
+            start = len(self._trimmed()) + 1
+            end = start + len(values) - 1
+            width = max((len(row) for row in values), default=1)
+            updated = f"{sheets._tab_range(self._title)}!A{start}:{sheets.column_letter(width)}{end}"
+            result = {"updates": {"updatedRange": updated, "updatedRows": len(values)}}
+            args = (values[0] if name == "append_row" else values,)
+            return self._written(name, args, {}, result)
+
+    @local
+    def append_row(self, values, **kwargs):
+        return self._append("append_row", [list(values)])
+
+    @local
+    def append_rows(self, values, **kwargs):
+        return self._append("append_rows", [list(row) for row in values])
+
+    @local
+    def delete_rows(self, start_index, end_index=None):
+        end_index = end_index or start_index
+        with self._store.lock:
+            del self._rows[start_index - 1:end_index]
+            self._store.delete_range(self._title, start_index, end_index)
+            self.version += 1
+            self._patch_indexes("delete_rows", (start_index, end_index), {}, None)
+
+    @local
+    def delete_row(self, index):
+        return self.delete_rows(index)
+
+    def delete_ranges(self, ranges):
+        # Highest range first, like sheets.delete_rows sends them
+        for start, end in ranges:
+            self.delete_rows(start, end)
+
+    @local
+    def clear(self):
+        with self._store.lock:
+            self._rows.clear()
+            self._store.clear_tab(self._title)
+            self.version += 1
+            self._indexes.clear()
+
+    # ---------- Sync ----------
+
+    def export(self):
+        with self._store.lock:
+            return self.get_all_values(), self.version
+
+    def __repr__(self):
+        return f"<LocalWorksheet {self._title!r} rows={len(self._rows)}>"
+
+
+class LocalSpreadsheet:
+    def __init__(self, remote, store, tabs=DEFAULT_TABS, sync_seconds=15):
+        self.remote = remote
+        self.store = store
+        self.local_tabs = set(tabs)
+        self.sync_seconds = sync_seconds
+        self._handles = {}
+        self._lock = threading.RLock()
+        self._sync_task = None
+        self.pushes = 0
+
+    @property
+    def cache(self):
+        return self.remote.cache
+
+    @property
+    def spreadsheet(self):
+        return self.remote.spreadsheet
+
+    def _open_local(self, title, remote_handle=None):
+        with self._lock:
+            handle = self._handles.get(title)
+            if handle is not None:
+                return handle
+            if not self.store.has_tab(title):
+                # First boot for this tab: take over whatever the sheet holds now
+                remote_handle = remote_handle or self.remote.worksheet(title)
+                values = remote_handle.get_all_values()
+                self.store.import_tab(title, values)
+                print(f"[📥] Imported {len(values)} row(s) of {title!r} into the local store.")
+            handle = LocalWorksheet(self, title, self.store.load_tab(title))
+            handle._remote = remote_handle
+            self._handles[title] = handle
+            return handle
+
+    def local_worksheet(self, title):
+        return self._open_local(title)
+
+    def import_missing(self):
+        """Import every local tab the store doesn't hold yet with one batch read."""
+        missing = [title for title in self.local_tabs if not self.store.has_tab(title)]
+        if not missing:
+            return 0
+        existing = {ws.title for ws in self.remote.spreadsheet.worksheets()}
+        missing = [title for title in missing if title in existing]
+        if not missing:
+            return 0
+        response = self.remote.spreadsheet.values_batch_get([sheets._tab_range(t) for t in missing])
+        for title, value_range in zip(missing, response.get("valueRanges", [])):
+            values = sheets._pad(value_range.get("values", []))
+            self.store.import_tab(title, values)
+            print(f"[📥] Imported {len(values)} row(s) of {title!r} into the local store.")
+        return len(missing)
+
+    def adopt_external(self, title, values, pushes):
+        """Take a hand edit made on the sheet, unless a sync ran since it was read or local changes are still unsynced."""
+        with self._lock, self.store.lock:
+            handle = self._open_local(title)
+            if pushes != self.pushes or self.store.is_dirty(title) or handle.get_all_values() == values:
+                return False
+            self.store.import_tab(title, values)
+            handle._rows[:] = [list(row) for row in values]
+            handle._indexes.clear()
+            handle.version += 1
+            print(f"[📥] Took {title!r} edits made on the sheet into the local store.")
+            return True
+
+    def worksheet(self, title):
+        if title in self.local_tabs:
+            return self._open_local(title)
+        return self.remote.worksheet(title)
+
+    def add_worksheet(self, *args, **kwargs):
+        handle = self.remote.add_worksheet(*args, **kwargs)
+        if handle.title in self.local_tabs:
+            if not self.store.has_tab(handle.title):
+                self.store.import_tab(handle.title, [])
+            return self._open_local(handle.title, handle)
+        return handle
+
+    def del_worksheet(self, worksheet):
+        if getattr(worksheet, "is_local", False):
+            with self._lock:
+                self._handles.pop(worksheet.title, None)
+            worksheet = worksheet.remote
+        return self.remote.del_worksheet(worksheet)
+
+    def worksheets(self, *args, **kwargs):
+        return [self.worksheet(ws.title) if ws.title in self.local_tabs else ws for ws in self.remote.worksheets(*args, **kwargs)]
+
+    def __getattr__(self, name):
+        return getattr(self.remote, name)
+
+    # ---------- Background mirror to Sheets ----------
+
+    def _push(self):
+        dirty = [title for title in self.store.dirty_tabs() if title in self.local_tabs]
+        if not dirty:
+            return []
+
+        data = []
+        pushed = []
+        for title in dirty:
+            handle = self._open_local(title)
+            values, version = handle.export()
+            width = max((len(row) for row in values), default=0)
+            old_rows, old_cols = self.store.pushed_shape(title)
+            # Blank out whatever the last push wrote beyond the new shape
+            rows, cols = max(len(values), old_rows, 1), max(width, old_cols, 1)
+            grid = [row + [""] * (cols - len(row)) for row in values]
+            grid.extend([[""] * cols for _ in range(rows - len(grid))])
+
+            raw = handle.remote.worksheet
+            if raw.row_count < rows or raw.col_count < cols:
+                raw.resize(rows=max(raw.row_count, rows), cols=max(raw.col_count, cols))
+            data.append({"range": f"{sheets._tab_range(title)}!A1:{sheets.column_letter(cols)}{rows}", "values": grid})
+            pushed.append((handle, len(values), width, version))
+
+        self.remote.spreadsheet.values_batch_update({"valueInputOption": "USER_ENTERED", "data": data})
+        self.pushes += 1
+        for handle, rows, cols, version in pushed:
+            self.cache.invalidate(handle.title)
+            self.store.mark_pushed(handle.title, rows, cols, still_clean=handle.version == version)
+        return [handle.title for handle, *_ in pushed]
+
+    @sheets.idempotent
+    def push(self):
+        with self._lock:
+            return self._push()
+
+    async def sync(self):
+        pushed = await sheets.call(self.push)
+        if pushed:
+            print(f"[🔄] Mirrored {len(pushed)} tab(s) to Google Sheets: {', '.join(pushed)}")
+        return pushed
+
+    async def _sync_loop(self):
+        sheets.set_lane("background")
+        while True:
+            await asyncio.sleep(self.sync_seconds)
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"[⚠️] Local store sync failed (will retry): {e}")
+
+    def start_sync(self):
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.get_running_loop().create_task(self._sync_loop())
+        return self._sync_task
+
+    def __repr__(self):
+        return f"<LocalSpreadsheet {self.store.path!r} tabs={sorted(self.local_tabs)}>"
+
+
+def open_local(remote, path="league.db", tabs=DEFAULT_TABS, sync_seconds=15):
+    """Put remote's hot tabs behind a SQLite store and register it as the process spreadsheet."""
+    spreadsheet = LocalSpreadsheet(remote, LocalStore(path), tabs=tabs, sync_seconds=sync_seconds)
+    spreadsheet.import_missing()
+    sheets.register_spreadsheet(remote.spreadsheet.title, spreadsheet)
+    return spreadsheet
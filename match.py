@@ -1,5 +1,10 @@
 import discord
 import json
+import sheets
+import pair_history
+import matchmaking
+import standings
+from rows import RosterIndex, member_id
 
 def get_or_create_sheet(spreadsheet, name, headers):
     try:
@@ -14,104 +19,71 @@ def get_next_match_id(matches_sheet):
     return str(len(match_ids) + 1)
 
 def extract_user_id(user_string):
-    if "(" in user_string and ")" in user_string:
-        return user_string.split("(")[-1].split(")")[0]
-    return None
-
-def update_team_rating(leaderboard_sheet, team_name, won, elo_win, elo_loss):
-    for idx, row in enumerate(leaderboard_sheet.get_all_values(), 1):
-        if row[0] == team_name:
-            rating = int(row[1])
-            wins = int(row[2])
-            losses = int(row[3])
-            matches = int(row[4])
-
-            new_rating = rating + (elo_win if won else elo_loss)
-            leaderboard_sheet.update(
-                f"B{idx}",
-                [[new_rating, wins + (1 if won else 0), losses + (0 if won else 1), matches + 1]]
-            )
-            return
-
-    # Team not found — add new row
-    with open("config.json") as f:
-        config = json.load(f)
-    starting_elo = config.get("default_team_rating", 800)
-    leaderboard_sheet.append_row([
-        team_name, starting_elo, 1 if won else 0, 0 if won else 1, 1
-    ])
+    return member_id(user_string) or None
 
-def get_team_mentions(interaction, team_name, teams_sheet, ping_full_team):
-    team_row = next((row for row in teams_sheet.get_all_values() if row[0] == team_name), None)
-    if not team_row:
+def get_team_mentions(interaction, team_name, roster, ping_full_team):
+    """Mentions for a team's roster; `roster` is a RosterIndex from one Teams snapshot."""
+    team = roster.get(team_name)
+    if not team:
         return team_name
 
     mentions = []
-    for player in team_row[1:]:
-        if "(" in player and ")" in player:
-            user_id = player.split("(")[-1].split(")")[0]
+    for name, user_id in team.players:
+        if user_id:
             member = interaction.guild.get_member(int(user_id))
             if member and ping_full_team:
                 mentions.append(member.mention)
-        elif player.strip():
-            mentions.append(player)
+        else:
+            mentions.append(name)
 
     return " ".join(mentions) if mentions else team_name
 
-def sync_leaderboard_with_teams(config_data, teams_sheet, leaderboard_sheet):
+async def sync_leaderboard_with_teams(config_data, teams_sheet, leaderboard_sheet):
+    # New teams go onto the board standings owns, so a pending publish can't drop them
     team_min_players = int(config_data.get("team_min_players", 1))
-    existing_teams = [row[0] for row in leaderboard_sheet.get_all_values()[1:]]
-    team_rows = teams_sheet.get_all_values()[1:]
+    team_rows = (await sheets.get_values(teams_sheet))[1:]
 
-    added = 0
+    eligible = []
     for row in team_rows:
         team_name = row[0]
         players = [p for p in row[1:] if p.strip()]
 
-        if len(players) >= team_min_players and team_name not in existing_teams:
-            with open("config.json") as f:
-                config = json.load(f)
-            starting_elo = config.get("default_team_rating", 800)
-            leaderboard_sheet.append_row([team_name, starting_elo, 0, 0, 0])
-            added += 1
-
-    print(f"[DEBUG] Synced {added} new teams to leaderboard.")
-
-def update_team_rating(leaderboard_sheet, team_name, won, elo_win, elo_loss):
-    for idx, row in enumerate(leaderboard_sheet.get_all_values(), 1):
-        if row[0] == team_name:
-            rating = int(row[1])
-            wins = int(row[2])
-            losses = int(row[3])
-            matches = int(row[4])
-
-            new_rating = rating + (elo_win if won else elo_loss)
-            leaderboard_sheet.update(
-                f"B{idx}",
-                [[new_rating, wins + (1 if won else 0), losses + (0 if won else 1), matches + 1]]
-            )
-            break
-    else:
-        with open("config.json") as f:
-            config = json.load(f)
-        starting_elo = config.get("default_team_rating", 800)
-        leaderboard_sheet.append_row([team_name, starting_elo, 1 if won else 0, 0 if won else 1, 1])
-
-    # ✅ Re-sort the leaderboard by rating (column 2, descending)
-    data = leaderboard_sheet.get_all_values()
-    header, rows = data[0], data[1:]
-    sorted_rows = sorted(rows, key=lambda x: int(x[1]), reverse=True)
-
-    leaderboard_sheet.clear()
-    leaderboard_sheet.append_row(header)
-    leaderboard_sheet.append_rows(sorted_rows)
+        if len(players) >= team_min_players:
+            eligible.append(team_name)
 
-def log_forfeit_to_history(sheet, week, match_id, team_a, team_b, reason):
-    sheet.append_row([
+    added = await standings.add_teams(leaderboard_sheet, eligible, config_data.get("default_team_rating", 800), config_data)
+    print(f"[DEBUG] Synced {len(added)} new teams to leaderboard.")
+
+class RatingBatch:
+    """Team results for a rollover, applied to the in-memory board (standings.py) and written once."""
+
+    def __init__(self, elo_win, elo_loss, starting_elo=800, config=None):
+        self.elo_win = elo_win
+        self.elo_loss = elo_loss
+        self.starting_elo = starting_elo
+        self.config = config
+        self.results = []
+
+    def record(self, winner, loser):
+        self.results.append((winner, loser))
+
+    def __len__(self):
+        return len(self.results)
+
+    async def apply(self, leaderboard_sheet):
+        await standings.record_results(leaderboard_sheet, self.results, self.elo_win, self.elo_loss, self.starting_elo, self.config)
+        self.results = []
+
+def forfeit_history_row(week, match_id, team_a, team_b, reason):
+    return [
         week, match_id, team_a, team_b,
         "", "",  # Proposed & Scheduled Date
         "", "", "", "", "", "", "", "", "", "", "", "", reason  # Winner column
-    ])
+    ]
+
+def log_forfeit_to_history(sheet, week, match_id, team_a, team_b, reason):
+    sheet.append_row(forfeit_history_row(week, match_id, team_a, team_b, reason))
+    pair_history.record(team_a, team_b)
 
 def archive_and_clear_challenges(spreadsheet):
     from datetime import datetime
@@ -158,37 +130,103 @@ def archive_and_clear_challenges(spreadsheet):
             "", "", "", "", "" # totals + winner
         ])
 
+    pair_history.record_many((row[1], row[2]) for row in challenge_data)
+
     # Reset challenge sheet
     challenge_sheet.clear()
     challenge_sheet.append_row(["Week", "Team A", "Team B", "Proposer ID", "Completion Date"])
 
-async def generate_weekly_matches(interaction, spreadsheet, week_number, force=True):
-    from collections import defaultdict
-
-    if not interaction.response.is_done():
-        await interaction.response.defer()
+MATCH_HISTORY_HEADERS = [
+    "Week", "Match ID", "Team A", "Team B", "Proposed Date", "Scheduled Date",
+    "Map 1 Mode", "Map 1 A", "Map 1 B",
+    "Map 2 Mode", "Map 2 A", "Map 2 B",
+    "Map 3 Mode", "Map 3 A", "Map 3 B",
+    "Total A", "Total B", "Maps Won A", "Maps Won B", "Winner"
+]
+
+class WeeklyPlan:
+    """Everything a weekly rollover will write, worked out from one snapshot without writing anything."""
+
+    def __init__(self, week_number, force):
+        self.week_number = week_number
+        self.force = force
+        self.error = None
+        self.valid_teams = []
+        self.new_leaderboard_teams = []   # teams sync_leaderboard_with_teams will add
+        self.ratings = {}                 # ratings the pairing used (after forfeit ELO)
+        self.forfeits = []                # (row, match_id, team_a, team_b, status, winner, loser, reason)
+        self.pairing = None
+
+    @property
+    def matchups(self):
+        return self.pairing.matchups if self.pairing else []
+
+    def match_id(self, index):
+        return f"Week{self.week_number}-M{index:03d}"
+
+    def same_as(self, other):
+        """True if `other` (planned again later) would write exactly what this plan previewed."""
+        def outcome(plan):
+            return (
+                plan.week_number, plan.force, plan.error, plan.new_leaderboard_teams, plan.ratings, plan.matchups,
+                [(match_id, team_a, team_b, status, winner, loser) for _, match_id, team_a, team_b, status, winner, loser, _ in plan.forfeits],
+            )
+        return outcome(self) == outcome(other)
+
+    def preview(self, limit=1800):
+        """Plain-text summary for the admin to check before anything is written."""
+        lines = [f"🧪 **Week {self.week_number} preview** — nothing has been written yet."]
+        if self.force:
+            lines.append("🧹 Weekly, Proposed, Scheduled and Challenge tabs will be cleared (challenges archived first).")
+        if self.new_leaderboard_teams:
+            lines.append(f"➕ Added to leaderboard: {', '.join(self.new_leaderboard_teams)}")
+        if self.forfeits:
+            lines.append(f"\n__**Forfeits ({len(self.forfeits)}):**__")
+            lines += [f"- `{match_id}` {team_a} vs {team_b} → {reason}" for _, match_id, team_a, team_b, _, _, _, reason in self.forfeits]
+        if self.error:
+            lines.append(f"\n❗ {self.error}")
+        else:
+            lines.append(f"\n__**Matchups ({len(self.matchups)}):**__")
+            lines += [
+                f"- `{self.match_id(index)}` {team_a} ({self.ratings.get(team_a, '?')}) vs {team_b} ({self.ratings.get(team_b, '?')})"
+                for index, (team_a, team_b) in enumerate(self.matchups, start=1)
+            ]
+            if self.pairing.rematches:
+                lines.append("🔁 Rematches: " + ", ".join(f"{a} vs {b} (#{n})" for a, b, n in self.pairing.rematches))
+            if self.pairing.unmatched:
+                lines.append("⚠️ Short of a full week: " + ", ".join(f"`{team}` ({self.pairing.match_count[team]})" for team in self.pairing.unmatched))
+
+        text = ""
+        for index, line in enumerate(lines):
+            if len(text) + len(line) + 40 > limit:
+                text += f"… {len(lines) - index} more line(s)"
+                break
+            text += line + "\n"
+        return text
 
+async def plan_weekly_matches(spreadsheet, week_number, force=True):
+    """Work out forfeits and pairings for a week from one snapshot; reads only."""
     with open("config.json") as f:
         config = json.load(f)
 
     min_teams_required = config.get("minimum_teams_start", 2)
     team_min_players = config.get("team_min_players", 1)
-    match_channel_id = config.get("weekly_channel_id")
     elo_win = config.get("elo_win_points", 25)
     elo_loss = config.get("elo_loss_points", -25)
     affect_elo = config.get("forfeit_affects_elo", True)
-    ping_full_team = config.get("match_ping_full_team", True)
+    starting_elo = config.get("default_team_rating", 800)
 
-    matches_sheet = get_or_create_sheet(spreadsheet, "Matches", ["Match ID", "Team A", "Team B", "Proposed Date", "Scheduled Date", "Status", "Winner", "Loser", "Proposed By"])
-    leaderboard_sheet = get_or_create_sheet(spreadsheet, "Leaderboard", ["Team Name", "Rating", "Wins", "Losses", "Matches Played"])
-    weekly_sheet = get_or_create_sheet(spreadsheet, "Weekly Matches", ["Week", "Team A", "Team B", "Match ID", "Scheduled Date"])
-    teams_sheet = get_or_create_sheet(spreadsheet, "Teams", ["Team Name", "Captain", "Player 2", "Player 3", "Player 4", "Player 5", "Player 6"])
-    sync_leaderboard_with_teams(config, teams_sheet, leaderboard_sheet)
+    matches_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Matches", ["Match ID", "Team A", "Team B", "Proposed Date", "Scheduled Date", "Status", "Winner", "Loser", "Proposed By"])
+    leaderboard_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Leaderboard", ["Team Name", "Rating", "Wins", "Losses", "Matches Played"])
+    teams_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Teams", ["Team Name", "Captain", "Player 2", "Player 3", "Player 4", "Player 5", "Player 6"])
+
+    # 📸 One read for every tab the rollover starts from (also primes the cache)
+    snapshot = await sheets.load_snapshot(spreadsheet, [teams_sheet, leaderboard_sheet, matches_sheet])
+    plan = WeeklyPlan(week_number, force)
 
     # Step 0: Gather eligible teams
-    team_rows = teams_sheet.get_all_values()[1:]
+    team_rows = snapshot["Teams"].rows
     team_players = {}
-    valid_teams = []
 
     for row in team_rows:
         team_name = row[0]
@@ -201,51 +239,23 @@ async def generate_weekly_matches(interaction, spreadsheet, week_number, force=T
             continue
 
         if len(players) >= team_min_players:
-            valid_teams.append(team_name)
-    pair_history = defaultdict(int)
-    match_history_sheet = get_or_create_sheet(
-        spreadsheet, "Match History",
-        ["Week", "Match ID", "Team A", "Team B", "Proposed Date", "Scheduled Date",
-        "Map 1 Mode", "Map 1 A", "Map 1 B",
-        "Map 2 Mode", "Map 2 A", "Map 2 B",
-        "Map 3 Mode", "Map 3 A", "Map 3 B",
-        "Total A", "Total B", "Maps Won A", "Maps Won B", "Winner"]
-    )
-
-    for row in match_history_sheet.get_all_values()[1:]:
-        team_a, team_b = row[2], row[3]
-        if team_a and team_b:
-            key = tuple(sorted([team_a, team_b]))
-            pair_history[key] += 1
-
-    # Step 1: Handle force cleanup
-    if force:
-        archive_and_clear_challenges(spreadsheet)
-
-        weekly_sheet.clear()
-        weekly_sheet.append_row(["Week", "Team A", "Team B", "Match ID", "Scheduled Date"])
-
-        proposed_sheet = get_or_create_sheet(spreadsheet, "Match Propose", ["Team A", "Team B", "Proposer ID", "Proposed Date"])
-        proposed_sheet.clear()
-        proposed_sheet.append_row(["Team A", "Team B", "Proposer ID", "Proposed Date"])
+            plan.valid_teams.append(team_name)
 
-        scheduled_sheet = get_or_create_sheet(spreadsheet, "Match Scheduled", ["Match ID", "Team A", "Team B", "Scheduled Date"])
-        scheduled_sheet.clear()
-        scheduled_sheet.append_row(["Match ID", "Team A", "Team B", "Scheduled Date"])
-
-        challenge_sheet = get_or_create_sheet(spreadsheet, "Challenge Matches", ["Week", "Team A", "Team B", "Proposer ID", "Proposed Date", "Completion Date"])
-        challenge_sheet.clear()
-        challenge_sheet.append_row(["Week", "Team A", "Team B", "Proposer ID", "Proposed Date", "Completion Date"])
+    # Same rule as sync_leaderboard_with_teams, without the write; ratings include
+    # results still waiting to be published
+    board = await standings.board(leaderboard_sheet)
+    ratings = {name: row[1] for name, row in board.rows.items()}
+    for row in team_rows:
+        if len([p for p in row[1:] if p.strip()]) >= int(team_min_players) and row[0] not in ratings:
+            plan.new_leaderboard_teams.append(row[0])
+            ratings[row[0]] = starting_elo
 
-        match_history_sheet = get_or_create_sheet(
-            spreadsheet, "Match History",
-            ["Week", "Match ID", "Team A", "Team B", "Proposed Date", "Scheduled Date",
-             "Map 1 Mode", "Map 1 A", "Map 1 B", "Map 2 Mode", "Map 2 A", "Map 2 B",
-             "Map 3 Mode", "Map 3 A", "Map 3 B", "Total A", "Total B", "Maps Won A", "Maps Won B", "Winner"]
-        )
+    # 🔢 Season meetings per pair, maintained as matches conclude (no Match History scan)
+    pair_counts = await pair_history.matrix(spreadsheet, plan.valid_teams)
 
-        existing = matches_sheet.get_all_values()[1:]
-        for idx, row in enumerate(existing, start=2):
+    # Step 1: Forfeits for everything left unplayed
+    if force:
+        for idx, row in enumerate(snapshot["Matches"].rows, start=2):
             fields = row[:9]
             if len(fields) < 9:
                 continue
@@ -257,152 +267,145 @@ async def generate_weekly_matches(interaction, spreadsheet, week_number, force=T
                 team_b_valid = team_players.get(team_b, 0) >= team_min_players
 
                 if team_a_valid and team_b_valid:
-                    matches_sheet.update_cell(idx, 6, "Double Forfeit")
-                    log_forfeit_to_history(match_history_sheet, week_number, match_id, team_a, team_b, "Double Forfeit")
+                    plan.forfeits.append((idx, match_id, team_a, team_b, "Double Forfeit", "", "", "Double Forfeit"))
                 elif team_a_valid:
-                    matches_sheet.update_cell(idx, 6, "Forfeited")
-                    matches_sheet.update_cell(idx, 7, team_a)
-                    matches_sheet.update_cell(idx, 8, team_b)
-                    if affect_elo:
-                        update_team_rating(leaderboard_sheet, team_a, True, elo_win, elo_loss)
-                        update_team_rating(leaderboard_sheet, team_b, False, elo_win, elo_loss)
-                    log_forfeit_to_history(match_history_sheet, week_number, match_id, team_a, team_b, f"{team_b} Forfeit")
+                    plan.forfeits.append((idx, match_id, team_a, team_b, "Forfeited", team_a, team_b, f"{team_b} Forfeit"))
                 elif team_b_valid:
-                    matches_sheet.update_cell(idx, 6, "Forfeited")
-                    matches_sheet.update_cell(idx, 7, team_b)
-                    matches_sheet.update_cell(idx, 8, team_a)
-                    if affect_elo:
-                        update_team_rating(leaderboard_sheet, team_b, True, elo_win, elo_loss)
-                        update_team_rating(leaderboard_sheet, team_a, False, elo_win, elo_loss)
-                    log_forfeit_to_history(match_history_sheet, week_number, match_id, team_a, team_b, f"{team_a} Forfeit")
+                    plan.forfeits.append((idx, match_id, team_a, team_b, "Forfeited", team_b, team_a, f"{team_a} Forfeit"))
                 else:
-                    matches_sheet.update_cell(idx, 6, "Double Forfeit")
-                    log_forfeit_to_history(match_history_sheet, week_number, match_id, team_a, team_b, "Double Forfeit")
+                    plan.forfeits.append((idx, match_id, team_a, team_b, "Double Forfeit", "", "", "Double Forfeit"))
+
+        # Forfeit ELO lands before the pairing reads ratings
+        if affect_elo:
+            decided = [(winner, loser) for _, _, _, _, _, winner, loser, _ in plan.forfeits if winner]
+            preview = standings.preview_results(board, decided, elo_win, elo_loss, starting_elo, config)
+            ratings.update({team: rating for team, rating in preview.items() if team in ratings})
+
+    if len(plan.valid_teams) < min_teams_required:
+        plan.error = "Not enough valid teams to generate matchups."
+        return plan
+
+    # Step 2–3: Pair the week (matchmaking.py, solver picked in config)
+    plan.ratings = {team: ratings[team] for team in plan.valid_teams if team in ratings}
+    plan.pairing = matchmaking.pair_teams(
+        plan.valid_teams, plan.ratings, pair_counts,
+        solver=config.get("matchmaking_solver", matchmaking.DEFAULT_SOLVER),
+        rematch_penalty=config.get("matchmaking_rematch_penalty", 150),
+    )
+    return plan
 
-    if len(valid_teams) < min_teams_required:
-        await interaction.followup.send("❗ Not enough valid teams to generate matchups.", ephemeral=True)
-        return
+async def apply_weekly_plan(interaction, spreadsheet, plan):
+    """Write a WeeklyPlan exactly as previewed: cleanup, forfeits, matchups, announcements.
 
-    # Step 2: Get all team ELOs
-    all_teams = leaderboard_sheet.get_all_values()[1:]
-    team_ratings = {row[0]: int(row[1]) for row in all_teams if row[0] in valid_teams}
-
-    # Step 3: Bucket definitions and assignments
-    bucket_defs = [
-        ("Master", 1450, float('inf')),
-        ("Diamond", 1250, 1449),
-        ("Platinum", 1050, 1249),
-        ("Gold", 900, 1049),
-        ("Silver", 750, 899),
-        ("Bronze", 0, 749),
-    ]
+    Returns True once the matchups are published, False if the plan had an error.
+    """
+    if not interaction.response.is_done():
+        await interaction.response.defer()
 
-    buckets = {name: [] for name, _, _ in bucket_defs}
-    for team in valid_teams:
-        rating = team_ratings.get(team, 800)
-        for name, low, high in bucket_defs:
-            if low <= rating <= high:
-                buckets[name].append((team, rating))
-                break
+    with open("config.json") as f:
+        config = json.load(f)
 
-    # Step 4: Matchmaking with spillover
-    used_pairs = set()
-    matchups = []
-    match_count = defaultdict(int)
-
-    def can_match(a, b):
-        return match_count[a] < 2 and match_count[b] < 2 and tuple(sorted([a, b])) not in used_pairs
-    
-    def can_rematch(a, b):
-        key = tuple(sorted([a, b]))
-        return (
-            match_count[a] < 2 and
-            match_count[b] < 2 and
-            pair_history[key] < 3
-        )
-
-    def add_match(a, b):
-        key = tuple(sorted([a, b]))
-        matchups.append((a, b))
-        match_count[a] += 1
-        match_count[b] += 1
-        used_pairs.add(key)
-        pair_history[key] += 1
-
-    bucket_names = [b[0] for b in bucket_defs]
-
-    for i, name in enumerate(bucket_names):
-        teams = [t[0] for t in sorted(buckets[name], key=lambda x: x[1], reverse=True)]
-        leftovers = []
-
-        for a in teams:
-            if match_count[a] >= 2:
-                continue
-            paired = False
-            for b in teams:
-                if a == b or not can_match(a, b):
-                    continue
-                add_match(a, b)
-                paired = True
-                break
-            if not paired:
-                leftovers.append(a)
+    match_channel_id = config.get("weekly_channel_id")
+    elo_win = config.get("elo_win_points", 25)
+    elo_loss = config.get("elo_loss_points", -25)
+    affect_elo = config.get("forfeit_affects_elo", True)
+    ping_full_team = config.get("match_ping_full_team", True)
+    week_number = plan.week_number
 
-        for a in leftovers:
-            if match_count[a] >= 2:
+    matches_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Matches", ["Match ID", "Team A", "Team B", "Proposed Date", "Scheduled Date", "Status", "Winner", "Loser", "Proposed By"])
+    leaderboard_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Leaderboard", ["Team Name", "Rating", "Wins", "Losses", "Matches Played"])
+    weekly_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Weekly Matches", ["Week", "Team A", "Team B", "Match ID", "Scheduled Date"])
+    teams_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Teams", ["Team Name", "Captain", "Player 2", "Player 3", "Player 4", "Player 5", "Player 6"])
+    await sync_leaderboard_with_teams(config, teams_sheet, leaderboard_sheet)
+
+    # Step 1: Handle force cleanup
+    if plan.force:
+        await sheets.call(archive_and_clear_challenges, spreadsheet)
+
+        await sheets.call(weekly_sheet.clear)
+        await sheets.call(weekly_sheet.append_row, ["Week", "Team A", "Team B", "Match ID", "Scheduled Date"])
+
+        proposed_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Match Propose", ["Team A", "Team B", "Proposer ID", "Proposed Date"])
+        await sheets.call(proposed_sheet.clear)
+        await sheets.call(proposed_sheet.append_row, ["Team A", "Team B", "Proposer ID", "Proposed Date"])
+
+        scheduled_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Match Scheduled", ["Match ID", "Team A", "Team B", "Scheduled Date"])
+        await sheets.call(scheduled_sheet.clear)
+        await sheets.call(scheduled_sheet.append_row, ["Match ID", "Team A", "Team B", "Scheduled Date"])
+
+        challenge_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Challenge Matches", ["Week", "Team A", "Team B", "Proposer ID", "Proposed Date", "Completion Date"])
+        await sheets.call(challenge_sheet.clear)
+        await sheets.call(challenge_sheet.append_row, ["Week", "Team A", "Team B", "Proposer ID", "Proposed Date", "Completion Date"])
+
+        match_history_sheet = await sheets.call(get_or_create_sheet, spreadsheet, "Match History", MATCH_HISTORY_HEADERS)
+
+        # 🧾 Queue every forfeit write and send them together; rows that moved or
+        # were finished since the preview are left alone
+        current = await sheets.get_values(matches_sheet)
+        match_writes = sheets.batch(matches_sheet)
+        ratings = RatingBatch(elo_win, elo_loss, config.get("default_team_rating", 800), config)
+        history_rows = []
+
+        for idx, match_id, team_a, team_b, status, winner, loser, reason in plan.forfeits:
+            row = current[idx - 1] if idx <= len(current) else []
+            if not row or row[0] != match_id or row[5].strip() in ["Finished", "Cancelled", "Forfeited"]:
+                print(f"⚠️ Skipping forfeit for {match_id}: the match changed after the preview")
                 continue
-            adjacents = []
-            if i > 0:
-                adjacents += [t[0] for t in buckets[bucket_names[i - 1]]]
-            if i < len(bucket_names) - 1:
-                adjacents += [t[0] for t in buckets[bucket_names[i + 1]]]
-            for b in adjacents:
-                if a != b and can_match(a, b):
-                    add_match(a, b)
-                    break
-        # 🔁 Final retry: Try to pair any 1-match teams with each other
-    one_match_teams = [t for t in valid_teams if match_count[t] == 1]
-    for i in range(len(one_match_teams)):
-        for j in range(i + 1, len(one_match_teams)):
-            a = one_match_teams[i]
-            b = one_match_teams[j]
-            if can_match(a, b):
-                add_match(a, b)
-                break
 
-    # 🔁 LAST RESORT: rematch teams if needed (up to 3 total per season)
-    unmatched = [t for t in valid_teams if match_count[t] < 2]
-    for i in range(len(unmatched)):
-        for j in range(i + 1, len(unmatched)):
-            a = unmatched[i]
-            b = unmatched[j]
-            if can_rematch(a, b):
-                add_match(a, b)
-                print(f"⚠️ Rematch fallback: {a} vs {b} — rematch #{pair_history[tuple(sorted([a, b]))]}")
-                if match_count[a] >= 2 and match_count[b] >= 2:
-                    break
-
-    # ⚠️ Log teams that got 0 matches
-    for team in valid_teams:
-        if match_count[team] == 0:
-            print(f"⚠️ {team} received no matches this cycle")
-
-    # Step 6: Notify
+            match_writes.update_cell(idx, 6, status)
+            if winner:
+                match_writes.update_cell(idx, 7, winner)
+                match_writes.update_cell(idx, 8, loser)
+                if affect_elo:
+                    ratings.record(winner, loser)
+            history_rows.append(forfeit_history_row(week_number, match_id, team_a, team_b, reason))
+
+        await match_writes.flush()
+        # 📈 Every forfeit's ELO in one Leaderboard write
+        await ratings.apply(leaderboard_sheet)
+        if history_rows:
+            await sheets.call(match_history_sheet.append_rows, history_rows)
+            pair_history.record_many((row[2], row[3]) for row in history_rows)
+
+    if plan.error:
+        await interaction.followup.send(f"❗ {plan.error}", ephemeral=True)
+        return False
+
+    # The old week is settled; its rating period closes (Elo/Glicko-2 engines)
+    await standings.close_period(leaderboard_sheet, week_number, config)
+
+    matchups = plan.matchups
+    match_count = plan.pairing.match_count
+    for a, b, meeting in plan.pairing.rematches:
+        print(f"⚠️ Rematch: {a} vs {b} — meeting #{meeting} this season")
+
+    # ⚠️ Log teams that are short of a full week
+    for team in plan.pairing.unmatched:
+        print(f"⚠️ {team} received {match_count[team]} match(es) this cycle")
+
+    # Step 5: Save every matchup with one append per tab
+    weekly_rows = []
+    match_rows = []
+    for index, (team_a, team_b) in enumerate(matchups, start=1):
+        match_id = plan.match_id(index)
+        weekly_rows.append([week_number, team_a, team_b, match_id, "TBD"])
+        match_rows.append([match_id, team_a, team_b, "TBD", "", "Auto Proposed", "", "", "", "System"])
+    if matchups:
+        await sheets.call(weekly_sheet.append_rows, weekly_rows)
+        await sheets.call(matches_sheet.append_rows, match_rows)
+
+    # Step 6: Notify (mentions from one Teams snapshot)
     match_channel = interaction.guild.get_channel(int(match_channel_id))
     if match_channel:
+        roster = await sheets.models(teams_sheet, RosterIndex)
         await match_channel.send(
     f"━━━━━━━━━━━━━━━━━━━━\n📢 **__WEEK {week_number} MATCHUPS__**\n━━━━━━━━━━━━━━━━━━━━"
 )
 
         for index, (team_a, team_b) in enumerate(matchups, start=1):
-            match_id = f"Week{week_number}-M{index:03d}"
-
-            mentions_a = get_team_mentions(interaction, team_a, teams_sheet, ping_full_team)
-            mentions_b = get_team_mentions(interaction, team_b, teams_sheet, ping_full_team)
-
-            # Save to sheets with correct match_id
-            weekly_sheet.append_row([week_number, team_a, team_b, match_id, "TBD"])
-            matches_sheet.append_row([match_id, team_a, team_b, "TBD", "", "Auto Proposed", "", "", "", "System"])
+            match_id = plan.match_id(index)
+            mentions_a = get_team_mentions(interaction, team_a, roster, ping_full_team)
+            mentions_b = get_team_mentions(interaction, team_b, roster, ping_full_team)
 
             message = (
                 f"🔹 **{team_a} vs {team_b}**\n"
@@ -414,8 +417,18 @@ async def generate_weekly_matches(interaction, spreadsheet, week_number, force=T
     summary_lines = [f"✅ Week {week_number} matchups generated.\n\n__**Match Count Per Team:**__"]
     for team in sorted(match_count):
         summary_lines.append(f"- `{team}`: {match_count[team]} match(es)")
+    if plan.pairing.unmatched:
+        summary_lines.append("\n__**Short of a full week:**__ " + ", ".join(f"`{team}`" for team in plan.pairing.unmatched))
 
     await interaction.followup.send("\n".join(summary_lines), ephemeral=True)
+    return True
+
+async def generate_weekly_matches(interaction, spreadsheet, week_number, force=True):
+    if not interaction.response.is_done():
+        await interaction.response.defer()
+
+    plan = await plan_weekly_matches(spreadsheet, week_number, force)
+    await apply_weekly_plan(interaction, spreadsheet, plan)
 
 def setup_match_module(bot, spreadsheet):
     from discord import app_commands
@@ -0,0 +1,345 @@
+# -------------------- Weekly Matchmaking --------------------
+#
+# Pairing for generate_weekly_matches, kept apart from the Discord/Sheets code
+# so it can be swapped (config "matchmaking_solver") and run headless.
+#
+# A solver takes the eligible teams, their ratings and the season pair counts
+# (see pair_history.py) and returns a Pairing. Every team wants
+# MATCHES_PER_TEAM games a week and a pair may meet at most MAX_MEETINGS times
+# a season.
+
+from collections import defaultdict
+from itertools import permutations
+
+MATCHES_PER_TEAM = 2
+MAX_MEETINGS = 3
+DEFAULT_RATING = 800
+DEFAULT_SOLVER = "cycles"
+
+BUCKETS = [
+    ("Master", 1450, float('inf')),
+    ("Diamond", 1250, 1449),
+    ("Platinum", 1050, 1249),
+    ("Gold", 900, 1049),
+    ("Silver", 750, 899),
+    ("Bronze", 0, 749),
+]
+
+SOLVERS = {}
+
+
+def solver(name):
+    def register(fn):
+        SOLVERS[name] = fn
+        return fn
+    return register
+
+
+def pair_key(team_a, team_b):
+    return tuple(sorted([team_a, team_b]))
+
+
+class Pairing:
+    def __init__(self, teams, matchups, pair_counts):
+        self.matchups = matchups
+        self.match_count = defaultdict(int)
+        for team_a, team_b in matchups:
+            self.match_count[team_a] += 1
+            self.match_count[team_b] += 1
+        # Teams short of a full week, in the order they were passed in
+        self.unmatched = [t for t in teams if self.match_count[t] < MATCHES_PER_TEAM]
+        # (team_a, team_b, meeting number this will be)
+        self.rematches = [(a, b, pair_counts.get(pair_key(a, b), 0) + 1) for a, b in matchups if pair_counts.get(pair_key(a, b), 0)]
+
+
+def pair_teams(teams, ratings, pair_counts, solver=DEFAULT_SOLVER, **options):
+    """Run the named solver; unknown names fall back to the default one."""
+    fn = SOLVERS.get(solver)
+    if fn is None:
+        print(f"⚠️ Unknown matchmaking solver '{solver}', using '{DEFAULT_SOLVER}'")
+        fn = SOLVERS[DEFAULT_SOLVER]
+    teams = list(teams)
+    matchups = fn(teams, ratings, pair_counts, **options)
+    return Pairing(teams, matchups, pair_counts)
+
+
+@solver("greedy")
+def greedy(teams, ratings, pair_counts, **options):
+    """The original matcher: rating buckets, adjacent-bucket spillover, a one-match retry, then rematches."""
+    pair_history = defaultdict(int, pair_counts)
+
+    buckets = {name: [] for name, _, _ in BUCKETS}
+    for team in teams:
+        rating = ratings.get(team, DEFAULT_RATING)
+        for name, low, high in BUCKETS:
+            if low <= rating <= high:
+                buckets[name].append((team, rating))
+                break
+
+    used_pairs = set()
+    matchups = []
+    match_count = defaultdict(int)
+
+    def can_match(a, b):
+        return match_count[a] < 2 and match_count[b] < 2 and tuple(sorted([a, b])) not in used_pairs
+
+    def can_rematch(a, b):
+        key = tuple(sorted([a, b]))
+        return (
+            match_count[a] < 2 and
+            match_count[b] < 2 and
+            pair_history[key] < MAX_MEETINGS
+        )
+
+    def add_match(a, b):
+        key = tuple(sorted([a, b]))
+        matchups.append((a, b))
+        match_count[a] += 1
+        match_count[b] += 1
+        used_pairs.add(key)
+        pair_history[key] += 1
+
+    bucket_names = [b[0] for b in BUCKETS]
+
+    for i, name in enumerate(bucket_names):
+        bucket_teams = [t[0] for t in sorted(buckets[name], key=lambda x: x[1], reverse=True)]
+        leftovers = []
+
+        for a in bucket_teams:
+            if match_count[a] >= 2:
+                continue
+            paired = False
+            for b in bucket_teams:
+                if a == b or not can_match(a, b):
+                    continue
+                add_match(a, b)
+                paired = True
+                break
+            if not paired:
+                leftovers.append(a)
+
+        for a in leftovers:
+            if match_count[a] >= 2:
+                continue
+            adjacents = []
+            if i > 0:
+                adjacents += [t[0] for t in buckets[bucket_names[i - 1]]]
+            if i < len(bucket_names) - 1:
+                adjacents += [t[0] for t in buckets[bucket_names[i + 1]]]
+            for b in adjacents:
+                if a != b and can_match(a, b):
+                    add_match(a, b)
+                    break
+
+    # 🔁 Final retry: Try to pair any 1-match teams with each other
+    one_match_teams = [t for t in teams if match_count[t] == 1]
+    for i in range(len(one_match_teams)):
+        for j in range(i + 1, len(one_match_teams)):
+            a = one_match_teams[i]
+            b = one_match_teams[j]
+            if can_match(a, b):
+                add_match(a, b)
+                break
+
+    # 🔁 LAST RESORT: rematch teams if needed (up to 3 total per season)
+    unmatched = [t for t in teams if match_count[t] < 2]
+    for i in range(len(unmatched)):
+        for j in range(i + 1, len(unmatched)):
+            a = unmatched[i]
+            b = unmatched[j]
+            if can_rematch(a, b):
+                add_match(a, b)
+                if match_count[a] >= 2 and match_count[b] >= 2:
+                    break
+
+    return matchups
+
+
+# Rating neighbours each short team is first tried against in _repair
+REPAIR_WINDOW = 10
+
+# Cost of each game a team is short of MATCHES_PER_TEAM; far above any rating gap
+MISSING_MATCH_COST = 100000
+
+
+def _shapes(size, closed):
+    # Edge lists for every distinct cycle (closed) or path through positions 0..size-1,
+    # rotations and mirror images removed
+    shapes = []
+    for order in permutations(range(size)):
+        if size > 1 and (order[1 if closed else 0] > order[-1] or (closed and order[0] != 0)):
+            continue
+        edges = list(zip(order, order[1:]))
+        if closed:
+            edges.append((order[-1], order[0]))
+        shapes.append(edges)
+    return shapes
+
+
+# Cycles first: a block only settles for a path (two teams a game short) when no cycle fits
+_SHAPES = {size: (_shapes(size, True), _shapes(size, False)) for size in (3, 4, 5)}
+_SHAPES[2] = ([[(0, 1)]],)
+_SHAPES[1] = ([[]],)
+
+
+@solver("cycles")
+def cycles(teams, ratings, pair_counts, rematch_penalty=150, **options):
+    """Degree-2 matching as rating-ordered cycles.
+
+    Giving every team two games means splitting the league into cycles
+    (A-B, B-C, C-A ...). With cost = rating gap, the cheapest split of a
+    rating-sorted league uses cycles of 3–5 neighbouring teams, so a DP over
+    the sorted order picks the block sizes and each block takes its cheapest
+    cycle, where every previous meeting adds `rematch_penalty` and pairs
+    that already met MAX_MEETINGS times are not allowed. Every game a team
+    is short costs MISSING_MATCH_COST, so paths, pairs and lone teams are
+    only used when nothing else fits; that is how leftovers end up in
+    `Pairing.unmatched`. O(n) in the number of teams.
+
+    Blocks can't reach outside themselves, so once neighbouring teams have
+    used up their meetings a block comes up short; `_repair` then fills the
+    gaps across block boundaries.
+    """
+    order = sorted(teams, key=lambda t: (-ratings.get(t, DEFAULT_RATING), t))
+    rating = [ratings.get(t, DEFAULT_RATING) for t in order]
+    n = len(order)
+
+    def edge_cost(i, j):
+        a, b = order[i], order[j]
+        meetings = pair_counts.get((a, b) if a < b else (b, a), 0)
+        if meetings >= MAX_MEETINGS:
+            return None
+        return abs(rating[i] - rating[j]) + rematch_penalty * meetings
+
+    def block(start, size):
+        # (cost, [(i, j), ...]) for teams order[start:start + size], None if nothing fits
+        costs = {}
+        for x in range(size):
+            for y in range(x + 1, size):
+                costs[(x, y)] = costs[(y, x)] = edge_cost(start + x, start + y)
+        for shapes in _SHAPES[size]:
+            best = None
+            for edges in shapes:
+                total = MISSING_MATCH_COST * (MATCHES_PER_TEAM * size - 2 * len(edges))
+                for edge in edges:
+                    cost = costs[edge]
+                    if cost is None:
+                        break
+                    total += cost
+                else:
+                    if best is None or total < best[0]:
+                        best = (total, edges)
+            if best:
+                return best[0], [(start + x, start + y) for x, y in best[1]]
+        return None
+
+    best = [0] + [None] * n
+    choice = [None] * (n + 1)
+    for end in range(1, n + 1):
+        for size in (3, 4, 5, 2, 1):
+            start = end - size
+            if start < 0 or best[start] is None:
+                continue
+            result = block(start, size)
+            if result is None:
+                continue
+            total = best[start] + result[0]
+            if best[end] is None or total < best[end]:
+                best[end] = total
+                choice[end] = (size, result[1])
+        # size 1 always fits, so best[end] is set
+
+    blocks = []
+    end = n
+    while end > 0:
+        size, edges = choice[end]
+        blocks.append(edges)
+        end -= size
+
+    matchups = []
+    for edges in reversed(blocks):
+        matchups.extend((order[i], order[j]) for i, j in edges)
+    return _repair(order, ratings, pair_counts, matchups, rematch_penalty)
+
+
+def _repair(teams, ratings, pair_counts, matchups, rematch_penalty=150):
+    """Fill games teams are still short of, across the whole league.
+
+    First short teams are paired with each other (closest rating first).
+    What is left is fixed with a swap: drop a game x-y and play s-x and
+    t-y instead, where s and t are short (s == t for a team two games
+    short); x and y keep their two games and s and t gain one each.
+    Pairs never meet more than MAX_MEETINGS times counting this week.
+    """
+    count = defaultdict(int)
+    week = defaultdict(int)
+    for a, b in matchups:
+        count[a] += 1
+        count[b] += 1
+        week[pair_key(a, b)] += 1
+
+    def cost(a, b):
+        # None if a and b can't play (again) this week
+        key = pair_key(a, b)
+        meetings = pair_counts.get(key, 0)
+        if a == b or week[key] or meetings >= MAX_MEETINGS:
+            return None
+        return abs(ratings.get(a, DEFAULT_RATING) - ratings.get(b, DEFAULT_RATING)) + rematch_penalty * meetings
+
+    def add(a, b):
+        matchups.append((a, b))
+        count[a] += 1
+        count[b] += 1
+        week[pair_key(a, b)] += 1
+
+    def short():
+        return [t for t in teams if count[t] < MATCHES_PER_TEAM]
+
+    # Pass 1: short teams with each other, rating neighbours first, then anyone
+    window = REPAIR_WINDOW
+    while window:
+        needy = sorted(short(), key=lambda t: ratings.get(t, DEFAULT_RATING))
+        options = sorted(
+            (c, a, b) for i, a in enumerate(needy) for b in needy[i + 1:i + 1 + window]
+            if (c := cost(a, b)) is not None
+        )
+        progress = False
+        for _, a, b in options:
+            if count[a] < MATCHES_PER_TEAM and count[b] < MATCHES_PER_TEAM and cost(a, b) is not None:
+                add(a, b)
+                progress = True
+        if not progress:
+            window = len(needy) if window < len(needy) else 0
+
+    # Pass 2: swaps through a full game x-y
+    progress = True
+    while progress:
+        progress = False
+        needy = short()
+        for i, s in enumerate(needy):
+            partners = needy[i:] if MATCHES_PER_TEAM - count[s] >= 2 else needy[i + 1:]
+            best = None
+            for t in partners:
+                if t == s and MATCHES_PER_TEAM - count[s] < 2:
+                    continue
+                for index, (x, y) in enumerate(matchups):
+                    if s in (x, y) or t in (x, y):
+                        continue
+                    for u, v in ((x, y), (y, x)):
+                        cost_su, cost_tv = cost(s, u), cost(t, v)
+                        if cost_su is None or cost_tv is None or (s == t and u == v):
+                            continue
+                        total = cost_su + cost_tv
+                        if best is None or total < best[0]:
+                            best = (total, index, s, u, t, v)
+            if best:
+                _, index, s, u, t, v = best
+                x, y = matchups.pop(index)
+                week[pair_key(x, y)] -= 1
+                count[x] -= 1
+                count[y] -= 1
+                add(s, u)
+                add(t, v)
+                progress = True
+                break
+    return matchups
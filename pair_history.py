@@ -0,0 +1,184 @@
+# -------------------- Pair History --------------------
+#
+# How many times each pair of teams has met this season, kept in
+# json/pair_history.json and bumped as matches conclude (a score is finalized,
+# a match is forfeited at rollover, a challenge is archived) instead of being
+# recounted from the Match History tab on every weekly generation.
+#
+# The counts mirror what the sheets record: every Match History row plus every
+# Scoring row whose Match ID isn't already in Match History. rebuild() recounts
+# from those two tabs whenever the file is missing or a dev asks for it
+# (e.g. after hand edits to the history).
+
+import json
+import os
+import threading
+from collections import defaultdict
+
+import sheets
+
+PAIR_HISTORY_FOLDER = "json"
+PAIR_HISTORY_FILE = os.path.join(PAIR_HISTORY_FOLDER, "pair_history.json")
+
+
+def pair_key(team_a, team_b):
+    return tuple(sorted([team_a, team_b]))
+
+
+class PairHistory:
+    def __init__(self, path=PAIR_HISTORY_FILE):
+        self.path = path
+        # team -> {opponent: meetings}, stored in both directions so a lookup is one dict hit
+        self.counts = defaultdict(dict)
+        self.loaded = False
+        self._lock = threading.RLock()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        with self._lock:
+            self.counts = defaultdict(dict)
+            if self.exists():
+                try:
+                    with open(self.path, "r") as f:
+                        data = json.load(f)
+                    for team_a, team_b, meetings in data.get("pairs", []):
+                        self._set(team_a, team_b, int(meetings))
+                except Exception as e:
+                    print(f"[❌] Failed to load pair history: {e}")
+            self.loaded = True
+
+    def save(self):
+        with self._lock:
+            pairs = [
+                [team_a, team_b, meetings]
+                for team_a, opponents in sorted(self.counts.items())
+                for team_b, meetings in sorted(opponents.items())
+                if team_a < team_b
+            ]
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp = self.path + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump({"pairs": pairs}, f, indent=2)
+                os.replace(tmp, self.path)
+            except Exception as e:
+                print(f"[❌] Failed to save pair history: {e}")
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.load()
+
+    def _set(self, team_a, team_b, meetings):
+        if meetings > 0:
+            self.counts[team_a][team_b] = meetings
+            self.counts[team_b][team_a] = meetings
+        else:
+            self.counts.get(team_a, {}).pop(team_b, None)
+            self.counts.get(team_b, {}).pop(team_a, None)
+
+    def count(self, team_a, team_b):
+        with self._lock:
+            self._ensure_loaded()
+            return self.counts.get(team_a, {}).get(team_b, 0)
+
+    def record_many(self, pairs):
+        """Add one meeting per (team_a, team_b) and persist once."""
+        with self._lock:
+            self._ensure_loaded()
+            changed = False
+            for team_a, team_b in pairs:
+                if not team_a or not team_b or team_a == team_b:
+                    continue
+                self._set(team_a, team_b, self.counts.get(team_a, {}).get(team_b, 0) + 1)
+                changed = True
+            if changed:
+                self.save()
+
+    def record(self, team_a, team_b):
+        self.record_many([(team_a, team_b)])
+
+    def rename(self, old_name, new_name):
+        with self._lock:
+            self._ensure_loaded()
+            opponents = self.counts.pop(old_name, None)
+            if not opponents:
+                return
+            for opponent, meetings in opponents.items():
+                self.counts[opponent].pop(old_name, None)
+                if opponent == new_name:
+                    continue
+                self._set(new_name, opponent, self.counts.get(new_name, {}).get(opponent, 0) + meetings)
+            self.save()
+
+    def matrix(self, teams):
+        """pair_key -> meetings for every pair among `teams`; at most O(teams²), whatever the history length."""
+        with self._lock:
+            self._ensure_loaded()
+            teams = set(teams)
+            result = defaultdict(int)
+            for team in teams:
+                for opponent, meetings in self.counts.get(team, {}).items():
+                    if opponent in teams and team < opponent:
+                        result[(team, opponent)] = meetings
+            return result
+
+    def rebuild(self, history_rows, scoring_rows):
+        """Recount from Match History and Scoring data rows (no headers)."""
+        with self._lock:
+            self.counts = defaultdict(dict)
+            self.loaded = True
+            history_ids = set()
+            pairs = []
+            for row in history_rows:
+                if len(row) > 3 and row[2] and row[3]:
+                    pairs.append((row[2], row[3]))
+                if len(row) > 1 and row[1]:
+                    history_ids.add(row[1].strip())
+            for row in scoring_rows:
+                if len(row) > 2 and row[1] and row[2] and row[0].strip() not in history_ids:
+                    pairs.append((row[1], row[2]))
+            for team_a, team_b in pairs:
+                if team_a != team_b:
+                    self._set(team_a, team_b, self.counts.get(team_a, {}).get(team_b, 0) + 1)
+            self.save()
+            return len(pairs)
+
+
+history = PairHistory()
+
+
+def record(team_a, team_b):
+    history.record(team_a, team_b)
+
+
+def record_many(pairs):
+    history.record_many(pairs)
+
+
+def rename(old_name, new_name):
+    history.rename(old_name, new_name)
+
+
+async def rebuild(spreadsheet):
+    """Recount pair history from the Match History and Scoring tabs; returns the meetings counted."""
+    tabs = []
+    for title in ("Match History", "Scoring"):
+        try:
+            tabs.append(await sheets.call(spreadsheet.worksheet, title))
+        except Exception:
+            pass
+    snapshot = await sheets.load_snapshot(spreadsheet, tabs) if tabs else {}
+    history_rows = snapshot["Match History"].rows if "Match History" in snapshot else []
+    scoring_rows = snapshot["Scoring"].rows if "Scoring" in snapshot else []
+    total = history.rebuild(history_rows, scoring_rows)
+    print(f"🔁 Pair history rebuilt from {total} meetings")
+    return total
+
+
+async def matrix(spreadsheet, teams):
+    """Pair counts among `teams`, rebuilding from the sheets first if the file doesn't exist yet."""
+    if not history.exists():
+        await rebuild(spreadsheet)
+    return history.matrix(teams)
@@ -1,10 +1,9 @@
 import discord
-import gspread
 import json
 import os
 from discord.ext import commands, tasks
-from oauth2client.service_account import ServiceAccountCredentials
 import asyncio
+import sheets
 
 # === Load config ===
 with open("config.json") as f:
@@ -15,14 +14,7 @@ CHANNEL_ID = int(config["player_leaderboard_channel_id"])
 MESSAGE_ID_FILE = "PLAYER_leaderboard_msg_id.txt"
 
 # === Google Sheets setup ===
-scope = [
-    "https://spreadsheets.google.com/feeds",
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive"
-]
-creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-client = gspread.authorize(creds)
-spreadsheet = client.open(SHEET_NAME)
+spreadsheet = sheets.open_spreadsheet(SHEET_NAME)
 leaderboard_sheet = spreadsheet.worksheet("Player Leaderboard")
 
 # === Bot setup ===
@@ -88,6 +80,7 @@ async def on_ready():
 
 @tasks.loop(minutes=3600)
 async def update_leaderboard_loop():
+    sheets.set_lane("background")
     await post_or_update_leaderboard_embed()
 
 async def post_or_update_leaderboard_embed():
@@ -96,7 +89,7 @@ async def post_or_update_leaderboard_embed():
         print("❗ Score channel not found.")
         return
 
-    data = leaderboard_sheet.get_all_values()
+    data = await sheets.get_values(leaderboard_sheet)
     headers, rows = data[0], data[1:]
 
     if not rows:
@@ -0,0 +1,337 @@
+# -------------------- Rating Engines --------------------
+#
+# How a team's rating moves after a result, picked with config "rating_engine":
+#
+#   "flat"     the original fixed elo_win_points / elo_loss_points per result
+#   "elo"      expected-score Elo: K * (score - expected), expected from the rating gap
+#   "glicko2"  Glicko-2 with rating deviation and volatility per team
+#
+# Elo and Glicko-2 treat each league week as one rating period. Every team's
+# rating, RD and volatility at the start of the week are kept in
+# json/rating_state.json together with the week's results; a new result
+# re-rates the teams involved from their start-of-week state over all of
+# their games that week (one vectorized pass over the week's results), so the
+# leaderboard shows the live rating and the order results came in doesn't
+# matter. The weekly rollover closes the period. Player ratings stay on the
+# flat points under every engine.
+
+import json
+import math
+import os
+import threading
+
+RATING_STATE_FOLDER = "json"
+RATING_STATE_FILE = os.path.join(RATING_STATE_FOLDER, "rating_state.json")
+
+GLICKO_SCALE = 173.7178
+GLICKO_BASE = 1500
+
+ENGINES = {}
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def engine(name):
+    def register(cls):
+        cls.name = name
+        ENGINES[name] = cls
+        return cls
+    return register
+
+
+def from_config(config):
+    name = config.get("rating_engine", "flat")
+    cls = ENGINES.get(name)
+    if cls is None:
+        print(f"⚠️ Unknown rating engine '{name}', using 'flat'")
+        cls = ENGINES["flat"]
+    return cls(config)
+
+
+@engine("flat")
+class FlatEngine:
+    periodic = False
+
+    def __init__(self, config):
+        self.elo_win = config.get("elo_win_points", 25)
+        self.elo_loss = config.get("elo_loss_points", -25)
+        self.default_rd = 0
+        self.default_volatility = 0
+
+    def rate(self, start, games, teams):
+        ratings = {team: list(start[team]) for team in teams}
+        for team_a, team_b, score in games:
+            for team, won in ((team_a, score > 0.5), (team_b, score < 0.5)):
+                if team in ratings and score != 0.5:
+                    ratings[team][0] += self.elo_win if won else self.elo_loss
+        return ratings
+
+
+def _games_for(games, teams, index):
+    # One row per (team, opponent, score) from each team's side, only for `teams`
+    rows = []
+    for team_a, team_b, score in games:
+        if team_a in teams:
+            rows.append((index[team_a], index[team_b], score))
+        if team_b in teams:
+            rows.append((index[team_b], index[team_a], 1 - score))
+    return rows
+
+
+@engine("elo")
+class EloEngine:
+    periodic = True
+
+    def __init__(self, config):
+        self.k = config.get("elo_k_factor", 32)
+        self.default_rd = 0
+        self.default_volatility = 0
+
+    def rate(self, start, games, teams):
+        """Start-of-period ratings plus K * (score - expected) over every game in the period."""
+        names = list(start)
+        index = {team: i for i, team in enumerate(names)}
+        rows = _games_for(games, set(teams), index)
+        if not rows:
+            return {team: list(start[team]) for team in teams}
+
+        np = _numpy()
+        if np is not None:
+            own, opp, score = (np.asarray(column) for column in zip(*rows))
+            rating = np.asarray([start[team][0] for team in names], dtype=float)
+            expected = 1 / (1 + 10 ** ((rating[opp] - rating[own]) / 400))
+            change = np.bincount(own, weights=self.k * (score - expected), minlength=len(names))
+        else:
+            rating = [start[team][0] for team in names]
+            change = [0.0] * len(names)
+            for own, opp, score in rows:
+                expected = 1 / (1 + 10 ** ((rating[opp] - rating[own]) / 400))
+                change[own] += self.k * (score - expected)
+
+        return {team: [start[team][0] + float(change[index[team]])] + list(start[team][1:]) for team in teams}
+
+
+@engine("glicko2")
+class Glicko2Engine:
+    periodic = True
+
+    def __init__(self, config):
+        self.tau = config.get("glicko_tau", 0.5)
+        self.default_rd = config.get("glicko_default_rd", 350)
+        self.default_volatility = config.get("glicko_default_volatility", 0.06)
+
+    def _volatility(self, phi, sigma, v, delta):
+        # Step 5 of Glickman's Glicko-2 paper (Illinois algorithm)
+        a = math.log(sigma ** 2)
+        tau = self.tau
+
+        def f(x):
+            ex = math.exp(x)
+            return ex * (delta ** 2 - phi ** 2 - v - ex) / (2 * (phi ** 2 + v + ex) ** 2) - (x - a) / tau ** 2
+
+        A = a
+        if delta ** 2 > phi ** 2 + v:
+            B = math.log(delta ** 2 - phi ** 2 - v)
+        else:
+            k = 1
+            while f(a - k * tau) < 0:
+                k += 1
+            B = a - k * tau
+        fA, fB = f(A), f(B)
+        while abs(B - A) > 1e-6:
+            C = A + (A - B) * fA / (fB - fA)
+            fC = f(C)
+            if fC * fB <= 0:
+                A, fA = B, fB
+            else:
+                fA /= 2
+            B, fB = C, fC
+        return math.exp(A / 2)
+
+    def rate(self, start, games, teams):
+        """Glicko-2 update of `teams` from their start-of-period state over the period's games."""
+        names = list(start)
+        index = {team: i for i, team in enumerate(names)}
+        rows = _games_for(games, set(teams), index)
+        mu = [(start[team][0] - GLICKO_BASE) / GLICKO_SCALE for team in names]
+        phi = [start[team][1] / GLICKO_SCALE for team in names]
+
+        # Per-team sums over the period: 1/v and delta/v
+        inv_v = [0.0] * len(names)
+        total = [0.0] * len(names)
+        np = _numpy()
+        if rows and np is not None:
+            own, opp, score = (np.asarray(column) for column in zip(*rows))
+            mu_a, phi_a = np.asarray(mu), np.asarray(phi)
+            g = 1 / np.sqrt(1 + 3 * phi_a[opp] ** 2 / math.pi ** 2)
+            expected = 1 / (1 + np.exp(-g * (mu_a[own] - mu_a[opp])))
+            inv_v = np.bincount(own, weights=g ** 2 * expected * (1 - expected), minlength=len(names)).tolist()
+            total = np.bincount(own, weights=g * (score - expected), minlength=len(names)).tolist()
+        else:
+            for own, opp, score in rows:
+                g = 1 / math.sqrt(1 + 3 * phi[opp] ** 2 / math.pi ** 2)
+                expected = 1 / (1 + math.exp(-g * (mu[own] - mu[opp])))
+                inv_v[own] += g ** 2 * expected * (1 - expected)
+                total[own] += g * (score - expected)
+
+        ratings = {}
+        for team in teams:
+            i = index[team]
+            sigma = start[team][2]
+            if not inv_v[i]:
+                # No games this period: only the deviation grows
+                ratings[team] = [start[team][0], math.sqrt(phi[i] ** 2 + sigma ** 2) * GLICKO_SCALE, sigma]
+                continue
+            v = 1 / inv_v[i]
+            delta = v * total[i]
+            new_sigma = self._volatility(phi[i], sigma, v, delta)
+            phi_star = math.sqrt(phi[i] ** 2 + new_sigma ** 2)
+            new_phi = 1 / math.sqrt(1 / phi_star ** 2 + 1 / v)
+            new_mu = mu[i] + new_phi ** 2 * total[i]
+            ratings[team] = [new_mu * GLICKO_SCALE + GLICKO_BASE, new_phi * GLICKO_SCALE, new_sigma]
+        return ratings
+
+
+class RatingPeriods:
+    """Start-of-week state and this week's results, persisted as JSON."""
+
+    def __init__(self, path=RATING_STATE_FILE):
+        self.path = path
+        self.engine = None
+        self.period = None
+        self.start = {}     # team -> [rating, rd, volatility] at the start of the period
+        self.games = []     # [team_a, team_b, score for team_a]
+        self.loaded = False
+        self._lock = threading.RLock()
+
+    def load(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r") as f:
+                        data = json.load(f)
+                    self.engine = data.get("engine")
+                    self.period = data.get("period")
+                    self.start = {team: list(state) for team, state in data.get("start", {}).items()}
+                    self.games = [list(game) for game in data.get("games", [])]
+                except Exception as e:
+                    print(f"[❌] Failed to load rating state: {e}")
+            self.loaded = True
+
+    def save(self):
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp = self.path + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump({"engine": self.engine, "period": self.period, "start": self.start, "games": self.games}, f, indent=2)
+                os.replace(tmp, self.path)
+            except Exception as e:
+                print(f"[❌] Failed to save rating state: {e}")
+
+    def _prepare(self, rater, current):
+        # `current` maps team -> rating on the leaderboard now, used for teams the state hasn't seen
+        if not self.loaded:
+            self.load()
+        if self.engine != rater.name:
+            # Switching engines starts a fresh period from the leaderboard as it stands
+            self.engine = rater.name
+            self.start = {}
+            self.games = []
+        for team, rating in current.items():
+            if team not in self.start:
+                self.start[team] = [rating, rater.default_rd, rater.default_volatility]
+
+    def add_results(self, rater, matches, current):
+        """Add (winner, loser) results to the open period; returns {team: live rating} for the teams involved."""
+        with self._lock:
+            self._prepare(rater, current)
+            teams = set()
+            for winner, loser in matches:
+                self.games.append([winner, loser, 1.0])
+                teams.update((winner, loser))
+            rated = rater.rate(self.start, self.games, teams)
+            self.save()
+            return {team: round(state[0]) for team, state in rated.items()}
+
+    def preview(self, rater, matches, current):
+        """Live ratings add_results would give, without keeping anything."""
+        with self._lock:
+            if not self.loaded:
+                self.load()
+            same = self.engine == rater.name
+            start = {team: list(state) for team, state in self.start.items()} if same else {}
+            for team, rating in current.items():
+                start.setdefault(team, [rating, rater.default_rd, rater.default_volatility])
+            games = (list(self.games) if same else []) + [[winner, loser, 1.0] for winner, loser in matches]
+            teams = {team for match in matches for team in match}
+            return {team: round(state[0]) for team, state in rater.rate(start, games, teams).items()}
+
+    def adjust(self, team, change):
+        """A manual ELO change moves the team's start-of-period rating too, so the next result keeps it."""
+        with self._lock:
+            if not self.loaded:
+                self.load()
+            if team in self.start:
+                self.start[team][0] += change
+                self.save()
+
+    def rename(self, old_name, new_name):
+        with self._lock:
+            if not self.loaded:
+                self.load()
+            if old_name not in self.start and not any(old_name in game[:2] for game in self.games):
+                return
+            if old_name in self.start:
+                self.start[new_name] = self.start.pop(old_name)
+            for game in self.games:
+                game[:2] = [new_name if team == old_name else team for team in game[:2]]
+            self.save()
+
+    def close(self, rater, period, current):
+        """End the open period: everyone's end-of-period state becomes the next period's start."""
+        with self._lock:
+            self._prepare(rater, current)
+            if self.period == period:
+                return
+            self.start = rater.rate(self.start, self.games, list(self.start))
+            self.games = []
+            self.period = period
+            self.save()
+
+    def reset(self, rater, period, start, games):
+        """Replace the whole state (after a season recompute)."""
+        with self._lock:
+            self.loaded = True
+            self.engine = rater.name
+            self.period = period
+            self.start = {team: list(state) for team, state in start.items()}
+            self.games = [list(game) for game in games]
+            self.save()
+
+
+periods = RatingPeriods()
+
+
+def replay(rater, teams, weeks, starting_elo=800, open_period=None):
+    """Replay [(week, [(winner, loser), ...]), ...], oldest first, from starting_elo.
+
+    Weeks before `open_period` are closed as rating periods; results from
+    `open_period` on are left as the open period's games. Returns
+    (start state, open games), the same shape RatingPeriods keeps.
+    """
+    state = {team: [starting_elo, rater.default_rd, rater.default_volatility] for team in teams}
+    games = []
+    for week, matches in weeks:
+        played = [[winner, loser, 1.0] for winner, loser in matches if winner in state and loser in state]
+        if open_period is not None and week >= open_period:
+            games.extend(played)
+        else:
+            state = rater.rate(state, played, list(state))
+    return state, games
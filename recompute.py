@@ -0,0 +1,278 @@
+# -------------------- Season Recompute --------------------
+#
+# Ratings are changed in place as results come in, so a bad manual edit or an
+# undone score leaves the leaderboards with no record of how they got there.
+# This replays the season instead: every decided match in Scoring and every
+# forfeit in Match History, in week order, into fresh team ratings (plus the
+# dev ELO adjustments standings.adjust logs). Comparing the result with the
+# tabs is the integrity check; writing it back is one update per leaderboard.
+#
+# Players are NOT replayed: Scoring rows don't keep who played, and a player is
+# credited from the team's roster when the score is finalized. Player rows are
+# only checked for internal consistency, i.e. that the stored rating is what
+# the stored wins and losses work out to under flat ELO points.
+#
+# NumPy does the arithmetic when it is installed (results are indexed by team
+# or player position, so a season is a couple of array operations); without
+# it the same replay runs as a plain loop. Under the Elo and Glicko-2 engines
+# (ratings.py) team ratings are replayed week by week as rating periods.
+
+import json
+import re
+
+import ratings
+import sheets
+import standings
+from rows import to_int
+
+WEEK_PATTERN = re.compile(r"Week\s*(\d+)", re.IGNORECASE)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _week(value, default):
+    match = WEEK_PATTERN.search(str(value))
+    if match:
+        return int(match.group(1))
+    return to_int(value, default)
+
+
+RESULT_TABS = ("Scoring", "Match History")
+
+
+def season_results(scoring_rows, history_rows, forfeit_affects_elo=True):
+    """(week, winner, loser) for every decided result, oldest first.
+
+    Scores count in the week of their Match ID ("Week3-M001"); challenge and
+    hand-made IDs take the week of the score before them. Forfeits are logged
+    with the week that was starting, so they land after that previous week's
+    scores. Ties and double forfeits change nothing and are left out.
+    """
+    events = []
+    week = 0
+    for position, row in enumerate(scoring_rows):
+        row = list(row) + [""] * (17 - len(row))
+        week = _week(row[0], week)
+        winner = row[16].strip()
+        if not winner or winner == "Tie" or winner not in (row[1], row[2]):
+            continue
+        loser = row[2] if winner == row[1] else row[1]
+        events.append(((week, 0, position), winner, loser))
+
+    if forfeit_affects_elo:
+        for position, row in enumerate(history_rows):
+            row = list(row) + [""] * (19 - len(row))
+            reason = row[18].strip()
+            if not reason.endswith(" Forfeit") or reason == "Double Forfeit":
+                continue
+            loser = reason[: -len(" Forfeit")]
+            if loser not in (row[2], row[3]):
+                continue
+            winner = row[3] if loser == row[2] else row[2]
+            events.append(((to_int(row[0]) - 1, 1, position), winner, loser))
+
+    events.sort(key=lambda event: event[0])
+    return [(key[0], winner, loser) for key, winner, loser in events]
+
+
+def replay_teams(teams, results, elo_win, elo_loss, starting_elo=800):
+    """{team: (rating, wins, losses, matches)} for `teams` after replaying `results` with flat points."""
+    position = {team: i for i, team in enumerate(teams)}
+    pairs = [(position[w], position[l]) for _, w, l in results if w in position and l in position]
+    lone = [(position.get(w), position.get(l)) for _, w, l in results if (w in position) != (l in position)]
+    winners = [w for w, _ in pairs] + [w for w, _ in lone if w is not None]
+    losers = [l for _, l in pairs] + [l for _, l in lone if l is not None]
+
+    np = _numpy()
+    if np is not None:
+        count = len(teams)
+        wins = np.bincount(np.asarray(winners, dtype=np.int64), minlength=count)
+        losses = np.bincount(np.asarray(losers, dtype=np.int64), minlength=count)
+        rating = starting_elo + wins * elo_win + losses * elo_loss
+        return {team: (int(rating[i]), int(wins[i]), int(losses[i]), int(wins[i] + losses[i])) for team, i in position.items()}
+
+    wins = [0] * len(teams)
+    losses = [0] * len(teams)
+    for i in winners:
+        wins[i] += 1
+    for i in losers:
+        losses[i] += 1
+    return {
+        team: (starting_elo + wins[i] * elo_win + losses[i] * elo_loss, wins[i], losses[i], wins[i] + losses[i])
+        for team, i in position.items()
+    }
+
+
+def replay_engine(rater, teams, results, starting_elo=800, open_period=None, adjusted=None):
+    """Team ratings from a rating-period engine, plus the state to hand RatingPeriods.
+
+    Manual adjustments (`adjusted`, {team: change}) move the open period's
+    start rating, the same as standings.adjust does live.
+    Returns ({team: rating}, start state, open games).
+    """
+    weeks = []
+    for week, winner, loser in results:
+        if not weeks or weeks[-1][0] != week:
+            weeks.append((week, []))
+        weeks[-1][1].append((winner, loser))
+    start, games = ratings.replay(rater, teams, weeks, starting_elo, open_period)
+    for team, change in (adjusted or {}).items():
+        if team in start:
+            start[team][0] += change
+    played = {team for game in games for team in game[:2]}
+    live = rater.rate(start, games, played)
+    return {team: round(live[team][0] if team in live else start[team][0]) for team in teams}, start, games
+
+
+def replay_players(records, elo_win, elo_loss, default_rating=800):
+    """Rating each player's stored (wins, losses) record works out to under flat ELO points.
+
+    A consistency check of the Player Leaderboard, not a replay of results.
+    """
+    np = _numpy()
+    if np is not None and records:
+        record = np.asarray(records, dtype=np.int64).reshape(-1, 2)
+        return [int(value) for value in default_rating + record[:, 0] * elo_win + record[:, 1] * elo_loss]
+    return [default_rating + wins * elo_win + losses * elo_loss for wins, losses in records]
+
+
+class Recompute:
+    """Replayed leaderboards next to what the tabs hold now."""
+
+    PLAYER_NOTE = "\n⚠️ Player W/L isn't replayed (Scoring has no rosters); only each player's rating is checked against their stored W/L."
+
+    def __init__(self):
+        self.team_header = standings.HEADERS
+        self.team_rows = []          # full Leaderboard rows, rating order
+        self.team_changes = []       # (team, stored row, replayed row)
+        self.player_rows = {}        # row number -> replayed A–F row
+        self.player_changes = []     # (username, stored rating, replayed rating)
+        self.results = 0
+        self.rating_state = None     # (engine, period, start, games) for Elo/Glicko-2
+        self.team_stored = {}        # team -> (rating, wins, losses, matches) the replay was compared with
+        self.result_rows = {}        # "Scoring" / "Match History" -> rows the replay read
+
+    @property
+    def clean(self):
+        return not self.team_changes and not self.player_changes
+
+    def summary(self, limit=10):
+        lines = [f"🧮 Replayed {self.results} decided results."]
+        if self.clean:
+            lines.append("✅ Team ratings match the replay and player ratings match their W/L.")
+            lines.append(self.PLAYER_NOTE)
+            return "\n".join(lines)
+        if self.team_changes:
+            lines.append(f"\n__**Teams that differ ({len(self.team_changes)}):**__")
+            for team, stored, replayed in self.team_changes[:limit]:
+                lines.append(f"- `{team}`: {stored[0]} ({stored[1]}-{stored[2]}) → {replayed[0]} ({replayed[1]}-{replayed[2]})")
+        if self.player_changes:
+            lines.append(f"\n__**Players whose rating doesn't match their W/L ({len(self.player_changes)}):**__")
+            for name, stored, replayed in self.player_changes[:limit]:
+                lines.append(f"- `{name}`: {stored} → {replayed}")
+        lines.append(self.PLAYER_NOTE)
+        return "\n".join(lines)
+
+
+async def recompute(spreadsheet):
+    """Replay the season from one snapshot of Scoring, Match History and both leaderboards; no writes."""
+    with open("config.json") as f:
+        config = json.load(f)
+    elo_win = config.get("elo_win_points", 25)
+    elo_loss = config.get("elo_loss_points", -25)
+    starting_elo = config.get("default_team_rating", 800)
+    rater = ratings.from_config(config)
+
+    tabs = {}
+    for title in ("Scoring", "Match History", "Leaderboard", "Player Leaderboard"):
+        try:
+            tabs[title] = await sheets.call(spreadsheet.worksheet, title)
+        except Exception:
+            pass
+    await standings.flush(tabs.get("Leaderboard"))
+    snapshot = await sheets.load_snapshot(spreadsheet, list(tabs.values()))
+
+    def rows_of(title):
+        return snapshot[title].rows if title in snapshot else []
+
+    result = Recompute()
+    result.result_rows = {title: _count_rows(rows_of(title)) for title in RESULT_TABS}
+    results = season_results(rows_of("Scoring"), rows_of("Match History"), config.get("forfeit_affects_elo", True))
+    result.results = len(results)
+
+    # Teams: everyone currently on the Leaderboard
+    board = [list(row) + [""] * (5 - len(row)) for row in rows_of("Leaderboard") if row and row[0]]
+    teams = [row[0] for row in board]
+    adjusted = standings.adjustments()
+    replayed = replay_teams(teams, results, elo_win, elo_loss, starting_elo)
+    replayed = {team: (record[0] + adjusted.get(team, 0),) + record[1:] for team, record in replayed.items()}
+    if rater.periodic:
+        # Weeks before the open rating period are closed; the open one keeps its games
+        if not ratings.periods.loaded:
+            ratings.periods.load()
+        period = ratings.periods.period
+        engine_ratings, start, games = replay_engine(rater, teams, results, starting_elo, period, adjusted)
+        replayed = {team: (engine_ratings[team],) + record[1:] for team, record in replayed.items()}
+        result.rating_state = (rater, period, start, games)
+    for row in board:
+        stored = (to_int(row[1]), to_int(row[2]), to_int(row[3]), to_int(row[4]))
+        fresh = replayed[row[0]]
+        result.team_stored[row[0]] = stored
+        if stored != fresh:
+            result.team_changes.append((row[0], stored, fresh))
+        result.team_rows.append([row[0], *fresh] + row[5:])
+    result.team_rows.sort(key=lambda row: row[1], reverse=True)
+    if "Leaderboard" in snapshot and snapshot["Leaderboard"].header:
+        result.team_header = snapshot["Leaderboard"].header
+
+    # Players: rating from their own win/loss record
+    players = [(number, list(row) + [""] * (6 - len(row))) for number, row in enumerate(rows_of("Player Leaderboard"), start=2) if len(row) > 1 and row[1].strip()]
+    player_ratings = replay_players([(to_int(row[3]), to_int(row[4])) for _, row in players], elo_win, elo_loss, config.get("default_player_rating", 800))
+    for (number, row), rating in zip(players, player_ratings):
+        if to_int(row[2], None) != rating or to_int(row[5]) != to_int(row[3]) + to_int(row[4]):
+            result.player_changes.append((row[0], row[2], rating))
+            result.player_rows[number] = [row[0], row[1], str(rating), str(to_int(row[3])), str(to_int(row[4])), str(to_int(row[3]) + to_int(row[4]))]
+    return result
+
+
+def _count_rows(rows):
+    return sum(1 for row in rows if row and row[0].strip())
+
+
+async def write(spreadsheet, result):
+    """Write a Recompute back: one update for the Leaderboard, one batch_update for changed player rows.
+
+    Returns False and writes nothing if a result or a Leaderboard change came in
+    since the replay; run it again.
+    """
+    targets = []
+    for title in RESULT_TABS:
+        try:
+            targets.append(await sheets.call(spreadsheet.worksheet, title))
+        except Exception:
+            pass
+    columns = await sheets.live_columns(spreadsheet, [(ws, 1) for ws in targets])
+    now = {ws.title: _count_rows([[cell] for cell in column[1:]]) for ws, column in zip(targets, columns)}
+    if any(now.get(title, 0) != count for title, count in result.result_rows.items()):
+        print("⚠️ Not writing the season replay: results came in since it was made")
+        return False
+
+    if result.team_changes or result.rating_state:
+        leaderboard_sheet = await sheets.call(spreadsheet.worksheet, "Leaderboard")
+        # Installed as the board standings owns, so nothing pending can publish over it
+        installed = await standings.replace(leaderboard_sheet, result.team_header, result.team_rows, result.team_stored, result.rating_state)
+        if not installed:
+            print("⚠️ Not writing the season replay: the Leaderboard changed since it was made")
+            return False
+    if result.player_rows:
+        player_sheet = await sheets.call(spreadsheet.worksheet, "Player Leaderboard")
+        async with sheets.batch(player_sheet) as writes:
+            for number, row in result.player_rows.items():
+                writes.update(f"A{number}:F{number}", [row])
+    return True
@@ -0,0 +1,244 @@
+# -------------------- Row Models --------------------
+#
+# Typed views of the league tabs. A tab is parsed once per snapshot (see
+# sheets.models / Table.models): member cells like "Name (1234)" are split into
+# name and ID up front and numeric columns are converted, so loops over teams
+# or leaderboards read attributes instead of re-parsing strings every pass.
+# Models are shared by everyone reading the same snapshot, treat them as
+# read-only and write through the worksheet as before.
+
+
+def member_id(cell):
+    """Discord ID from "Name (ID)", "Name#1234 | ID" or a bare ID; "" if there isn't one."""
+    cell = str(cell).strip()
+    if "|" in cell:
+        candidate = cell.rsplit("|", 1)[1].strip()
+    elif "(" in cell and ")" in cell:
+        candidate = cell.split("(")[-1].split(")")[0].strip()
+    else:
+        candidate = cell
+    return candidate if candidate.isdigit() else ""
+
+
+def member_name(cell):
+    cell = str(cell).strip()
+    if "|" in cell:
+        return cell.split("|")[0].strip()
+    return cell.split("(")[0].strip()
+
+
+def to_int(value, default=0):
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return default
+
+
+def _cell(cells, col):
+    # 1-based, "" past the end of a trimmed row
+    return cells[col - 1] if len(cells) >= col else ""
+
+
+class Row:
+    __slots__ = ("row",)
+
+    @classmethod
+    def parse(cls, values):
+        """Models for every non-blank data row of a tab (values include the header)."""
+        return [cls(row_number, cells) for row_number, cells in enumerate(values[1:], start=2) if any(cells)]
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[:3])
+        return f"<{type(self).__name__} row={self.row} {fields}>"
+
+
+class TeamRow(Row):
+    # Teams: Team Name | Player 1 (captain) ... Player 6 | Status | Co-Captain
+    __slots__ = ("name", "players", "slot_ids", "captain_id", "status", "cocaptain_id")
+
+    def __init__(self, row, cells):
+        self.row = row
+        self.name = _cell(cells, 1).strip()
+        # ID in each roster slot 1–6 (columns B–G), "" where empty or not a member cell
+        self.slot_ids = [member_id(_cell(cells, col)) for col in range(2, 8)]
+        # (name, id) for each filled slot B–G, in slot order; id is "" for plain-text entries
+        self.players = [(member_name(cell), member_id(cell)) for cell in cells[1:7] if str(cell).strip()]
+        self.captain_id = member_id(_cell(cells, 2))
+        self.status = _cell(cells, 8).strip()
+        self.cocaptain_id = member_id(_cell(cells, 9))
+
+    @property
+    def player_ids(self):
+        return [user_id for _, user_id in self.players if user_id]
+
+    def has_member(self, user_id):
+        return str(user_id) in self.player_ids
+
+
+class Membership:
+    __slots__ = ("team", "slot", "is_captain", "is_cocaptain")
+
+    def __init__(self, team, slot, is_captain, is_cocaptain):
+        self.team = team                  # TeamRow
+        self.slot = slot                  # 1–6, None if only listed as co-captain
+        self.is_captain = is_captain
+        self.is_cocaptain = is_cocaptain
+
+    def __repr__(self):
+        return f"<Membership {self.team.name!r} slot={self.slot} captain={self.is_captain} cocaptain={self.is_cocaptain}>"
+
+
+class RosterIndex:
+    """user_id -> Membership over the whole Teams tab, exact ID matches only.
+
+    Built from a Teams snapshot through sheets.models(teams_sheet, RosterIndex),
+    so every roster write (which replaces the snapshot) rebuilds it once.
+    """
+    __slots__ = ("teams", "_members")
+
+    @classmethod
+    def parse(cls, values):
+        return cls(TeamRow.parse(values))
+
+    def __init__(self, teams):
+        self.teams = {}
+        self._members = {}
+        for team in teams:
+            self.teams.setdefault(team.name, team)
+            for slot, user_id in enumerate(team.slot_ids, start=1):
+                if user_id and user_id not in self._members:
+                    self._members[user_id] = Membership(team, slot, slot == 1, user_id == team.cocaptain_id)
+            if team.cocaptain_id and team.cocaptain_id not in self._members:
+                self._members[team.cocaptain_id] = Membership(team, None, False, True)
+
+    def team_of(self, user_id):
+        return self._members.get(str(user_id))
+
+    def team_name(self, user_id):
+        membership = self._members.get(str(user_id))
+        return membership.team.name if membership else None
+
+    def get(self, team_name):
+        return self.teams.get(str(team_name).strip())
+
+    def __contains__(self, user_id):
+        return str(user_id) in self._members
+
+    def __len__(self):
+        return len(self._members)
+
+
+class PlayerIndex:
+    """user_id -> PlayerRow for the Players tab (first row wins, like the old scans)."""
+    __slots__ = ("players",)
+
+    @classmethod
+    def parse(cls, values):
+        return cls(PlayerRow.parse(values))
+
+    def __init__(self, players):
+        self.players = {}
+        for player in players:
+            self.players.setdefault(player.user_id, player)
+
+    def get(self, user_id):
+        return self.players.get(str(user_id).strip())
+
+    def __contains__(self, user_id):
+        return str(user_id).strip() in self.players
+
+    def __len__(self):
+        return len(self.players)
+
+
+class BanList:
+    """User IDs in column A of the Banned tab."""
+    __slots__ = ("user_ids",)
+
+    @classmethod
+    def parse(cls, values):
+        return cls({_cell(cells, 1).strip() for cells in values[1:]} - {""})
+
+    def __init__(self, user_ids):
+        self.user_ids = user_ids
+
+    def __contains__(self, user_id):
+        return str(user_id).strip() in self.user_ids
+
+
+class PlayerRow(Row):
+    # Players: User ID | Username | Role | Timezone
+    __slots__ = ("user_id", "username", "role", "timezone")
+
+    def __init__(self, row, cells):
+        self.row = row
+        self.user_id = _cell(cells, 1).strip()
+        self.username = _cell(cells, 2)
+        self.role = _cell(cells, 3)
+        self.timezone = _cell(cells, 4)
+
+
+class MatchRow(Row):
+    # Matches: match_id | Team A | Team B | Proposed Date | Scheduled Date | Status | Winner | Loser | Proposed By
+    __slots__ = ("match_id", "team_a", "team_b", "proposed_date", "scheduled_date", "status", "winner", "loser", "proposed_by")
+
+    def __init__(self, row, cells):
+        self.row = row
+        self.match_id = _cell(cells, 1).strip()
+        self.team_a = _cell(cells, 2)
+        self.team_b = _cell(cells, 3)
+        self.proposed_date = _cell(cells, 4)
+        self.scheduled_date = _cell(cells, 5)
+        self.status = _cell(cells, 6)
+        self.winner = _cell(cells, 7)
+        self.loser = _cell(cells, 8)
+        self.proposed_by = _cell(cells, 9)
+
+    def involves(self, team_name):
+        return team_name in (self.team_a, self.team_b)
+
+
+class LeaderboardRow(Row):
+    # Leaderboard: Team Name | Rating | Wins | Losses | Matches Played
+    __slots__ = ("name", "rating", "wins", "losses", "matches")
+
+    def __init__(self, row, cells):
+        self.row = row
+        self.name = _cell(cells, 1).strip()
+        self.rating = to_int(_cell(cells, 2))
+        self.wins = to_int(_cell(cells, 3))
+        self.losses = to_int(_cell(cells, 4))
+        self.matches = to_int(_cell(cells, 5))
+
+
+class PlayerLeaderboardRow(Row):
+    # Player Leaderboard: Username | User ID | Rating | Wins | Losses | Matches Played
+    __slots__ = ("name", "user_id", "rating", "wins", "losses", "matches")
+
+    def __init__(self, row, cells):
+        self.row = row
+        self.name = _cell(cells, 1)
+        self.user_id = _cell(cells, 2).strip()
+        self.rating = to_int(_cell(cells, 3))
+        self.wins = to_int(_cell(cells, 4))
+        self.losses = to_int(_cell(cells, 5))
+        self.matches = to_int(_cell(cells, 6))
+
+
+class ProposalRow(Row):
+    # Match Proposed / Proposed Scores: Match ID | Team A | Team B | Proposer ID | Proposed Date | Channel ID | Message ID [| Map Scores]
+    __slots__ = ("match_id", "team_a", "team_b", "proposer_id", "proposed_date", "channel_id", "message_id", "map_scores")
+
+    def __init__(self, row, cells):
+        self.row = row
+        self.match_id = _cell(cells, 1).strip()
+        self.team_a = _cell(cells, 2)
+        self.team_b = _cell(cells, 3)
+        self.proposer_id = _cell(cells, 4).strip()
+        self.proposed_date = _cell(cells, 5)
+        self.channel_id = to_int(_cell(cells, 6), None)
+        self.message_id = to_int(_cell(cells, 7), None)
+        self.map_scores = _cell(cells, 8)
@@ -0,0 +1,1433 @@
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import datetime
+import functools
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# -------------------- Worksheet Snapshot Cache --------------------
+#
+# Every worksheet handle the bot hands out is wrapped in a CachedWorksheet.
+# Reads are served from one shared SheetCache (TTL based) and any write that
+# goes through a handle drops that tab's snapshot, so the next read refetches.
+
+
+class SheetCache:
+    def __init__(self, ttl=30, index_ttl=300):
+        self.ttl = ttl
+        self.index_ttl = index_ttl
+        self._lock = threading.RLock()
+        self._snapshots = {}     # title -> (fetched_at, rows)
+        self._generation = {}    # title -> bumped on every invalidation
+        self._projections = {}   # title -> {("col", n) | ("range", a1): (fetched_at, values)}
+        self._indexes = {}       # title -> {(key_col, fold): KeyIndex}
+        self._index_generation = {}  # title -> bumped on every index patch/drop
+        self._models = {}        # title -> (snapshot rows, {model class: parsed rows})
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, title, fetch):
+        with self._lock:
+            entry = self._snapshots.get(title)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            generation = self._generation.get(title, 0)
+
+        rows = fetch()
+
+        with self._lock:
+            self.misses += 1
+        self.store(title, rows, generation)
+        return rows
+
+    def generation(self, title):
+        with self._lock:
+            return self._generation.get(title, 0)
+
+    def store(self, title, rows, generation):
+        with self._lock:
+            # 🛑 Don't store a snapshot that a write made stale while we were fetching
+            if self._generation.get(title, 0) == generation:
+                self._snapshots[title] = (time.monotonic(), rows)
+                # A fresh read also picks up edits made by hand, so indexes rebuild from it
+                self._indexes.pop(title, None)
+
+    def refresh(self, title, rows, generation):
+        """Swap in rows read outside the normal path (e.g. after a hand edit) and rebuild the tab's indexes from them."""
+        with self._lock:
+            if self._generation.get(title, 0) != generation:
+                return False
+            self._snapshots[title] = (time.monotonic(), rows)
+            self._projections.pop(title, None)
+            held = list(self._indexes.get(title, {}))
+            self.patch_indexes(title, None)
+            for key_col, fold in held:
+                column = [row[key_col - 1] if len(row) >= key_col else "" for row in rows]
+                self._indexes.setdefault(title, {})[(key_col, fold)] = KeyIndex.build(key_col, column, fold)
+            return True
+
+    def models(self, title, rows, model):
+        # Parsed once per snapshot: a new snapshot is a new list, so identity decides
+        with self._lock:
+            entry = self._models.get(title)
+            if entry is None or entry[0] is not rows:
+                entry = (rows, {})
+                self._models[title] = entry
+            parsed = entry[1].get(model)
+        if parsed is None:
+            parsed = model.parse(rows)
+            with self._lock:
+                entry[1][model] = parsed
+        return parsed
+
+    def held_titles(self):
+        with self._lock:
+            return set(self._snapshots) | set(self._projections) | {t for t, held in self._indexes.items() if held}
+
+    def is_fresh(self, title):
+        with self._lock:
+            entry = self._snapshots.get(title)
+            return bool(entry) and time.monotonic() - entry[0] < self.ttl
+
+    # ---------- Projections (single columns / A1 ranges, dropped with the tab) ----------
+
+    def projection(self, title, key):
+        with self._lock:
+            entry = self._projections.get(title, {}).get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            return None
+
+    def store_projection(self, title, key, values, generation):
+        with self._lock:
+            self.misses += 1
+            if self._generation.get(title, 0) == generation:
+                self._projections.setdefault(title, {})[key] = (time.monotonic(), values)
+                if key[0] == "col":
+                    for index_key in [k for k in self._indexes.get(title, {}) if k[0] == key[1]]:
+                        del self._indexes[title][index_key]
+
+    def invalidate(self, title=None):
+        with self._lock:
+            titles = [title] if title else list(set(self._snapshots) | set(self._generation) | set(self._projections))
+            for t in titles:
+                self._snapshots.pop(t, None)
+                self._projections.pop(t, None)
+                self._models.pop(t, None)
+                self._generation[t] = self._generation.get(t, 0) + 1
+            if title is None:
+                # Spreadsheet-wide writes can move rows anywhere
+                self.drop_indexes()
+
+    # ---------- Key indexes (survive value writes, patched on appends/deletes) ----------
+
+    def cached_index(self, title, key_col, fold=False):
+        with self._lock:
+            index = self._indexes.get(title, {}).get((key_col, fold))
+            if index and time.monotonic() - index.built_at < self.index_ttl:
+                return index
+            return None
+
+    def index(self, title, key_col, fold, load_column):
+        index = self.cached_index(title, key_col, fold)
+        if index:
+            return index
+        with self._lock:
+            generation = self._index_generation.get(title, 0)
+
+        index = KeyIndex.build(key_col, load_column(), fold)
+
+        with self._lock:
+            if self._index_generation.get(title, 0) == generation:
+                self._indexes.setdefault(title, {})[(key_col, fold)] = index
+        return index
+
+    def put_index(self, title, index):
+        with self._lock:
+            self._indexes.setdefault(title, {})[(index.key_col, index.fold)] = index
+
+    def patch_indexes(self, title, patch):
+        # patch=None means the write couldn't be replayed on the index, so drop it
+        with self._lock:
+            self._index_generation[title] = self._index_generation.get(title, 0) + 1
+            if patch is None:
+                self._indexes.pop(title, None)
+                return
+            for index in self._indexes.get(title, {}).values():
+                patch(index)
+
+    def drop_indexes(self, title=None):
+        with self._lock:
+            for t in [title] if title else list(self._indexes):
+                self.patch_indexes(t, None)
+
+
+# -------------------- Key Index --------------------
+#
+# Maps a tab's key column (Match ID, team name, user ID...) to row numbers so
+# point lookups and updates don't scan or even read the sheet. Writes made
+# through a CachedWorksheet are replayed on the index: value writes to the key
+# column re-key their rows, appends add rows at the position Google reports and
+# row deletes shift everything below them up.
+
+
+def a1_to_rowcol(label):
+    found = re.match(r"^\$?([A-Za-z]+)\$?(\d+)$", label)
+    if not found:
+        return None
+    col = 0
+    for ch in found.group(1).upper():
+        col = col * 26 + ord(ch) - 64
+    return int(found.group(2)), col
+
+
+def _range_start(range_name):
+    # "'Tab'!B5:E5" / "B5" -> (5, 2); whole-column ranges like "A:D" give None
+    if "!" in range_name:
+        range_name = range_name.rsplit("!", 1)[1]
+    return a1_to_rowcol(range_name.split(":")[0])
+
+
+class KeyIndex:
+    def __init__(self, key_col, fold=False):
+        self.key_col = key_col
+        self.fold = fold
+        self.built_at = time.monotonic()
+        self._rows = {}   # key -> sorted row numbers
+        self._keys = {}   # row number -> key
+
+    @classmethod
+    def build(cls, key_col, column, fold=False):
+        # column is the key column top to bottom, header included
+        index = cls(key_col, fold)
+        for row_number, key in enumerate(column[1:], start=2):
+            index._add(row_number, key)
+        return index
+
+    def normalize(self, key):
+        key = str(key).strip()
+        return key.casefold() if self.fold else key
+
+    def _add(self, row_number, key):
+        key = self.normalize(key)
+        if not key or row_number < 2:
+            return
+        self._keys[row_number] = key
+        bisect.insort(self._rows.setdefault(key, []), row_number)
+
+    def _remove(self, row_number):
+        key = self._keys.pop(row_number, None)
+        if key is None:
+            return
+        rows = self._rows[key]
+        rows.remove(row_number)
+        if not rows:
+            del self._rows[key]
+
+    def find(self, key):
+        rows = self._rows.get(self.normalize(key))
+        return rows[0] if rows else None
+
+    def find_all(self, key):
+        return list(self._rows.get(self.normalize(key), []))
+
+    def __contains__(self, key):
+        return self.normalize(key) in self._rows
+
+    def matches(self, column):
+        """True if the index still describes this key column (header included)."""
+        live = {}
+        for row_number, key in enumerate(column[1:], start=2):
+            key = self.normalize(key)
+            if key:
+                live[row_number] = key
+        return live == self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    # ---------- Incremental maintenance ----------
+
+    def set(self, row_number, key):
+        self._remove(row_number)
+        self._add(row_number, key)
+
+    def written(self, start_row, start_col, values):
+        offset = self.key_col - start_col
+        if offset < 0:
+            return
+        for i, row in enumerate(values):
+            if offset < len(row):
+                self.set(start_row + i, row[offset])
+
+    def deleted(self, start, end):
+        count = end - start + 1
+        keys = self._keys
+        self._keys, self._rows = {}, {}
+        for row_number, key in sorted(keys.items()):
+            if start <= row_number <= end:
+                continue
+            if row_number > end:
+                row_number -= count
+            self._keys[row_number] = key
+            self._rows.setdefault(key, []).append(row_number)
+
+
+def _written_blocks(name, args, kwargs, result):
+    # -> [(start_row, start_col, 2D values)] for a value write, None if it can't be replayed
+    if name == "update_cell":
+        row, col, value = args[:3]
+        return [(row, col, [[value]])]
+
+    if name == "update_cells":
+        cells = args[0] if args else kwargs.get("cell_list", [])
+        return [(cell.row, cell.col, [[cell.value]]) for cell in cells]
+
+    if name == "update":
+        # gspread 5 is update(range, values), gspread 6 update(values, range)
+        range_name, values = kwargs.get("range_name"), kwargs.get("values")
+        for arg in args:
+            if isinstance(arg, str) and range_name is None:
+                range_name = arg
+            elif isinstance(arg, list) and values is None:
+                values = arg
+        start = _range_start(range_name or "A1")
+        if not start or not values or not isinstance(values[0], list):
+            return None
+        return [(start[0], start[1], values)]
+
+    if name == "batch_update":
+        blocks = []
+        for entry in (args[0] if args else kwargs.get("data", [])):
+            start = _range_start(entry["range"])
+            if not start:
+                return None
+            blocks.append((start[0], start[1], entry["values"]))
+        return blocks
+
+    if name in ("append_row", "append_rows"):
+        values = args[0] if args else kwargs.get("values")
+        if name == "append_row":
+            values = [values]
+        updated = (result or {}).get("updates", {}).get("updatedRange", "") if isinstance(result, dict) else ""
+        start = _range_start(updated) if updated else None
+        if not start or not values:
+            return None
+        return [(start[0], start[1], values)]
+
+    return None
+
+
+def index_patch(name, args, kwargs, result):
+    if name in ("delete_rows", "delete_row"):
+        start = args[0] if args else kwargs.get("start_index", kwargs.get("index"))
+        end = (args[1] if len(args) > 1 else kwargs.get("end_index")) or start
+        return lambda index: index.deleted(start, end)
+
+    blocks = _written_blocks(name, args, kwargs, result)
+    if blocks is None:
+        return None
+
+    def patch(index):
+        for start_row, start_col, values in blocks:
+            index.written(start_row, start_col, values)
+    return patch
+
+
+class CachedWorksheet:
+    # gspread Worksheet methods that change cell data
+    WRITE_METHODS = {
+        "update", "update_cell", "update_cells", "update_acell", "batch_update",
+        "append_row", "append_rows", "insert_row", "insert_rows",
+        "delete_rows", "delete_row", "clear", "batch_clear", "resize",
+    }
+
+    def __init__(self, worksheet, cache):
+        self._ws = worksheet
+        self._cache = cache
+
+    @property
+    def title(self):
+        return self._ws.title
+
+    @property
+    def worksheet(self):
+        return self._ws
+
+    def is_cached(self):
+        return self._cache.is_fresh(self._ws.title)
+
+    def _snapshot(self):
+        return self._cache.get(self._ws.title, self._ws.get_all_values)
+
+    def invalidate(self):
+        self._cache.invalidate(self._ws.title)
+
+    def index(self, key_col=1, fold=False):
+        return self._cache.index(self._ws.title, key_col, fold, lambda: self.column(key_col))
+
+    def has_index(self, key_col=1, fold=False):
+        return self._cache.cached_index(self._ws.title, key_col, fold) is not None
+
+    def find_row(self, key, key_col=1, fold=False):
+        return self.index(key_col, fold).find(key)
+
+    def live_index(self, key_col=1, fold=False):
+        """The key index, checked against the key column read straight from the sheet."""
+        return self.adopt_column(key_col, self._ws.col_values(key_col), fold)
+
+    def adopt_column(self, key_col, column, fold=False):
+        # A held index that disagrees with the live column means rows were edited or
+        # sorted by hand: the tab's snapshot and indexes are dropped and rebuilt from it
+        held = self._cache.cached_index(self._ws.title, key_col, fold)
+        if held is not None and held.matches(column):
+            return held
+        if held is not None:
+            print(f"[🔄] {self._ws.title!r} moved since its key index was built, rebuilt it from the sheet")
+            self.invalidate()
+            self._cache.drop_indexes(self._ws.title)
+        index = KeyIndex.build(key_col, column, fold)
+        self._cache.put_index(self._ws.title, index)
+        return index
+
+    def find_rows(self, key, key_col=1, fold=False):
+        return self.index(key_col, fold).find_all(key)
+
+    def rows_deleted(self, ranges):
+        # ranges must be bottom-up so each shift leaves the next range's rows alone
+        def patch(index):
+            for start, end in ranges:
+                index.deleted(start, end)
+        self._cache.patch_indexes(self._ws.title, patch)
+        self.invalidate()
+
+    # ---------- Reads (served from the snapshot) ----------
+
+    def get_all_values(self):
+        # Callers pad and edit rows in place, so never hand out the cached lists
+        return [list(row) for row in self._snapshot()]
+
+    def row_values(self, row):
+        if not self.is_cached():
+            # One row is cheaper to fetch than the whole tab (trailing blanks are trimmed)
+            return self._ws.row_values(row)
+        rows = self._snapshot()
+        return list(rows[row - 1]) if 0 < row <= len(rows) else []
+
+    def col_values(self, col):
+        return self.column(col)
+
+    def models(self, model):
+        """The snapshot parsed into row models (see rows.py), shared until the tab changes."""
+        return self._cache.models(self._ws.title, self._snapshot(), model)
+
+    # ---------- Projections (only the columns/ranges asked for) ----------
+
+    def _column_number(self, col, header=None):
+        if isinstance(col, int):
+            return col
+        header = header if header is not None else self.header()
+        if col not in header:
+            raise KeyError(f"{self._ws.title!r} has no column {col!r}")
+        return header.index(col) + 1
+
+    def _cached_columns(self, cols):
+        # {col: values} without touching the network, or None
+        if self.is_cached():
+            rows = self._snapshot()
+            header = rows[0] if rows else []
+            result = {}
+            for col in cols:
+                n = self._column_number(col, header)
+                values = [row[n - 1] if len(row) >= n else "" for row in rows]
+                while values and values[-1] == "":
+                    values.pop()
+                result[col] = values
+            return result
+
+        header = None
+        if any(not isinstance(col, int) for col in cols):
+            header = self._cache.projection(self._ws.title, ("range", "1:1"))
+            if header is None:
+                return None
+            header = header[0] if header else []
+        result = {}
+        for col in cols:
+            values = self._cache.projection(self._ws.title, ("col", self._column_number(col, header)))
+            if values is None:
+                return None
+            result[col] = list(values)
+        return result
+
+    def has_columns(self, *cols):
+        try:
+            return self._cached_columns(cols) is not None
+        except KeyError:
+            return False
+
+    def header(self):
+        if self.is_cached():
+            rows = self._snapshot()
+            return list(rows[0]) if rows else []
+        values = self.get_range("1:1")
+        return list(values[0]) if values else []
+
+    def get_range(self, range_name):
+        key = ("range", range_name)
+        values = self._cache.projection(self._ws.title, key)
+        if values is None:
+            generation = self._cache.generation(self._ws.title)
+            values = [list(row) for row in self._ws.get(range_name)]
+            self._cache.store_projection(self._ws.title, key, values, generation)
+        return [list(row) for row in values]
+
+    def columns(self, *cols):
+        """{col: values top to bottom (header included)} for just these columns (numbers or header names)."""
+        cached = self._cached_columns(cols)
+        if cached is not None:
+            return cached
+
+        numbers = {col: self._column_number(col) for col in cols}
+        found = {}
+        for n in set(numbers.values()):
+            values = self._cache.projection(self._ws.title, ("col", n))
+            if values is not None:
+                found[n] = values
+
+        missing = sorted(set(numbers.values()) - set(found))
+        if missing:
+            # ✅ One request for all missing columns, each stored as its own vector
+            generation = self._cache.generation(self._ws.title)
+            ranges = [f"{column_letter(n)}:{column_letter(n)}" for n in missing]
+            result = self._ws.batch_get(ranges, major_dimension="COLUMNS")
+            for n, value_range in zip(missing, result):
+                found[n] = list(value_range[0]) if value_range else []
+                self._cache.store_projection(self._ws.title, ("col", n), found[n], generation)
+
+        return {col: list(found[n]) for col, n in numbers.items()}
+
+    def column(self, col):
+        return self.columns(col)[col]
+
+    def cell(self, row, col):
+        from gspread.cell import Cell
+
+        values = self.row_values(row)
+        return Cell(row, col, values[col - 1] if len(values) >= col else "")
+
+    # ---------- Writes (pass through, then drop the snapshot) ----------
+
+    def __getattr__(self, name):
+        attr = getattr(self._ws, name)
+        if name not in self.WRITE_METHODS or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def write(*args, **kwargs):
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                self._cache.patch_indexes(self._ws.title, None)
+                raise
+            finally:
+                self.invalidate()
+            self._cache.patch_indexes(self._ws.title, index_patch(name, args, kwargs, result))
+            return result
+
+        return write
+
+    def __repr__(self):
+        return f"<CachedWorksheet {self._ws.title!r}>"
+
+
+class CachedSpreadsheet:
+    # Spreadsheet-level calls that can touch any tab
+    WRITE_METHODS = {"values_update", "values_append", "values_clear", "values_batch_update", "batch_update"}
+
+    def __init__(self, spreadsheet, cache):
+        self._spreadsheet = spreadsheet
+        self.cache = cache
+        self._handles = {}
+        self._lock = threading.Lock()
+
+    @property
+    def spreadsheet(self):
+        return self._spreadsheet
+
+    def _wrap(self, worksheet):
+        with self._lock:
+            handle = self._handles.get(worksheet.title)
+            if handle is None or handle.worksheet.id != worksheet.id:
+                handle = CachedWorksheet(worksheet, self.cache)
+                self._handles[worksheet.title] = handle
+            return handle
+
+    def worksheet(self, title):
+        # ✅ Reuse handles so get_or_create_sheet() stops refetching tab metadata
+        with self._lock:
+            handle = self._handles.get(title)
+        if handle is not None:
+            return handle
+        return self._wrap(self._spreadsheet.worksheet(title))
+
+    def add_worksheet(self, *args, **kwargs):
+        worksheet = self._spreadsheet.add_worksheet(*args, **kwargs)
+        self.cache.invalidate(worksheet.title)
+        return self._wrap(worksheet)
+
+    def del_worksheet(self, worksheet):
+        raw = worksheet.worksheet if isinstance(worksheet, CachedWorksheet) else worksheet
+        with self._lock:
+            self._handles.pop(raw.title, None)
+        self.cache.invalidate(raw.title)
+        self.cache.drop_indexes(raw.title)
+        return self._spreadsheet.del_worksheet(raw)
+
+    def worksheets(self, *args, **kwargs):
+        return [self._wrap(ws) for ws in self._spreadsheet.worksheets(*args, **kwargs)]
+
+    def __getattr__(self, name):
+        attr = getattr(self._spreadsheet, name)
+        if name not in self.WRITE_METHODS or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def write(*args, **kwargs):
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                self.cache.invalidate()
+
+        return write
+
+    def __repr__(self):
+        return f"<CachedSpreadsheet {self._spreadsheet.title!r}>"
+
+
+# -------------------- Shared Client --------------------
+#
+# One authorized gspread client per process. Its HTTP session keeps
+# connections to Google alive between calls, a daemon thread refreshes the
+# access token a few minutes before it expires, and every opened spreadsheet
+# is memoized (wrapped in the shared cache) so nothing re-authorizes or
+# re-opens per command.
+
+SCOPES = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+
+
+class ClientProvider:
+    def __init__(self, keyfile="credentials.json", scopes=SCOPES, cache_ttl=30, index_ttl=300, pool_size=10, refresh_margin=300):
+        self.keyfile = keyfile
+        self.scopes = scopes
+        self.cache = SheetCache(ttl=cache_ttl, index_ttl=index_ttl)
+        self.pool_size = pool_size
+        self.refresh_margin = refresh_margin
+        self._client = None
+        self._spreadsheets = {}
+        self._lock = threading.RLock()
+        self._refresher = None
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                import gspread
+                from oauth2client.service_account import ServiceAccountCredentials
+
+                creds = ServiceAccountCredentials.from_json_keyfile_name(self.keyfile, self.scopes)
+                self._client = gspread.authorize(creds)
+                self._tune_session()
+                self._start_refresher()
+            return self._client
+
+    def _http(self):
+        # gspread 6 keeps auth/session on client.http_client, gspread 5 on the client itself
+        return getattr(self._client, "http_client", self._client)
+
+    def _tune_session(self):
+        session = getattr(self._http(), "session", None)
+        if session is None:
+            return
+        from requests.adapters import HTTPAdapter
+
+        # ✅ Enough pooled keep-alive connections for every gateway worker
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=max(10, self.pool_size)))
+
+    def refresh_if_needed(self):
+        creds = getattr(self._http(), "auth", None)
+        if creds is None or not hasattr(creds, "refresh"):
+            return False
+        expiry = getattr(creds, "expiry", None)
+        margin = datetime.timedelta(seconds=self.refresh_margin)
+        if expiry is not None and expiry - datetime.datetime.utcnow() > margin:
+            return False
+        from google.auth.transport.requests import Request
+
+        creds.refresh(Request())
+        return True
+
+    def _start_refresher(self):
+        def run():
+            while True:
+                time.sleep(60)
+                try:
+                    if self.refresh_if_needed():
+                        print("[🔑] Refreshed Google access token.")
+                except Exception as e:
+                    print(f"[⚠️] Token refresh failed (will retry): {e}")
+
+        self._refresher = threading.Thread(target=run, name="sheets-token", daemon=True)
+        self._refresher.start()
+
+    def open(self, name, create=False):
+        with self._lock:
+            spreadsheet = self._spreadsheets.get(name)
+            if spreadsheet is not None:
+                return spreadsheet
+
+            import gspread
+
+            client = self.client()
+            try:
+                raw = client.open(name)
+            except gspread.SpreadsheetNotFound:
+                if not create:
+                    raise
+                raw = client.create(name)
+            spreadsheet = CachedSpreadsheet(raw, self.cache)
+            self._spreadsheets[name] = spreadsheet
+            return spreadsheet
+
+
+_provider = None
+
+
+def setup_client(keyfile="credentials.json", cache_ttl=30, index_ttl=300, pool_size=10):
+    global _provider
+    _provider = ClientProvider(keyfile=keyfile, cache_ttl=cache_ttl, index_ttl=index_ttl, pool_size=pool_size)
+    return _provider
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = ClientProvider()
+    return _provider
+
+
+def open_spreadsheet(name, create=False):
+    """Process-wide CachedSpreadsheet for name, authorizing and opening it only once."""
+    return get_provider().open(name, create=create)
+
+
+def register_spreadsheet(name, spreadsheet):
+    """Make open_spreadsheet(name) hand out spreadsheet (e.g. a local_store wrapper) from now on."""
+    provider = get_provider()
+    with provider._lock:
+        provider._spreadsheets[name] = spreadsheet
+    return spreadsheet
+
+
+# -------------------- Quota Scheduler --------------------
+#
+# The service account's per-minute Sheets quota is shared by everything the bot
+# does. Each gateway call takes a token from one bucket first. Callers wait in
+# priority lanes: a lane only gets a token when no higher lane is waiting, and
+# background work also has to leave a reserve in the bucket for user clicks.
+
+LANES = ("interactive", "dev", "background")
+
+_lane = contextvars.ContextVar("sheets_lane", default="interactive")
+
+
+def set_lane(name):
+    """Put every Sheets call made from the current task in the given lane."""
+    _lane.set(name)
+
+
+@contextlib.contextmanager
+def lane(name):
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+class QuotaScheduler:
+    def __init__(self, per_minute=60, background_reserve=0.25):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.reserve = self.capacity * background_reserve
+        self.tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._waiting = {name: 0 for name in LANES}
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _floor(self, lane):
+        return self.reserve if lane == "background" else 0
+
+    def _can_take(self, lane):
+        higher = LANES[:LANES.index(lane)]
+        if any(self._waiting[name] for name in higher):
+            return False
+        return self.tokens - 1 >= self._floor(lane)
+
+    async def acquire(self, lane="interactive"):
+        if lane not in self._waiting:
+            lane = "interactive"
+        self._refill()
+        if self._can_take(lane):
+            self.tokens -= 1
+            return 0.0
+
+        started = time.monotonic()
+        self._waiting[lane] += 1
+        try:
+            while True:
+                missing = 1 + self._floor(lane) - self.tokens
+                await asyncio.sleep(max(missing / self.rate, 0.05))
+                self._refill()
+                if self._can_take(lane):
+                    self.tokens -= 1
+                    return time.monotonic() - started
+        finally:
+            self._waiting[lane] -= 1
+
+    def queue_depth(self):
+        return dict(self._waiting)
+
+
+# -------------------- Retry Policy --------------------
+#
+# Transient Google errors (429, 5xx, dropped connections) are retried with
+# exponential backoff and full jitter, honouring Retry-After. Whether a call
+# may be repeated depends on what it is:
+#   - idempotent reads/overwrites: retried on any transient error
+#   - appends, inserts, row deletes, structural batchUpdates: retried on 429
+#     only, since a rejected request was never applied but a 5xx/timeout may
+#     already have been
+#   - anything else (multi-request helpers): never retried as a whole
+
+IDEMPOTENT = {
+    "get_all_values", "get_all_records", "row_values", "col_values", "cell", "acell",
+    "get", "batch_get", "values_get", "values_batch_get", "worksheet", "worksheets",
+    "update", "update_cell", "update_cells", "update_acell", "batch_update",
+    "clear", "batch_clear", "resize", "values_update", "values_clear", "values_batch_update",
+    "get_or_create_sheet", "index", "find_row", "find_rows",
+    "columns", "column", "header", "get_range",
+}
+REJECTED_ONLY = {
+    "append_row", "append_rows", "insert_row", "insert_rows", "delete_rows", "delete_row",
+    "values_append", "add_worksheet", "del_worksheet", "Spreadsheet.batch_update",
+}
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+
+def idempotent(fn):
+    """Mark a helper that only reads (or overwrites the same cells) as safe to retry."""
+    fn.sheets_idempotent = True
+    return fn
+
+
+def retry_class(fn):
+    if getattr(fn, "sheets_idempotent", False):
+        return "idempotent"
+    qualname = getattr(fn, "__qualname__", "")
+    name = getattr(fn, "__name__", "")
+    # Spreadsheet.batch_update carries structural requests (row deletes), the worksheet one only values
+    if qualname.endswith("Spreadsheet.batch_update"):
+        return "rejected_only"
+    if name in REJECTED_ONLY:
+        return "rejected_only"
+    if name in IDEMPOTENT:
+        return "idempotent"
+    return "never"
+
+
+def _status(exc):
+    return getattr(getattr(exc, "response", None), "status_code", None)
+
+
+def _is_network_error(exc):
+    try:
+        import requests
+    except ImportError:
+        return False
+    return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def _retry_after(exc):
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    def __init__(self, attempts=5, base_delay=1.0, max_delay=32.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, fn, exc):
+        kind = retry_class(fn)
+        status = _status(exc)
+        if kind == "never":
+            return False
+        if status == 429:
+            return True
+        if kind == "rejected_only":
+            return False
+        return status in TRANSIENT_STATUS or _is_network_error(exc)
+
+    def delay(self, attempt, exc):
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+# -------------------- Async Gateway --------------------
+#
+# gspread is blocking, so every Sheets call made from a coroutine goes through
+# the gateway's bounded thread pool instead of running on the event loop.
+
+
+class SheetGateway:
+    def __init__(self, max_workers=4, per_minute=60, retry=None):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sheets")
+        self.scheduler = QuotaScheduler(per_minute) if per_minute else None
+        self.retry = retry or RetryPolicy()
+
+    async def _run(self, fn, args, kwargs):
+        if self.scheduler:
+            current = _lane.get()
+            waited = await self.scheduler.acquire(current)
+            if waited > 1:
+                print(f"[⏳] Sheets quota: {current} call waited {waited:.1f}s (queued: {self.scheduler.queue_depth()})")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+
+    async def call(self, fn, *args, **kwargs):
+        if getattr(fn, "sheets_local", False):
+            # ✅ Served by the local store: no quota token, no thread hop, nothing to retry
+            return fn(*args, **kwargs)
+        attempt = 0
+        while True:
+            try:
+                return await self._run(fn, args, kwargs)
+            except Exception as e:
+                attempt += 1
+                if attempt >= self.retry.attempts or not self.retry.should_retry(fn, e):
+                    raise
+                wait = self.retry.delay(attempt - 1, e)
+                name = getattr(fn, "__qualname__", repr(fn))
+                print(f"[🔁] Sheets {name} failed ({_status(e) or type(e).__name__}), retry {attempt}/{self.retry.attempts - 1} in {wait:.1f}s")
+                await asyncio.sleep(wait)
+
+    async def get_values(self, worksheet):
+        # ✅ Cache hits are answered on the loop, only misses pay for a thread hop
+        if isinstance(worksheet, CachedWorksheet) and worksheet.is_cached():
+            return worksheet.get_all_values()
+        return await self.call(worksheet.get_all_values)
+
+    async def prefetch(self, *worksheets):
+        await asyncio.gather(*(self.get_values(ws) for ws in worksheets))
+
+    def queue_depth(self):
+        return self.scheduler.queue_depth() if self.scheduler else {name: 0 for name in LANES}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+_gateway = None
+
+
+def setup_gateway(max_workers=4, per_minute=60, retry_attempts=5):
+    global _gateway
+    if _gateway is not None:
+        _gateway.shutdown()
+    _gateway = SheetGateway(max_workers=max_workers, per_minute=per_minute, retry=RetryPolicy(attempts=retry_attempts))
+    return _gateway
+
+
+def get_gateway():
+    global _gateway
+    if _gateway is None:
+        _gateway = SheetGateway()
+    return _gateway
+
+
+async def call(fn, *args, **kwargs):
+    """Run a blocking gspread call (or helper that makes them) off the event loop."""
+    return await get_gateway().call(fn, *args, **kwargs)
+
+
+async def get_values(worksheet):
+    """Awaitable get_all_values() that skips the thread pool on a cache hit."""
+    return await get_gateway().get_values(worksheet)
+
+
+async def prefetch(*worksheets):
+    """Warm several tabs at once; read them afterwards with get_values, not synchronously."""
+    await get_gateway().prefetch(*worksheets)
+
+
+def queue_depth():
+    """Calls currently waiting for quota, per lane."""
+    return get_gateway().queue_depth()
+
+
+async def get_index(worksheet, key_col=1, fold=False):
+    """The tab's KeyIndex for key_col, built off the loop only if it isn't held already."""
+    if worksheet.has_index(key_col, fold):
+        return worksheet.index(key_col, fold)
+    return await call(worksheet.index, key_col, fold)
+
+
+async def live_index(worksheet, key_col=1, fold=False):
+    """The tab's KeyIndex, checked against a live read of just the key column.
+
+    For row numbers that are about to be written to or deleted: the held
+    index may be up to index_ttl old, and a hand edit or sort in that time
+    would send the write to the wrong row. Local tabs are their own source
+    of truth and skip the read.
+    """
+    if not isinstance(worksheet, CachedWorksheet):
+        return await get_index(worksheet, key_col, fold)
+    return await call(worksheet.live_index, key_col, fold)
+
+
+async def find_row(worksheet, key, key_col=1, fold=False):
+    """Row number of the first row keyed by key, or None (checked live, see live_index)."""
+    return (await live_index(worksheet, key_col, fold)).find(key)
+
+
+async def find_rows(worksheet, key, key_col=1, fold=False):
+    """Row numbers of every row keyed by key, top to bottom (checked live, see live_index)."""
+    return (await live_index(worksheet, key_col, fold)).find_all(key)
+
+
+async def columns(worksheet, *cols):
+    """Only the named/numbered columns of a tab, each cached on its own."""
+    if worksheet.has_columns(*cols):
+        return worksheet.columns(*cols)
+    return await call(worksheet.columns, *cols)
+
+
+async def column(worksheet, col):
+    """One column of a tab (header included), without downloading the rest."""
+    return (await columns(worksheet, col))[col]
+
+
+async def models(worksheet, model):
+    """Every data row of a tab as model instances (rows.TeamRow, rows.MatchRow...), parsed once per snapshot."""
+    if worksheet.is_cached():
+        return worksheet.models(model)
+    return await call(worksheet.models, model)
+
+
+async def row_values(worksheet, row):
+    """One row, from the snapshot when it's fresh, otherwise a single-row request."""
+    if isinstance(worksheet, CachedWorksheet) and worksheet.is_cached():
+        return worksheet.row_values(row)
+    return await call(worksheet.row_values, row)
+
+
+# -------------------- Write Buffer --------------------
+#
+# Handlers that write several cells queue them on a WriteBuffer and flush once:
+#
+#     async with sheets.batch(matches_sheet) as writes:
+#         writes.update_cell(idx, 6, "Finished")
+#         writes.update_cell(idx, 7, winner)
+#
+# Everything queued is sent as a single worksheet batch_update on exit. If the
+# block raises, the queued writes are discarded instead.
+
+
+def column_letter(col):
+    letters = ""
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def rowcol_to_a1(row, col):
+    return f"{column_letter(col)}{row}"
+
+
+class WriteBuffer:
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+        self._pending = {}   # A1 range -> values, in write order
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def update_cell(self, row, col, value):
+        self.update(rowcol_to_a1(row, col), [[value]])
+
+    def update(self, range_name, values):
+        with self._lock:
+            # A later write to the same range replaces the earlier one and moves to the end
+            self._pending.pop(range_name, None)
+            self._pending[range_name] = values
+
+    def drain(self):
+        with self._lock:
+            data = [{"range": r, "values": v} for r, v in self._pending.items()]
+            self._pending.clear()
+        return data
+
+    async def flush(self):
+        data = self.drain()
+        if data:
+            await call(self.worksheet.batch_update, data, value_input_option="USER_ENTERED")
+        return len(data)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            # The block failed part way: send nothing rather than half its writes
+            dropped = len(self.drain())
+            if dropped:
+                print(f"[⚠️] Discarded {dropped} queued write(s) to {self.worksheet.title!r} after an error")
+            return
+        await self.flush()
+
+
+def batch(worksheet):
+    """Queue cell/range writes for one worksheet and send them as one batch_update."""
+    return WriteBuffer(worksheet)
+
+
+# -------------------- Bulk Row Deletion --------------------
+#
+# Deleting rows one by one costs a request each and shifts every index below
+# it. Instead, all rows to drop (across any number of tabs) are resolved from
+# one snapshot and sent as deleteDimension ranges in one spreadsheet
+# batchUpdate, bottom-up per tab so earlier ranges never move later ones.
+#
+# Row numbers come from snapshots and indexes that can be minutes old, and a
+# deleteDimension can't be undone, so the key column of every tab involved is
+# read back live (one values_batch_get) before anything is sent.
+
+
+def _row_ranges(indices):
+    # [2, 3, 4, 9] -> [(9, 9), (2, 4)] : contiguous runs, highest first
+    runs = []
+    for idx in sorted(set(indices)):
+        if runs and idx == runs[-1][1] + 1:
+            runs[-1][1] = idx
+        else:
+            runs.append([idx, idx])
+    return [(start, end) for start, end in reversed(runs)]
+
+
+def delete_requests(worksheet, indices):
+    return [
+        {"deleteDimension": {"range": {
+            "sheetId": worksheet.id,
+            "dimension": "ROWS",
+            "startIndex": start - 1,
+            "endIndex": end,
+        }}}
+        for start, end in _row_ranges(indices)
+    ]
+
+
+async def live_columns(spreadsheet, targets):
+    """[(worksheet, col)] -> each column top to bottom, read straight from the sheet in one request."""
+    remote = [(ws, col) for ws, col in targets if not getattr(ws, "is_local", False)]
+    found = {}
+    if remote:
+        ranges = [f"{_tab_range(ws.title)}!{column_letter(col)}:{column_letter(col)}" for ws, col in remote]
+        response = await call(spreadsheet.values_batch_get, ranges, params={"majorDimension": "COLUMNS"})
+        for (ws, col), value_range in zip(remote, response.get("valueRanges", [])):
+            values = value_range.get("values", [])
+            found[(ws.title, col)] = list(values[0]) if values else []
+    return [found[(ws.title, col)] if (ws.title, col) in found else ws.column(col) for ws, col in targets]
+
+
+async def _confirmed(spreadsheet, targets, expect):
+    # Keep only the rows whose key cell still holds the key they were found by
+    checked = [(ws, expect[ws][0]) for ws in targets if ws in expect and targets[ws]]
+    columns = await live_columns(spreadsheet, checked)
+    confirmed = dict(targets)
+    for (worksheet, _), column in zip(checked, columns):
+        keys = expect[worksheet][1]
+        kept = []
+        for idx in targets[worksheet]:
+            live = column[idx - 1].strip() if idx <= len(column) else ""
+            if idx in keys and live == str(keys[idx]).strip():
+                kept.append(idx)
+            else:
+                print(f"[⚠️] Not deleting {worksheet.title!r} row {idx}: expected {keys.get(idx)!r}, found {live!r}")
+        confirmed[worksheet] = kept
+    return confirmed
+
+
+async def delete_rows(spreadsheet, targets, expect=None):
+    """Delete {worksheet: [1-based row indices]} in a single batchUpdate.
+
+    expect is {worksheet: (key_col, {row: key})}: those rows' key cells are
+    read back live first and any row that no longer holds its key is left
+    alone. Rows of a tab without an entry are deleted unchecked.
+    """
+    if expect:
+        targets = await _confirmed(spreadsheet, targets, expect)
+    requests = []
+    touched = []
+    for worksheet, indices in targets.items():
+        if not indices:
+            continue
+        if getattr(worksheet, "is_local", False):
+            worksheet.delete_ranges(_row_ranges(indices))
+        else:
+            requests.extend(delete_requests(worksheet, indices))
+            touched.append(worksheet)
+    if not requests:
+        return sum(len(set(indices)) for indices in targets.values())
+
+    raw = getattr(spreadsheet, "spreadsheet", spreadsheet)
+    try:
+        await call(raw.batch_update, {"requests": requests})
+    except Exception:
+        for worksheet in touched:
+            if isinstance(worksheet, CachedWorksheet):
+                worksheet.invalidate()
+                worksheet._cache.drop_indexes(worksheet.title)
+        raise
+    for worksheet in touched:
+        if isinstance(worksheet, CachedWorksheet):
+            worksheet.rows_deleted(_row_ranges(targets[worksheet]))
+    return sum(len(set(indices)) for indices in targets.values())
+
+
+async def delete_keyed_rows(spreadsheet, targets):
+    """Delete every data row whose key cell is in the given set.
+
+    targets is a list of (worksheet, key_col, keys) with key_col 1-based.
+    Returns {title: rows deleted}.
+    """
+    # Resolved from a live read of each key column, never from a held index
+    columns = await live_columns(spreadsheet, [(worksheet, key_col) for worksheet, key_col, _ in targets])
+    key_indexes = [
+        worksheet.adopt_column(key_col, column) if isinstance(worksheet, CachedWorksheet) else KeyIndex.build(key_col, column)
+        for (worksheet, key_col, _), column in zip(targets, columns)
+    ]
+
+    indices = {}
+    deleted = {}
+    for (worksheet, _, keys), key_index in zip(targets, key_indexes):
+        found = [idx for key in keys for idx in key_index.find_all(key)]
+        indices.setdefault(worksheet, []).extend(found)
+        deleted[worksheet.title] = deleted.get(worksheet.title, 0) + len(found)
+
+    await delete_rows(spreadsheet, indices)
+    return deleted
+
+
+# -------------------- Multi-Tab Snapshot --------------------
+#
+# Whole-league operations read several tabs up front. load_snapshot() pulls
+# them all with one values_batch_get, primes the cache with each tab and hands
+# back Table objects, so every later read in the operation sees the same view.
+
+
+class Table:
+    def __init__(self, title, values):
+        self.title = title
+        self.values = values
+        self._models = {}
+
+    @property
+    def header(self):
+        return self.values[0] if self.values else []
+
+    @property
+    def rows(self):
+        return self.values[1:]
+
+    def column(self, name):
+        return self.header.index(name)
+
+    def records(self):
+        header = self.header
+        return [dict(zip(header, row)) for row in self.rows]
+
+    def models(self, model):
+        parsed = self._models.get(model)
+        if parsed is None:
+            parsed = self._models[model] = model.parse(self.values)
+        return parsed
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"<Table {self.title!r} rows={len(self.rows)}>"
+
+
+def _tab_range(title):
+    return "'" + title.replace("'", "''") + "'"
+
+
+def _pad(values):
+    # values_batch_get drops trailing blanks, get_all_values() pads rows to the widest one
+    width = max((len(row) for row in values), default=0)
+    return [row + [""] * (width - len(row)) for row in values]
+
+
+async def load_snapshot(spreadsheet, worksheets):
+    """Read several tabs (handles or titles) in one request and return {title: Table}."""
+    titles = [ws if isinstance(ws, str) else ws.title for ws in worksheets]
+    cache = getattr(spreadsheet, "cache", None)
+    local_tabs = getattr(spreadsheet, "local_tabs", ())
+    remote = [title for title in titles if title not in local_tabs]
+    generations = {title: cache.generation(title) for title in remote} if cache else {}
+
+    tables = {}
+    for title in titles:
+        if title in local_tabs:
+            tables[title] = Table(title, spreadsheet.local_worksheet(title).get_all_values())
+    if not remote:
+        return tables
+
+    response = await call(spreadsheet.values_batch_get, [_tab_range(t) for t in remote])
+    for title, value_range in zip(remote, response.get("valueRanges", [])):
+        values = _pad(value_range.get("values", []))
+        if cache:
+            cache.store(title, values, generations[title])
+        tables[title] = Table(title, [list(row) for row in values])
+    return {title: tables[title] for title in titles}
+
+
+# -------------------- External Edit Detection --------------------
+#
+# Admins edit the spreadsheet by hand. Instead of short TTLs everywhere, a
+# background poll asks Drive for the file's modifiedTime (cheap, no Sheets
+# quota). Only when it moved are the tabs the bot holds in memory read back in
+# one values_batch_get; tabs whose digest changed get their snapshot replaced
+# and their indexes rebuilt, everything else is left alone.
+
+
+def _digest(values):
+    return hashlib.sha1(json.dumps(values).encode()).hexdigest()
+
+
+class ChangeDetector:
+    def __init__(self, spreadsheet, interval=30):
+        self.spreadsheet = spreadsheet
+        self.interval = interval
+        self._modified = None
+        self._digests = {}   # title -> digest of the values seen last time
+        self._task = None
+
+    def _raw(self):
+        return getattr(self.spreadsheet, "spreadsheet", self.spreadsheet)
+
+    def modified_time(self):
+        raw = self._raw()
+        getter = getattr(raw, "get_lastUpdateTime", None)   # gspread 6
+        if getter is not None:
+            return getter()
+        from gspread.urls import DRIVE_FILES_API_V3_URL
+
+        response = raw.client.request(
+            "get", f"{DRIVE_FILES_API_V3_URL}/{raw.id}",
+            params={"fields": "modifiedTime", "supportsAllDrives": True},
+        )
+        return response.json().get("modifiedTime")
+
+    @idempotent
+    def check(self):
+        """Refresh every held tab that changed since the last check; returns their titles."""
+        modified = self.modified_time()
+        if modified is not None and modified == self._modified:
+            return []
+
+        cache = getattr(self.spreadsheet, "cache", None)
+        local_tabs = set(getattr(self.spreadsheet, "local_tabs", ()))
+        titles = sorted((cache.held_titles() if cache else set()) | local_tabs)
+        if not titles:
+            self._modified = modified
+            return []
+
+        pushes = getattr(self.spreadsheet, "pushes", 0)
+        generations = {title: cache.generation(title) for title in titles} if cache else {}
+        response = self._raw().values_batch_get([_tab_range(t) for t in titles])
+
+        changed = []
+        for title, value_range in zip(titles, response.get("valueRanges", [])):
+            values = _pad(value_range.get("values", []))
+            if title in local_tabs:
+                # The local store is the source of truth, it only takes edits the sync hasn't overwritten
+                if self.spreadsheet.adopt_external(title, values, pushes):
+                    changed.append(title)
+                continue
+            digest = _digest(values)
+            if self._digests.get(title) == digest:
+                continue
+            self._digests[title] = digest
+            if cache and cache.refresh(title, values, generations[title]):
+                changed.append(title)
+
+        self._modified = modified
+        return changed
+
+    async def _loop(self):
+        set_lane("background")
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                changed = await call(self.check)
+                if changed:
+                    print(f"[🔍] Spreadsheet changed, refreshed: {', '.join(changed)}")
+            except Exception as e:
+                print(f"[⚠️] Change check failed (will retry): {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+        return self._task
+
+
+_detector = None
+
+
+def start_change_detector(spreadsheet, interval=30):
+    """Poll for hand edits every interval seconds (once per process)."""
+    global _detector
+    if _detector is None:
+        _detector = ChangeDetector(spreadsheet, interval=interval)
+    _detector.start()
+    return _detector
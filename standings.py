@@ -0,0 +1,489 @@
+# -------------------- Team Standings --------------------
+#
+# The Leaderboard tab used to be cleared and re-appended in rating order after
+# every single result. Here the board is a SortedLeaderboard: rows by team plus
+# a bisect-maintained rating order, so a result moves one entry instead of
+# re-sorting everything. Changes are published back to the tab in place (one
+# update from A1, never a clear) a few seconds after the first unpublished
+# change, so a burst of results costs one write.
+#
+# A change is made on a copy of the snapshot's board that this module owns
+# (kept in _pending), never on the parsed model other readers share. While a
+# publish is pending that copy is the source of truth; once it is written
+# the board is parsed again from the tab's snapshot, which picks up hand
+# edits and writes made elsewhere.
+#
+# How far a result moves a rating is up to the configured rating engine
+# (ratings.py); the default "flat" engine is the fixed points from before.
+
+import asyncio
+import bisect
+import json
+import os
+import time
+
+import ratings
+import sheets
+from rows import to_int
+
+HEADERS = ["Team Name", "Rating", "Wins", "Losses", "Matches Played"]
+
+
+def _config():
+    with open("config.json") as f:
+        return json.load(f)
+
+
+class SortedLeaderboard:
+    """Leaderboard rows kept in rating order; O(log n) to find, rank or move a team."""
+
+    @classmethod
+    def parse(cls, values):
+        return cls(values[0] if values else HEADERS, values[1:])
+
+    def __init__(self, header, rows):
+        self.header = list(header) or list(HEADERS)
+        self.rows = {}          # team name -> [name, rating, wins, losses, matches, ...extra cells]
+        self._order = []        # (-rating, seq, name), sorted
+        self._seq = {}          # tie-break: teams with equal rating keep their order on the tab
+        self.published_rows = len(rows)
+        self.changes = 0        # bumped on every change, so a publish can tell if it missed any
+        for row in rows:
+            if row and row[0]:
+                self._add(list(row))
+
+    def copy(self):
+        board = SortedLeaderboard.__new__(SortedLeaderboard)
+        board.header = list(self.header)
+        board.rows = {name: list(row) for name, row in self.rows.items()}
+        board._order = list(self._order)
+        board._seq = dict(self._seq)
+        board.published_rows = self.published_rows
+        board.changes = self.changes
+        return board
+
+    def _key(self, name):
+        return (-self.rows[name][1], self._seq[name], name)
+
+    def _add(self, row):
+        row += [""] * (5 - len(row))
+        name = row[0]
+        row[1:5] = [to_int(value) for value in row[1:5]]
+        self._seq.setdefault(name, len(self._seq))
+        self.rows[name] = row
+        bisect.insort(self._order, self._key(name))
+        self.changes += 1
+
+    def _remove(self, name):
+        i = bisect.bisect_left(self._order, self._key(name))
+        del self._order[i]
+
+    def _set(self, name, rating=None, wins=0, losses=0, matches=0):
+        self._remove(name)
+        row = self.rows[name]
+        if rating is not None:
+            row[1] = rating
+        row[2] += wins
+        row[3] += losses
+        row[4] += matches
+        bisect.insort(self._order, self._key(name))
+        self.changes += 1
+
+    def __contains__(self, name):
+        return name in self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def find(self, name, fold=False):
+        """Exact team name as stored, optionally matching case-insensitively."""
+        name = str(name).strip()
+        if name in self.rows or not fold:
+            return name if name in self.rows else None
+        return next((team for team in self.rows if team.lower() == name.lower()), None)
+
+    def rating(self, name):
+        return self.rows[name][1] if name in self.rows else None
+
+    def rank(self, name):
+        """1-based position on the board, None if the team isn't on it."""
+        if name not in self.rows:
+            return None
+        return bisect.bisect_left(self._order, self._key(name)) + 1
+
+    def top(self, count=None):
+        return [self.rows[name] for _, _, name in self._order[:count]]
+
+    def record(self, name, won, elo_win, elo_loss, starting_elo=800):
+        """One result, same rules as the old update_team_rating (a new team starts at starting_elo)."""
+        if name not in self.rows:
+            self._add([name, starting_elo, 1 if won else 0, 0 if won else 1, 1])
+            return
+        self._set(
+            name,
+            rating=self.rows[name][1] + (elo_win if won else elo_loss),
+            wins=1 if won else 0, losses=0 if won else 1, matches=1,
+        )
+
+    def set_result(self, name, won, rating):
+        """One result whose new rating a rating engine worked out."""
+        if name not in self.rows:
+            self._add([name, rating, 1 if won else 0, 0 if won else 1, 1])
+            return
+        self._set(name, rating=rating, wins=1 if won else 0, losses=0 if won else 1, matches=1)
+
+    def adjust(self, name, change):
+        """Move a team's rating by `change` without touching its record; returns the new rating."""
+        self._set(name, rating=self.rows[name][1] + change)
+        return self.rows[name][1]
+
+    def add(self, name, rating):
+        """A new team with no games yet; a team already on the board is left alone."""
+        if name not in self.rows:
+            self._add([name, rating, 0, 0, 0])
+
+    def remove(self, name):
+        self._remove(name)
+        del self.rows[name]
+        self.changes += 1
+
+    def rename(self, old_name, new_name):
+        self._remove(old_name)
+        row = self.rows.pop(old_name)
+        row[0] = new_name
+        self.rows[new_name] = row
+        self._seq[new_name] = self._seq.pop(old_name)
+        bisect.insort(self._order, self._key(new_name))
+        self.changes += 1
+
+    def values(self):
+        return [list(self.header)] + self.top()
+
+
+# -------------------- Publishing --------------------
+
+_pending = {}   # tab title -> (worksheet, board, publish task)
+
+
+async def board(leaderboard_sheet):
+    """The board to read: the unpublished one if there is one, otherwise the tab's snapshot. Don't change it."""
+    pending = _pending.get(leaderboard_sheet.title)
+    if pending:
+        return pending[1]
+    return await sheets.models(leaderboard_sheet, SortedLeaderboard)
+
+
+async def owned(leaderboard_sheet):
+    """The board to change: the unpublished one, or a private copy of the snapshot's that stays pending until published."""
+    pending = _pending.get(leaderboard_sheet.title)
+    if pending:
+        return pending[1]
+    current = (await sheets.models(leaderboard_sheet, SortedLeaderboard)).copy()
+    pending = _pending.get(leaderboard_sheet.title)
+    if pending:
+        # Someone else took ownership while the snapshot was read
+        return pending[1]
+    _pending[leaderboard_sheet.title] = (leaderboard_sheet, current, None)
+    return current
+
+
+def _schedule(leaderboard_sheet, current, delay):
+    pending = _pending.get(leaderboard_sheet.title)
+    if pending and pending[2] is not None and not pending[2].done():
+        return
+    task = asyncio.create_task(_publish_later(leaderboard_sheet.title, delay))
+    _pending[leaderboard_sheet.title] = (leaderboard_sheet, current, task)
+
+
+async def _publish_later(title, delay):
+    sheets.set_lane("background")
+    await asyncio.sleep(delay)
+    await _publish(title)
+
+
+async def _publish(title):
+    # The board stays pending until it is written, so changes made meanwhile land on it
+    pending = _pending.get(title)
+    if not pending:
+        return
+    leaderboard_sheet, current, _ = pending
+    changes = current.changes
+    rows = len(current.rows)
+    values = current.values()
+    # Blank out rows left over if the board got shorter, instead of clearing the tab
+    blank = [""] * len(current.header)
+    values += [list(blank) for _ in range(current.published_rows + 1 - len(values))]
+    try:
+        await sheets.call(leaderboard_sheet.update, "A1", values)
+    except Exception as e:
+        print(f"❗ Failed to publish leaderboard: {e}")
+        # Keep the changes; the next change or flush tries again
+        _pending[title] = (leaderboard_sheet, current, None)
+        return
+    current.published_rows = rows
+    if current.changes != changes:
+        # Changed while the write was in flight: send the rest too
+        _pending[title] = (leaderboard_sheet, current, None)
+        await _publish(title)
+    elif title in _pending and _pending[title][1] is current:
+        # Written: the next reader parses the tab's fresh snapshot again
+        del _pending[title]
+
+
+async def changed(leaderboard_sheet, current, delay=None):
+    """Mark `current` as changed; everything changed in the next `delay` seconds goes out in one write."""
+    if delay is None:
+        delay = _config().get("leaderboard_publish_seconds", 5)
+    if delay <= 0:
+        _pending[leaderboard_sheet.title] = (leaderboard_sheet, current, None)
+        await _publish(leaderboard_sheet.title)
+        return
+    _schedule(leaderboard_sheet, current, delay)
+
+
+async def flush(leaderboard_sheet=None):
+    """Write pending changes now (one tab, or every tab with changes)."""
+    titles = [leaderboard_sheet.title] if leaderboard_sheet is not None else list(_pending)
+    for title in titles:
+        pending = _pending.get(title)
+        if pending and pending[2] is not None and not pending[2].done():
+            pending[2].cancel()
+        await _publish(title)
+
+
+def _engine_ratings(rater, current, matches, starting_elo, keep):
+    # {team: new rating} from a periodic rating engine, None for the flat one
+    if not rater.periodic:
+        return None
+    teams = {team for match in matches for team in match}
+    now = {team: current.rating(team) if team in current else starting_elo for team in teams}
+    if keep:
+        return ratings.periods.add_results(rater, matches, now)
+    return ratings.periods.preview(rater, matches, now)
+
+
+def apply_results(current, matches, elo_win, elo_loss, starting_elo=800, config=None):
+    """(winner, loser) results onto a board through the configured rating engine."""
+    live = _engine_ratings(ratings.from_config(config or _config()), current, matches, starting_elo, keep=True)
+    for winner, loser in matches:
+        if live is None:
+            current.record(winner, True, elo_win, elo_loss, starting_elo)
+            current.record(loser, False, elo_win, elo_loss, starting_elo)
+        else:
+            current.set_result(winner, True, live[winner])
+            current.set_result(loser, False, live[loser])
+
+
+def preview_results(current, matches, elo_win, elo_loss, starting_elo=800, config=None):
+    """{team: rating} the results would leave the teams involved on, changing nothing."""
+    live = _engine_ratings(ratings.from_config(config or _config()), current, matches, starting_elo, keep=False)
+    if live is not None:
+        return live
+    preview = {}
+    for winner, loser in matches:
+        for team, change in ((winner, elo_win), (loser, elo_loss)):
+            rating = preview.get(team, current.rating(team) if team in current else starting_elo)
+            preview[team] = rating + change
+    return preview
+
+
+# The entry points below take the caller's already-loaded config (bot.config
+# or the one a command read) and only read config.json when not given one.
+
+async def record_result(leaderboard_sheet, winner, loser, elo_win, elo_loss, config=None):
+    """Winner/loser of one finished match, published on the debounce."""
+    config = config or _config()
+    current = await owned(leaderboard_sheet)
+    apply_results(current, [(winner, loser)], elo_win, elo_loss, config.get("default_team_rating", 800), config)
+    await changed(leaderboard_sheet, current, config.get("leaderboard_publish_seconds", 5))
+
+
+async def record_results(leaderboard_sheet, matches, elo_win, elo_loss, starting_elo=800, config=None):
+    """Many (winner, loser) results at once, written immediately in one update."""
+    if not matches:
+        return
+    current = await owned(leaderboard_sheet)
+    apply_results(current, matches, elo_win, elo_loss, starting_elo, config)
+    await changed(leaderboard_sheet, current, delay=0)
+
+
+async def close_period(leaderboard_sheet, week, config=None):
+    """Weekly rollover: close the rating period for engines that use one. Ratings on the tab don't move."""
+    rater = ratings.from_config(config or _config())
+    if not rater.periodic:
+        return
+    current = await board(leaderboard_sheet)
+    ratings.periods.close(rater, week, {name: row[1] for name, row in current.rows.items()})
+
+
+async def adjust(leaderboard_sheet, team_name, change, config=None):
+    """Manual ELO change; returns (team name as stored, new rating) or None if the team isn't on the board."""
+    name = (await board(leaderboard_sheet)).find(team_name, fold=True)
+    if name is None:
+        return None
+    current = await owned(leaderboard_sheet)
+    rating = current.adjust(name, change)
+    record_adjustment(name, change)
+    config = config or _config()
+    if ratings.from_config(config).periodic:
+        ratings.periods.adjust(name, change)
+    await changed(leaderboard_sheet, current, config.get("leaderboard_publish_seconds", 5))
+    return name, rating
+
+
+async def add_teams(leaderboard_sheet, team_names, starting_elo=800, config=None):
+    """New teams onto the board at starting_elo; returns the ones that weren't on it yet."""
+    added = [name for name in dict.fromkeys(team_names) if name not in await board(leaderboard_sheet)]
+    if not added:
+        return []
+    current = await owned(leaderboard_sheet)
+    for name in added:
+        current.add(name, starting_elo)
+    await changed(leaderboard_sheet, current, (config or _config()).get("leaderboard_publish_seconds", 5))
+    return added
+
+
+async def remove(leaderboard_sheet, team_name, config=None):
+    """Take a team off the board; returns the name as stored, or None if it isn't on it."""
+    name = (await board(leaderboard_sheet)).find(team_name, fold=True)
+    if name is None:
+        return None
+    current = await owned(leaderboard_sheet)
+    if name in current:
+        current.remove(name)
+        await changed(leaderboard_sheet, current, (config or _config()).get("leaderboard_publish_seconds", 5))
+    return name
+
+
+async def rename(leaderboard_sheet, old_name, new_name, config=None):
+    """Rename a team on the board, keeping its rating, record and place; False if it isn't on it."""
+    if old_name not in await board(leaderboard_sheet):
+        return False
+    current = await owned(leaderboard_sheet)
+    if old_name not in current or new_name in current:
+        return False
+    current.rename(old_name, new_name)
+    await changed(leaderboard_sheet, current, (config or _config()).get("leaderboard_publish_seconds", 5))
+    return True
+
+
+async def replace(leaderboard_sheet, header, rows, expected, rating_state=None):
+    """Swap in a whole new board (a season recompute) and publish it now.
+
+    `expected` is {team: (rating, wins, losses, matches)} the new rows were
+    worked out from. If the board has moved on since, nothing is installed and
+    False is returned. `rating_state` is handed to RatingPeriods.reset with it.
+    """
+    current = await board(leaderboard_sheet)
+    pending = _pending.get(leaderboard_sheet.title)
+    if pending:
+        current = pending[1]
+    if {name: tuple(row[1:5]) for name, row in current.rows.items()} != expected:
+        return False
+    fresh = SortedLeaderboard(header, rows)
+    fresh.published_rows = max(current.published_rows, len(rows))
+    if rating_state:
+        ratings.periods.reset(*rating_state)
+    await changed(leaderboard_sheet, fresh, delay=0)
+    return True
+
+
+# -------------------- Manual Adjustments --------------------
+#
+# A dev "Adjust Team ELO" change isn't a result, so a season replay
+# (recompute.py) can't work it out; every one is logged here so the replay
+# can add it back instead of reporting and erasing it.
+
+ADJUSTMENTS_FILE = os.path.join("json", "elo_adjustments.json")
+
+
+def _load_adjustments():
+    if not os.path.exists(ADJUSTMENTS_FILE):
+        return []
+    try:
+        with open(ADJUSTMENTS_FILE, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[❌] Failed to load ELO adjustments: {e}")
+        return []
+
+
+def _save_adjustments(entries):
+    try:
+        os.makedirs(os.path.dirname(ADJUSTMENTS_FILE), exist_ok=True)
+        tmp = ADJUSTMENTS_FILE + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp, ADJUSTMENTS_FILE)
+    except Exception as e:
+        print(f"[❌] Failed to save ELO adjustments: {e}")
+
+
+def record_adjustment(team_name, change):
+    entries = _load_adjustments()
+    entries.append([team_name, change, int(time.time())])
+    _save_adjustments(entries)
+
+
+def adjustments():
+    """{team: total of every logged manual ELO change}"""
+    totals = {}
+    for team_name, change, _ in _load_adjustments():
+        totals[team_name] = totals.get(team_name, 0) + change
+    return totals
+
+
+def rename_adjustments(old_name, new_name):
+    entries = _load_adjustments()
+    if any(entry[0] == old_name for entry in entries):
+        _save_adjustments([[new_name if entry[0] == old_name else entry[0]] + entry[1:] for entry in entries])
+
+
+# -------------------- Player Stats --------------------
+#
+# A finished match credits every rostered player plus any subs. All credits
+# are worked out from one Player Leaderboard snapshot and written with one
+# batch_update (plus one append for players not on the board yet).
+
+
+def credit_rows(values, credits, elo_win, elo_loss, default_rating=800):
+    """({row number: new A–F row}, [rows to append]) for (user_id, username, won) credits."""
+    index = {}
+    for number, row in enumerate(values[1:], start=2):
+        if len(row) > 1 and row[1].strip():
+            index.setdefault(row[1].strip(), number)
+
+    rows = {}   # user_id -> (row number or None, [username, user_id, rating, wins, losses, matches])
+    for user_id, username, won in credits:
+        user_id = str(user_id).strip()
+        change = elo_win if won else elo_loss
+        if user_id not in rows:
+            number = index.get(user_id)
+            if number:
+                row = list(values[number - 1]) + [""] * 6
+                rows[user_id] = (number, [row[0], user_id, row[2], row[3], row[4], row[5]])
+            else:
+                rows[user_id] = (None, [username, user_id, None, 0, 0, 0])
+        row = rows[user_id][1]
+        rating = int(row[2]) if str(row[2]).isdigit() else default_rating
+        row[2] = str(rating + change)
+        row[3] = str(to_int(row[3]) + (1 if won else 0))
+        row[4] = str(to_int(row[4]) + (0 if won else 1))
+        row[5] = str(to_int(row[5]) + 1)
+
+    updated = {number: row for number, row in rows.values() if number}
+    appended = [row for number, row in rows.values() if not number]
+    return updated, appended
+
+
+async def credit_players(player_leaderboard_sheet, credits, elo_win, elo_loss, default_rating=800):
+    """Apply a match's player credits: one read, one batch_update, at most one append."""
+    if not credits:
+        return
+    values = await sheets.get_values(player_leaderboard_sheet)
+    updated, appended = credit_rows(values, credits, elo_win, elo_loss, default_rating)
+    async with sheets.batch(player_leaderboard_sheet) as writes:
+        for number, row in updated.items():
+            writes.update(f"A{number}:F{number}", [row])
+    if appended:
+        await sheets.call(player_leaderboard_sheet.append_rows, appended)